@@ -0,0 +1,298 @@
+"""
+End-to-end API benchmark against a local fake BallDontLie (fake_bdl.py).
+
+    python benchmarks/bench_api.py                          # in-process server, no upstream latency
+    python benchmarks/bench_api.py --target all --latency-ms 80 --error-rate 0.02
+    python benchmarks/bench_api.py --compare benchmarks/results/a1b2c3d.json benchmarks/results/e4f5a6b.json
+
+The real Flask app is served in-process (werkzeug, threaded) and/or under
+gunicorn gthread, each with a fresh DuckDB directory, and driven over HTTP.
+For /games, /games/<id> and /stats/teams.csv it runs three scenarios:
+
+- cold:            `--requests` distinct, never-seen keys (every request misses)
+- warm:            the same keys again (local cache only)
+- concurrent-miss: `--rounds` new keys, each hit by `--concurrency` clients at once
+
+Each scenario reports throughput, p50/p95/p99 latency, non-2xx responses and
+the upstream calls it caused. Results are printed as JSON lines and written
+to benchmarks/results/<commit>.json (override with --out); --compare prints
+per-scenario deltas between two such files.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(__file__))
+from fake_bdl import FakeBallDontLie, game, season_dates, TEAM_COUNT  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+CSV_WINDOW_DAYS = 7
+
+
+def _percentile(sorted_ms: list[float], p: float) -> float:
+    # nearest-rank
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[max(0, math.ceil(p / 100 * len(sorted_ms)) - 1)]
+
+
+def _drive(client: httpx.Client, paths: list[str], concurrency: int, together: bool = False) -> dict:
+    """GET every path with `concurrency` threads; `together` releases each wave at once."""
+    barrier = threading.Barrier(concurrency) if together else None
+
+    def one(path: str) -> tuple[float, int]:
+        if barrier is not None:
+            barrier.wait()
+        t0 = time.perf_counter()
+        try:
+            status = client.get(path).status_code
+        except httpx.HTTPError:
+            status = 0
+        return (time.perf_counter() - t0) * 1000, status
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, paths))
+    wall = time.perf_counter() - t0
+    ms = sorted(r[0] for r in results)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, s in results if not 200 <= s < 300),
+        "wall_s": round(wall, 4),
+        "throughput_rps": round(len(results) / wall, 1) if wall else 0.0,
+        "p50_ms": round(_percentile(ms, 50), 2),
+        "p95_ms": round(_percentile(ms, 95), 2),
+        "p99_ms": round(_percentile(ms, 99), 2),
+        "mean_ms": round(sum(ms) / len(ms), 2) if ms else 0.0,
+        "max_ms": round(ms[-1], 2) if ms else 0.0,
+    }
+
+
+def _plan(requests: int, rounds: int) -> dict[str, tuple[list[str], list[str]]]:
+    """
+    Per endpoint: (cold/warm paths, concurrent-miss keys), drawn from disjoint
+    dates so no scenario is warmed by another one.
+    """
+    dates = season_dates()
+    needed = 2 * (requests + rounds) + math.ceil((requests + rounds) / TEAM_COUNT) * CSV_WINDOW_DAYS
+    if needed > len(dates):
+        raise SystemExit(f"--requests/--rounds need {needed} dates, the fake season has {len(dates)}")
+    it = iter(dates)
+
+    games = [f"/games?date={next(it)}" for _ in range(requests + rounds)]
+    ids = [f"/games/{game(date.fromisoformat(next(it)), 0)['id']}" for _ in range(requests + rounds)]
+    csv = []
+    window: list[str] = []
+    for i in range(requests + rounds):
+        if i % TEAM_COUNT == 0:
+            window = [next(it) for _ in range(CSV_WINDOW_DAYS)]
+        csv.append(
+            f"/stats/teams.csv?start_date={window[0]}&end_date={window[-1]}&team=T{i % TEAM_COUNT + 1:02d}"
+        )
+    return {
+        "/games": (games[:requests], games[requests:]),
+        "/games/<id>": (ids[:requests], ids[requests:]),
+        "/stats/teams.csv": (csv[:requests], csv[requests:]),
+    }
+
+
+def _run_target(target: str, base_url: str, fake: FakeBallDontLie, args) -> list[dict]:
+    out = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    with httpx.Client(base_url=base_url, timeout=120, limits=limits) as client:
+        for endpoint, (keys, miss_keys) in _plan(args.requests, args.rounds).items():
+            scenarios = [
+                ("cold", lambda: _drive(client, keys, args.concurrency)),
+                ("warm", lambda: _drive(client, keys, args.concurrency)),
+                ("concurrent-miss", lambda: _drive(
+                    client, [k for k in miss_keys for _ in range(args.concurrency)],
+                    args.concurrency, together=True,
+                )),
+            ]
+            for scenario, run in scenarios:
+                before = fake.calls()
+                row = {"target": target, "endpoint": endpoint, "scenario": scenario, **run()}
+                row["upstream_calls"] = fake.calls() - before
+                print(json.dumps(row), flush=True)
+                out.append(row)
+    return out
+
+
+def _app_env(fake: FakeBallDontLie, db_dir: str, args) -> dict[str, str]:
+    return {
+        "BALLDONTLIE_API_KEY": "bench",
+        "BALLDONTLIE_BASE": fake.url,
+        "DB_DIR": db_dir,
+        "BDL_REQUESTS_PER_MINUTE": str(args.rpm),
+        # scheduled refreshes would add upstream calls unrelated to the scenario
+        "REFRESH_SCHEDULER": "false",
+    }
+
+
+def _inprocess(fake: FakeBallDontLie, args) -> list[dict]:
+    from werkzeug.serving import make_server
+
+    db_dir = tempfile.mkdtemp(prefix="bench-inproc-")
+    os.environ.update(_app_env(fake, db_dir, args))
+    sys.path.insert(0, SRC)
+    from app import create_app  # env is read at import time
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no per-request access log
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        return _run_target("inprocess", f"http://127.0.0.1:{server.server_port}", fake, args)
+    finally:
+        server.shutdown()
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+def _wait_healthy(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn did not become healthy")
+
+
+def _gunicorn(fake: FakeBallDontLie, args) -> list[dict]:
+    if shutil.which("gunicorn") is None:
+        print("gunicorn not on PATH, skipping the gunicorn target", file=sys.stderr)
+        return []
+    db_dir = tempfile.mkdtemp(prefix="bench-gunicorn-")
+    port = _free_port()
+    proc = subprocess.Popen(
+        [
+            "gunicorn", "-k", "gthread", "--threads", str(args.threads), "-w", "1",
+            "-b", f"127.0.0.1:{port}", "--chdir", SRC, "app:create_app()",
+        ],
+        env={**os.environ, **_app_env(fake, db_dir, args)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_healthy(url, proc)
+        return _run_target("gunicorn", url, fake, args)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _commit() -> tuple[str, bool]:
+    def git(*a: str) -> str:
+        return subprocess.run(["git", *a], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return git("rev-parse", "--short", "HEAD") or "unknown", bool(git("status", "--porcelain", "--", "src"))
+
+
+def compare(base_path: str, head_path: str) -> None:
+    """Print one JSON line per scenario present in both files: head vs base."""
+    def rows(path: str) -> dict[tuple, dict]:
+        with open(path) as f:
+            doc = json.load(f)
+        return {(r["target"], r["endpoint"], r["scenario"]): r for r in doc["results"]}
+
+    base, head = rows(base_path), rows(head_path)
+    for key in sorted(base.keys() & head.keys()):
+        b, h = base[key], head[key]
+        print(json.dumps({
+            "target": key[0], "endpoint": key[1], "scenario": key[2],
+            **{
+                f"{m}_change_pct": round((h[m] - b[m]) / b[m] * 100, 1) if b[m] else None
+                for m in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+            },
+            "upstream_calls": [b["upstream_calls"], h["upstream_calls"]],
+        }))
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--target", choices=["inprocess", "gunicorn", "all"], default="inprocess")
+    p.add_argument("--requests", type=int, default=50, help="keys per cold/warm scenario")
+    p.add_argument("--rounds", type=int, default=5, help="concurrent-miss rounds")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--threads", type=int, default=8, help="gunicorn gthread threads")
+    p.add_argument("--rpm", type=int, default=0, help="BDL_REQUESTS_PER_MINUTE for the app (0 = off)")
+    p.add_argument("--latency-ms", type=float, default=0.0)
+    p.add_argument("--jitter-ms", type=float, default=0.0)
+    p.add_argument("--page-size", type=int, default=100)
+    p.add_argument("--min-pages", type=int, default=1)
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--error-codes", default="429,503")
+    p.add_argument("--out", help="results file (default benchmarks/results/<commit>.json)")
+    p.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="diff two results files and exit")
+    args = p.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    fake_cfg = {
+        "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "page_size": args.page_size,
+        "min_pages": args.min_pages, "error_rate": args.error_rate,
+        "error_codes": tuple(int(c) for c in args.error_codes.split(",")),
+    }
+    results = []
+    with FakeBallDontLie(**fake_cfg) as fake:
+        # gunicorn first: the in-process target imports the app into this process
+        if args.target in ("gunicorn", "all"):
+            results += _gunicorn(fake, args)
+        if args.target in ("inprocess", "all"):
+            results += _inprocess(fake, args)
+        injected = dict(fake.errors)
+
+    commit, dirty = _commit()
+    doc = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {
+            **{k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+            "error_codes": list(fake_cfg["error_codes"]),
+        },
+        "injected_errors": injected,
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"wrote {out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
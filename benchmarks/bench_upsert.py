@@ -0,0 +1,82 @@
+"""
+Compare the two games write paths on an in-memory DuckDB.
+
+    python benchmarks/bench_upsert.py            # 1k, 10k, 100k games
+    python benchmarks/bench_upsert.py 5000       # custom sizes
+
+Each size is written twice per path (fresh insert, then full replace) and
+the results are printed as JSON lines. The executemany path runs at roughly
+200 rows/s, so its 100k case alone takes several minutes.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("BALLDONTLIE_API_KEY", "bench")
+
+import duckdb  # noqa: E402
+import app.infra.db as db  # noqa: E402
+from app.repos import games_repo  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def _games(n: int) -> list[dict]:
+    d0 = date(2000, 1, 1)
+    return [
+        {
+            "id": i + 1,
+            "date": (d0 + timedelta(days=i // 12)).isoformat(),
+            "season": 2000 + i // 1230,
+            "period": 4,
+            "status": "Final",
+            "postseason": False,
+            "home_team": {"id": i % 30 + 1, "full_name": f"Team {i % 30 + 1}"},
+            "home_team_score": 100 + i % 20,
+            "visitor_team": {"id": (i + 7) % 30 + 1, "full_name": f"Team {(i + 7) % 30 + 1}"},
+            "visitor_team_score": 95 + i % 25,
+        }
+        for i in range(n)
+    ]
+
+
+def _time(fn, games: list[dict]) -> tuple[float, float]:
+    con = duckdb.connect(":memory:")
+    db._init_schema(con)
+    db._con = con
+    t0 = time.perf_counter()
+    fn(games)
+    insert_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fn(games)
+    replace_s = time.perf_counter() - t0
+    assert con.execute("SELECT count(*) FROM games").fetchone()[0] == len(games)
+    con.close()
+    return insert_s, replace_s
+
+
+def main(sizes: list[int]) -> None:
+    paths = {
+        "executemany": games_repo._upsert_games_executemany,
+        "bulk": games_repo._upsert_games_bulk,
+    }
+    for n in sizes:
+        games = _games(n)
+        for name, fn in paths.items():
+            insert_s, replace_s = _time(fn, games)
+            print(json.dumps({
+                "path": name,
+                "games": n,
+                "insert_s": round(insert_s, 4),
+                "replace_s": round(replace_s, 4),
+                "rows_per_sec": round(n / insert_s),
+            }))
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,246 @@
+"""
+Local stand-in for the BallDontLie API, for benchmarks and offline runs.
+
+    python benchmarks/fake_bdl.py --port 9100 --latency-ms 80 --error-rate 0.05
+
+then point the service at it with BALLDONTLIE_BASE=http://127.0.0.1:9100.
+
+Games are synthetic and deterministic: GAMES_PER_DAY games on every date
+between SEASON_START and SEASON_END, 30 teams. Supported routes are the ones
+the service calls: /teams, /games (dates[], start_date/end_date, team_ids[],
+page/per_page), /games/<id> and /stats (always empty). Every response waits
+`latency_ms` (plus up to `jitter_ms`) first; a fraction `error_rate` of
+requests instead get one of `error_codes` (429s carry `Retry-After: 0`).
+Pages are capped at `page_size` rows, and list responses report at least
+`min_pages` pages so pagination depth can be dialled up independently of
+the data size.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SEASON_START = date(2023, 10, 24)
+SEASON_END = date(2024, 4, 14)
+GAMES_PER_DAY = 8
+TEAM_COUNT = 30
+_ID_BASE = 1_000_000
+
+
+def team(tid: int) -> dict:
+    return {
+        "id": tid,
+        "abbreviation": f"T{tid:02d}",
+        "city": f"City {tid}",
+        "name": f"Team{tid}",
+        "full_name": f"City {tid} Team{tid}",
+        "conference": "East" if tid <= 15 else "West",
+        "division": f"Div{(tid - 1) // 5}",
+    }
+
+
+def game(day: date, k: int) -> dict:
+    """Game `k` (0-based) on `day`; ids, teams and scores are a pure function of both."""
+    n = (day - SEASON_START).days
+    home = (n * 7 + 2 * k) % TEAM_COUNT + 1
+    visitor = (n * 7 + 2 * k + 1) % TEAM_COUNT + 1
+    return {
+        "id": _ID_BASE + n * 100 + k,
+        "date": day.isoformat(),
+        "season": day.year if day.month >= 10 else day.year - 1,
+        "period": 4,
+        "status": "Final",
+        "postseason": False,
+        "time": "Final",
+        "home_team": team(home),
+        "home_team_score": 95 + (n * 13 + k * 7) % 30,
+        "visitor_team": team(visitor),
+        "visitor_team_score": 95 + (n * 11 + k * 5) % 30,
+    }
+
+
+def game_by_id(game_id: int) -> dict | None:
+    n, k = divmod(game_id - _ID_BASE, 100)
+    day = SEASON_START + timedelta(days=n)
+    if game_id < _ID_BASE or k >= GAMES_PER_DAY or day > SEASON_END:
+        return None
+    return game(day, k)
+
+
+def season_dates() -> list[str]:
+    return [
+        (SEASON_START + timedelta(days=i)).isoformat()
+        for i in range((SEASON_END - SEASON_START).days + 1)
+    ]
+
+
+def _games_matching(q: dict[str, list[str]]) -> list[dict]:
+    if "dates[]" in q:
+        days = sorted({date.fromisoformat(d) for d in q["dates[]"]})
+    else:
+        lo = date.fromisoformat(q.get("start_date", [SEASON_START.isoformat()])[0])
+        hi = date.fromisoformat(q.get("end_date", [SEASON_END.isoformat()])[0])
+        days = [lo + timedelta(days=i) for i in range((hi - lo).days + 1)]
+    teams = {int(t) for t in q.get("team_ids[]", [])}
+    out = []
+    for d in days:
+        if not SEASON_START <= d <= SEASON_END:
+            continue
+        for k in range(GAMES_PER_DAY):
+            g = game(d, k)
+            if not teams or g["home_team"]["id"] in teams or g["visitor_team"]["id"] in teams:
+                out.append(g)
+    return out
+
+
+class FakeBallDontLie:
+    """Threaded HTTP server; use as a context manager or call start()/stop()."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        page_size: int = 100,
+        min_pages: int = 1,
+        error_rate: float = 0.0,
+        error_codes: tuple[int, ...] = (429, 503),
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.page_size = page_size
+        self.min_pages = min_pages
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.requests: Counter[str] = Counter()   # route -> requests served (errors included)
+        self.errors: Counter[int] = Counter()     # injected status -> count
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def calls(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def start(self) -> "FakeBallDontLie":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeBallDontLie":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _roll(self) -> tuple[float, int | None]:
+        with self._lock:
+            delay = self.latency_ms + self._rng.random() * self.jitter_ms
+            fail = self._rng.random() < self.error_rate
+            return delay / 1000.0, self._rng.choice(self.error_codes) if fail else None
+
+    def _page(self, rows: list[dict], q: dict[str, list[str]]) -> dict:
+        per_page = min(int(q.get("per_page", ["25"])[0]), self.page_size)
+        page = int(q.get("page", ["1"])[0])
+        total_pages = max(math.ceil(len(rows) / per_page), self.min_pages, 1)
+        return {
+            "data": rows[(page - 1) * per_page:page * per_page],
+            "meta": {"current_page": page, "per_page": per_page, "total_pages": total_pages},
+        }
+
+    def _route(self, path: str, q: dict[str, list[str]]) -> tuple[int, dict]:
+        if path == "/teams":
+            return 200, {"data": [team(t) for t in range(1, TEAM_COUNT + 1)]}
+        if path == "/games":
+            return 200, self._page(_games_matching(q), q)
+        if path.startswith("/games/"):
+            g = game_by_id(int(path.rsplit("/", 1)[1]))
+            return (200, {"data": g}) if g else (404, {"error": "not found"})
+        if path == "/stats":
+            return 200, self._page([], q)
+        return 404, {"error": "not found"}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path.rstrip("/").removeprefix("/v1")
+                route = "/games/<id>" if path.startswith("/games/") else path
+                with fake._lock:
+                    fake.requests[route] += 1
+                delay, fail = fake._roll()
+                time.sleep(delay)
+                headers = {}
+                if fail is not None:
+                    with fake._lock:
+                        fake.errors[fail] += 1
+                    status, body = fail, {"error": "injected"}
+                    if fail == 429:
+                        headers["Retry-After"] = "0"
+                else:
+                    status, body = fake._route(path, parse_qs(url.query))
+                raw = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=9100)
+    p.add_argument("--latency-ms", type=float, default=0.0)
+    p.add_argument("--jitter-ms", type=float, default=0.0)
+    p.add_argument("--page-size", type=int, default=100)
+    p.add_argument("--min-pages", type=int, default=1)
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--error-codes", default="429,503")
+    args = p.parse_args()
+    fake = FakeBallDontLie(
+        args.host, args.port, args.latency_ms, args.jitter_ms, args.page_size, args.min_pages,
+        args.error_rate, tuple(int(c) for c in args.error_codes.split(",")),
+    )
+    print(f"fake BallDontLie on {fake.url}", flush=True)
+    fake.start()
+    try:
+        fake._thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+
+default_args = {
+    "owner": "neals-squad",
+    "retries": 3,
+    "retry_delay": timedelta(minutes=5),
+}
+
+
+def _backfill(start_date: str, end_date: str, **_):
+    # Imported lazily so the scheduler can parse the DAG without app deps.
+    # Runs in-process against DuckDB, so the worker must own the DB file
+    # (API container stopped, or this worker is the designated writer).
+    from src.app.services.backfill_service import backfill
+    report = backfill(start_date, end_date)
+    return {
+        "partitions": len(report),
+        "rows": sum(e["rows"] for e in report),
+        "upstream_calls": sum(e["upstream_calls"] for e in report),
+    }
+
+
+with DAG(
+    dag_id="nba_backfill",
+    default_args=default_args,
+    schedule_interval=None,  # trigger manually with {"start_date": ..., "end_date": ...}
+    start_date=datetime(2025, 1, 1),
+    catchup=False,
+    params={"start_date": "2024-10-01", "end_date": "2025-06-30"},
+) as dag:
+    backfill_range = PythonOperator(
+        task_id="backfill_range",
+        python_callable=_backfill,
+        op_kwargs={
+            "start_date": "{{ params.start_date }}",
+            "end_date": "{{ params.end_date }}",
+        },
+    )
@@ -2,8 +2,49 @@
 set -e
 
 : "${PORT:=8000}"
-: "${WORKERS:=1}"          # force single process
 : "${THREADS:=8}"          # concurrency via threads
+: "${SERVING_MODE:=single}" # single | split
+
+# Every gunicorn process (writer included) writes its metrics here; /metrics
+# sums them. Cleared on start so counters from a previous run don't linger.
+: "${PROMETHEUS_MULTIPROC_DIR:=/tmp/prometheus}"
+export PROMETHEUS_MULTIPROC_DIR
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+if [ "$SERVING_MODE" = "split" ]; then
+  # One writer process owns nba.duckdb (loopback only) and publishes snapshots;
+  # the public workers open them read-only and forward cache misses to it.
+  # Readers can't serve misses without the writer, so if either gunicorn
+  # exits, the other is stopped and the container exits with it.
+  : "${WRITER_PORT:=8001}"
+  : "${WORKERS:=$(nproc)}"
+  DB_MODE=writer gunicorn \
+    -k gthread --threads "$THREADS" \
+    -w 1 -b "127.0.0.1:$WRITER_PORT" \
+    --access-logfile - \
+    "src.app:create_app()" &
+  WRITER_PID=$!
+
+  DB_MODE=reader WRITER_URL="http://127.0.0.1:$WRITER_PORT" gunicorn \
+    -k gthread --threads "$THREADS" \
+    -w "$WORKERS" -b "0.0.0.0:$PORT" \
+    --access-logfile - \
+    "src.app:create_app()" &
+  READER_PID=$!
+
+  STOPPING=0
+  trap 'STOPPING=1; kill -TERM "$WRITER_PID" "$READER_PID" 2>/dev/null' INT TERM
+  while kill -0 "$WRITER_PID" 2>/dev/null && kill -0 "$READER_PID" 2>/dev/null; do
+    sleep 1
+  done
+  [ "$STOPPING" = 1 ] || echo "a gunicorn master exited; stopping the service" >&2
+  kill -TERM "$WRITER_PID" "$READER_PID" 2>/dev/null || true
+  wait || true
+  [ "$STOPPING" = 1 ] && exit 0
+  exit 1
+fi
+
+: "${WORKERS:=1}"          # single mode: DuckDB allows one read-write process
 
 exec gunicorn \
   -k gthread --threads "$THREADS" \
@@ -1,20 +1,47 @@
+import atexit
 from flask import Flask
 from .routes import bp as api_bp
 from .repos.teams_repo import hydrate_teams_if_needed
-from .config import BALLDONTLIE_API_KEY  # triggers validation at import time
+from .repos import rollups_repo
+from .config import api_key
 from .exceptions import ConfigError
+from .infra.http_client import close_client
+from .infra import db, replica, timing
+from . import internal
+from .services import refresh_service
 
 def create_app():
     app = Flask(__name__)
     app.register_blueprint(api_bp)
 
+    # Per-request `request` events (timing spans, profiles) as JSON lines
+    timing.configure_logging()
+
     # Validate config (API key) at app startup
     try:
-        _ = BALLDONTLIE_API_KEY  # Access forces load and validation
+        api_key()
     except ConfigError as e:
         app.logger.critical(f"Startup failed due to config error: {e}")
         raise  # Let it crash and exit container
 
+    # Release pooled upstream connections when the worker exits
+    atexit.register(close_client)
+
+    # Single-writer mode: own the DB, serve forwarded misses, publish snapshots
+    if db.DB_MODE == "writer":
+        app.register_blueprint(internal.bp)
+        db.publish_snapshot()
+        replica.start_snapshot_publisher(replica.SNAPSHOT_INTERVAL)
+
+    # Databases from before the rollups existed get them built once
+    if not db.READ_ONLY:
+        rollups_repo.ensure_built()
+
+    # Keep today/yesterday and live games fresh off the request path
+    # (only where writes happen: the single rw process or the split-mode writer)
+    if not db.READ_ONLY and refresh_service.REFRESH_SCHEDULER:
+        refresh_service.start_scheduler()
+
     # Warm team cache (idempotent)
     try:
         hydrate_teams_if_needed()
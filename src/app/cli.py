@@ -0,0 +1,106 @@
+"""
+Command-line entry points.
+
+    python -m src.app.cli backfill --season 2024
+    python -m src.app.cli backfill --start 2025-01-01 --end 2025-01-31 --workers 8
+    python -m src.app.cli box-scores --season 2024
+    python -m src.app.cli replay
+    python -m src.app.cli archive-prune
+
+DuckDB allows one read-write process, so stop the API container first.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+
+from .services.backfill_service import (
+    DEFAULT_PARTITION_DAYS,
+    DEFAULT_WORKERS,
+    backfill,
+    season_range,
+)
+from .services.player_stats_service import load_box_scores
+from .services.replay_service import replay
+from .infra import raw_archive
+
+
+def _range(args: argparse.Namespace) -> tuple[str, str] | None:
+    if args.season is not None:
+        return season_range(args.season)
+    if args.start and args.end:
+        return args.start, args.end
+    print(f"{args.command} needs --season or both --start and --end", file=sys.stderr)
+    return None
+
+
+def _cmd_backfill(args: argparse.Namespace) -> int:
+    span = _range(args)
+    if span is None:
+        return 2
+    start, end = span
+
+    report = backfill(start, end, partition_days=args.partition_days, workers=args.workers)
+    for entry in report:
+        print(json.dumps(entry))
+
+    rows = sum(e["rows"] for e in report)
+    calls = sum(e["upstream_calls"] for e in report)
+    print(f"backfill {start}..{end}: {len(report)} partitions, {rows} rows, {calls} upstream calls",
+          file=sys.stderr)
+    return 0
+
+
+def _cmd_box_scores(args: argparse.Namespace) -> int:
+    span = _range(args)
+    if span is None:
+        return 2
+    start, end = span
+    rows = load_box_scores(start, end)
+    print(f"box-scores {start}..{end}: {rows} player lines", file=sys.stderr)
+    return 0
+
+
+def _cmd_replay(args: argparse.Namespace) -> int:
+    print(json.dumps(replay()))
+    return 0
+
+
+def _cmd_archive_prune(args: argparse.Namespace) -> int:
+    print(json.dumps(raw_archive.prune()))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="nba-api")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bf = sub.add_parser("backfill", help="hydrate a season or date range into DuckDB")
+    bf.add_argument("--season", type=int, help="season start year, e.g. 2024 for 2024-25")
+    bf.add_argument("--start", help="YYYY-MM-DD")
+    bf.add_argument("--end", help="YYYY-MM-DD")
+    bf.add_argument("--partition-days", type=int, default=DEFAULT_PARTITION_DAYS)
+    bf.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    bf.set_defaults(func=_cmd_backfill)
+
+    bs = sub.add_parser("box-scores", help="load player box scores for a season or date range")
+    bs.add_argument("--season", type=int, help="season start year, e.g. 2024 for 2024-25")
+    bs.add_argument("--start", help="YYYY-MM-DD")
+    bs.add_argument("--end", help="YYYY-MM-DD")
+    bs.set_defaults(func=_cmd_box_scores)
+
+    rp = sub.add_parser("replay", help="rebuild DuckDB from the raw response archive (no network)")
+    rp.set_defaults(func=_cmd_replay)
+
+    ap = sub.add_parser("archive-prune", help="delete archived response bodies nothing refers to any more")
+    ap.set_defaults(func=_cmd_archive_prune)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,5 +7,9 @@ def get_env_var(key: str) -> str:
         raise ConfigError(f"Missing required environment variable: {key}")
     return value
 
-# Validate essential config at import time
-BALLDONTLIE_API_KEY = get_env_var("BALLDONTLIE_API_KEY")
+def api_key() -> str:
+    """
+    The BallDontLie API key, validated on use: the API and any command that
+    calls upstream need it, offline commands (replay, archive-prune) don't.
+    """
+    return get_env_var("BALLDONTLIE_API_KEY")
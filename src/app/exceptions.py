@@ -1,4 +1,13 @@
 class ConfigError(Exception):
     """Raised when essential environment variables are missing or misconfigured."""
     pass
-    
\ No newline at end of file
+
+
+class ReadOnlyDatabaseError(Exception):
+    """Raised when a read-only worker tries to write to DuckDB."""
+    pass
+
+
+class HydrationTooLargeError(Exception):
+    """Raised when a request would need more upstream pulls than are made inline."""
+    pass
@@ -0,0 +1,69 @@
+# src/app/infra/background.py
+from __future__ import annotations
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+
+# Upstream refreshes running at once outside a request (scheduler + stale-while-revalidate)
+REFRESH_MAX_CONCURRENCY = int(os.getenv("REFRESH_MAX_CONCURRENCY", "4"))
+
+log = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """
+    Bounded pool for refreshes nobody waits on. At most `workers` run at
+    once, and a key already queued or running is not submitted again, so the
+    backlog is bounded by the number of distinct keys. Failures are logged
+    and dropped; the next stale read or scheduled tick will try again.
+    """
+
+    def __init__(self, workers: int = REFRESH_MAX_CONCURRENCY):
+        self.workers = workers
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_pid: int | None = None
+        self._inflight: set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # caller holds the lock; a forked worker builds its own threads
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="refresh")
+            self._pool_pid = os.getpid()
+            self._inflight.clear()
+        return self._pool
+
+    def submit(self, key: Hashable, fn: Callable[[], object]) -> bool:
+        """Queue `fn` unless `key` is already pending; True if it was queued."""
+        with self._lock:
+            pool = self._executor()
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+        pool.submit(self._run, key, fn)
+        return True
+
+    def _run(self, key: Hashable, fn: Callable[[], object]) -> None:
+        try:
+            fn()
+        except Exception:
+            log.exception("background refresh %r failed", key)
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Block until nothing is queued or running (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self.pending():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
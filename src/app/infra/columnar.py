@@ -0,0 +1,74 @@
+# src/app/infra/columnar.py
+from __future__ import annotations
+import os
+from typing import Iterator
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from . import timing
+
+# Rows per Arrow record batch pulled from DuckDB (and per Parquet row group)
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "65536"))
+
+MIMETYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain()."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        b = bytes(data)
+        self._chunks.append(b)
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def encode(reader: pa.RecordBatchReader, fmt: str) -> Iterator[bytes]:
+    """
+    Re-encode a stream of Arrow record batches as an Arrow IPC stream or a
+    Parquet file, yielding bytes after every batch. Nothing is converted to
+    Python rows and at most one batch is held in memory.
+    """
+    sink = _ChunkSink()
+    if fmt == "arrow":
+        writer = ipc.new_stream(sink, reader.schema)
+    elif fmt == "parquet":
+        writer = pq.ParquetWriter(sink, reader.schema, compression="zstd")
+    else:
+        raise ValueError(f"unknown export format: {fmt}")
+
+    with writer:
+        for batch in reader:
+            with timing.span("serialize"):
+                if fmt == "parquet":
+                    writer.write_batch(batch, row_group_size=EXPORT_BATCH_ROWS)
+                else:
+                    writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    tail = sink.drain()  # stream end marker / parquet footer
+    if tail:
+        yield tail
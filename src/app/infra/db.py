@@ -1,72 +1,47 @@
 # src/app/infra/db.py
 from __future__ import annotations
 import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
 import duckdb
-from threading import Lock
+from threading import Lock, RLock, local
+from ..exceptions import ReadOnlyDatabaseError
+from .migrations import migrate
 
 _DB_DIR = os.getenv("DB_DIR", "/app/data")
 _DUCK_PATH = os.path.join(_DB_DIR, "nba.duckdb")
 
+# Serving mode:
+# - rw:     this process owns nba.duckdb read-write (single gunicorn worker)
+# - writer: as rw, and publishes read-only snapshots for reader processes
+# - reader: opens the latest snapshot read-only; writes go to the writer
+DB_MODE = os.getenv("DB_MODE", "rw").lower()
+READ_ONLY = DB_MODE == "reader"
+
+_SNAPSHOT_DIR = os.path.join(_DB_DIR, "snapshots")
+_CURRENT = os.path.join(_SNAPSHOT_DIR, "CURRENT")
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", "3"))
+SNAPSHOT_POLL_SECONDS = float(os.getenv("SNAPSHOT_POLL_SECONDS", "1"))
+SNAPSHOT_WAIT_SECONDS = float(os.getenv("SNAPSHOT_WAIT_SECONDS", "30"))
+
+_snapshot_version = 0  # reader: version currently open; writer: last published
+_last_poll = 0.0
+_dirty = False
+# Guards (_snapshot_version, _dirty) together on the writer, without the write lock
+_state_lock = Lock()
+
 _con: duckdb.DuckDBPyConnection | None = None
 _lock = Lock()
 
-DDL_GAMES = """
-CREATE TABLE IF NOT EXISTS games (
-    id INTEGER PRIMARY KEY,         -- balldontlie g["id"]
-    date DATE,                      -- balldontlie g["date"]
-    season INTEGER,
-    period INTEGER,
-    status TEXT,
-    postseason BOOLEAN,
-    home_team_id INTEGER,
-    home_team_name TEXT,
-    home_team_score INTEGER,
-    visitor_team_id INTEGER,
-    visitor_team_name TEXT,
-    visitor_team_score INTEGER
-);
-"""
-
-DDL_TEAMS = """
-CREATE TABLE IF NOT EXISTS teams (
-    id INTEGER PRIMARY KEY,        -- was team_id
-    abbreviation TEXT,
-    city TEXT,
-    name TEXT,
-    full_name TEXT,
-    conference TEXT,
-    division TEXT
-);
-"""
-
-
-DDL_PLAYER_STATS = """
-CREATE TABLE IF NOT EXISTS player_stats (
-    player_id INTEGER,
-    game_id INTEGER,
-    team_id INTEGER,
-    min TEXT,
-    pts INTEGER,
-    reb INTEGER,
-    ast INTEGER,
-    stl INTEGER,
-    blk INTEGER,
-    tov INTEGER,
-    pf INTEGER,
-    fgm INTEGER,
-    fga INTEGER,
-    fg3m INTEGER,
-    ftm INTEGER,
-    fta INTEGER,
-    PRIMARY KEY (player_id, game_id)
-);
-"""
+# One cursor per thread over the shared database, and a single writer at a time
+_local = local()
+_write_lock = RLock()
 
 def _init_schema(conn: duckdb.DuckDBPyConnection) -> None:
-    conn.execute(DDL_GAMES)
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_games_date ON games(date);")
-    conn.execute(DDL_TEAMS)
-    conn.execute(DDL_PLAYER_STATS)
+    """Bring this database up to the current schema (see infra/migrations.py)."""
+    migrate(conn)
 
 def get_con() -> duckdb.DuckDBPyConnection:
     global _con
@@ -75,7 +50,200 @@ def get_con() -> duckdb.DuckDBPyConnection:
     with _lock:
         if _con is not None:
             return _con
+        if READ_ONLY:
+            current = _wait_for_current(1, SNAPSHOT_WAIT_SECONDS)
+            _open_snapshot(*current)
+            return _con
         os.makedirs(_DB_DIR, exist_ok=True)
         _con = duckdb.connect(_DUCK_PATH)
         _init_schema(_con)
         return _con
+
+
+def _read_current() -> tuple[int, str] | None:
+    """(version, file name) of the latest published snapshot, if any."""
+    try:
+        with open(_CURRENT) as f:
+            version, name = f.read().split()
+    except (FileNotFoundError, ValueError):
+        return None
+    return int(version), name
+
+
+def _wait_for_current(version: int, timeout: float) -> tuple[int, str]:
+    deadline = time.monotonic() + timeout
+    while True:
+        current = _read_current()
+        if current and current[0] >= version:
+            return current
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"no DuckDB snapshot >= v{version} after {timeout:.0f}s")
+        time.sleep(0.05)
+
+
+def _open_snapshot(version: int, name: str) -> None:
+    """Point this process at a newer snapshot. Threads pick it up on their next cursor()."""
+    global _con, _snapshot_version
+    _con = duckdb.connect(os.path.join(_SNAPSHOT_DIR, name), read_only=True)
+    _snapshot_version = version
+
+
+def _refresh_snapshot() -> None:
+    # Readers check the CURRENT pointer at most once per SNAPSHOT_POLL_SECONDS
+    global _last_poll
+    now = time.monotonic()
+    if now - _last_poll < SNAPSHOT_POLL_SECONDS:
+        return
+    _last_poll = now
+    current = _read_current()
+    if current and current[0] > _snapshot_version:
+        with _lock:
+            if current[0] > _snapshot_version:
+                _open_snapshot(*current)
+
+
+def data_generation() -> int:
+    """Changes whenever this process starts reading a different snapshot (readers only)."""
+    return _snapshot_version if READ_ONLY else 0
+
+
+def wait_for_snapshot(version: int, timeout: float = SNAPSHOT_WAIT_SECONDS) -> None:
+    """Reader: block until snapshot `version` (or newer) is published, then switch to it."""
+    if _snapshot_version >= version:
+        return
+    current = _wait_for_current(version, timeout)
+    with _lock:
+        if current[0] > _snapshot_version:
+            _open_snapshot(*current)
+
+
+def publish_snapshot() -> int:
+    """
+    Writer: checkpoint and copy nba.duckdb to a new versioned snapshot, then
+    repoint CURRENT at it atomically. Holding the write lock keeps the copy
+    consistent. Returns the published version.
+    """
+    global _dirty, _snapshot_version
+    with _write_lock:
+        cursor().execute("CHECKPOINT")
+        os.makedirs(_SNAPSHOT_DIR, exist_ok=True)
+        version = max(_snapshot_version, (_read_current() or (0, ""))[0]) + 1
+        name = f"nba.{version}.duckdb"
+        tmp = os.path.join(_SNAPSHOT_DIR, f".{name}.tmp")
+        shutil.copyfile(_DUCK_PATH, tmp)
+        os.replace(tmp, os.path.join(_SNAPSHOT_DIR, name))
+        with open(f"{_CURRENT}.tmp", "w") as f:
+            f.write(f"{version} {name}\n")
+        os.replace(f"{_CURRENT}.tmp", _CURRENT)
+        with _state_lock:
+            _snapshot_version, _dirty = version, False
+
+    # Readers that still hold an older file keep it open after unlink
+    for old in range(max(1, version - 10), version - SNAPSHOT_KEEP + 1):
+        try:
+            os.remove(os.path.join(_SNAPSHOT_DIR, f"nba.{old}.duckdb"))
+        except FileNotFoundError:
+            pass
+    return version
+
+
+def publish_snapshot_if_dirty() -> int:
+    """Writer: publish only if something was committed since the last snapshot."""
+    return publish_snapshot() if _dirty else _snapshot_version
+
+
+def pending_snapshot_version() -> int:
+    """
+    Writer: the first snapshot version that will contain everything committed
+    so far (the next one if there are unpublished writes). A publish in
+    progress holds the write lock, so it includes every earlier commit.
+    """
+    with _state_lock:
+        return _snapshot_version + 1 if _dirty else _snapshot_version
+
+
+def cursor() -> duckdb.DuckDBPyConnection:
+    """
+    This thread's cursor on the shared database. A DuckDBPyConnection keeps one
+    pending result, so threads must never share a handle; cursors from
+    con.cursor() share the database and run queries in parallel.
+    """
+    if READ_ONLY:
+        _refresh_snapshot()
+    root = get_con()
+    cur = getattr(_local, "cursor", None)
+    if cur is None or _local.root is not root:
+        cur = root.cursor()
+        _local.cursor, _local.root, _local.depth = cur, root, 0
+    return cur
+
+
+@contextmanager
+def read():
+    """Scoped read handle (this thread's cursor)."""
+    yield cursor()
+
+
+@contextmanager
+def stream():
+    """
+    Private cursor for a result consumed lazily (e.g. record batches streamed to
+    a client across many yields), so the thread's shared cursor stays free.
+    Closed when the block exits.
+    """
+    if READ_ONLY:
+        _refresh_snapshot()
+    cur = get_con().cursor()
+    try:
+        yield cur
+    finally:
+        cur.close()
+
+
+@contextmanager
+def write():
+    """
+    Scoped write handle: one writer at a time across threads, wrapped in a
+    transaction. Nested write() blocks on the same thread join the outer one.
+    Readers can't write; hydration is forwarded to the writer instead.
+    """
+    global _dirty
+    if READ_ONLY:
+        raise ReadOnlyDatabaseError("this worker opened DuckDB read-only (DB_MODE=reader)")
+    with _write_lock:
+        cur = cursor()
+        if _local.depth:
+            _local.depth += 1
+            try:
+                yield cur
+            finally:
+                _local.depth -= 1
+            return
+
+        _local.depth = 1
+        cur.execute("BEGIN TRANSACTION")
+        try:
+            yield cur
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        else:
+            cur.execute("COMMIT")
+            with _state_lock:
+                _dirty = True
+        finally:
+            _local.depth = 0
+
+
+@contextmanager
+def registered(conn: duckdb.DuckDBPyConnection, batch, prefix: str = "batch"):
+    """
+    Expose a DataFrame/Arrow batch to SQL under a unique view name for the
+    duration of the block (unique so concurrent writers don't collide).
+    """
+    name = f"{prefix}_{uuid.uuid4().hex}"
+    conn.register(name, batch)
+    try:
+        yield name
+    finally:
+        conn.unregister(name)
@@ -1,34 +1,211 @@
 # src/app/infra/http_client.py
 from __future__ import annotations
+import importlib.util
 import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
+from . import metrics, raw_archive, timing
+from .rate_limit import TokenBucket
+from ..config import api_key
 
 BALLDONTLIE_BASE = os.getenv("BALLDONTLIE_BASE", "https://api.balldontlie.io/v1")
-BALLDONTLIE_API_KEY = os.getenv("BALLDONTLIE_API_KEY", "")
+
+# Connection pool (shared by every thread in the worker process)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2 = os.getenv("HTTP2", "false").lower() == "true"
+
+# Client-side quota shared by every thread (0 disables it)
+BDL_REQUESTS_PER_MINUTE = int(os.getenv("BDL_REQUESTS_PER_MINUTE", "60"))
+BDL_RATE_BURST = int(os.getenv("BDL_RATE_BURST", "0"))  # 0 -> 10% of the per-minute budget
+BDL_RETRY_AFTER_MAX = float(os.getenv("BDL_RETRY_AFTER_MAX", "120"))
+
+limiter: TokenBucket | None = (
+    TokenBucket(BDL_REQUESTS_PER_MINUTE, BDL_RATE_BURST or None)
+    if BDL_REQUESTS_PER_MINUTE > 0 else None
+)
+
+_client: httpx.Client | None = None
+_client_pid: int | None = None
+_lock = Lock()
+
+# Per-task upstream request counter (see count_calls)
+_call_counter: ContextVar[list[int] | None] = ContextVar("bdl_call_counter", default=None)
+
 
 def _headers():
-    h = {}
-    if BALLDONTLIE_API_KEY:
-        # BallDontLie uses a simple Authorization header for API keys
-        h["Authorization"] = BALLDONTLIE_API_KEY
-    return h
+    # BallDontLie uses a simple Authorization header for API keys; a missing
+    # key fails here, when the first upstream call builds the client
+    return {"Authorization": api_key()}
+
+
+def _http2_available() -> bool:
+    # httpx needs the optional `h2` package for HTTP/2
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_client() -> httpx.Client:
+    """
+    Process-wide keep-alive client. httpx.Client is thread-safe, so all gthread
+    workers share one pool; a forked child builds its own instead of reusing
+    the parent's sockets.
+    """
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            return _client
+        _client = httpx.Client(
+            base_url=BALLDONTLIE_BASE.rstrip("/"),
+            headers=_headers(),
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=HTTP2 and _http2_available(),
+        )
+        _client_pid = os.getpid()
+        return _client
+
+
+def close_client() -> None:
+    """Close the shared pool (called on app shutdown)."""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+@contextmanager
+def count_calls():
+    """
+    Count upstream requests (including retries) made inside the block:
+
+        with count_calls() as calls:
+            fetch_games_for_range(...)
+        print(calls[0])
+
+    Work fanned out to other threads is included when submitted under
+    contextvars.copy_context() (fetch_all_pages does this).
+    """
+    counter = [0]
+    token = _call_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _call_counter.reset(token)
+
+
+def tokens_remaining() -> float | None:
+    """
+    Requests we can still make before the client-side limiter starts blocking.
+    Long-running jobs (backfills) can poll this to slow down early.
+    None when rate limiting is disabled.
+    """
+    return limiter.remaining() if limiter else None
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, seconds), BDL_RETRY_AFTER_MAX)
+
 
 def _should_retry(exc: Exception) -> bool:
-    # Retry only on connection issues / 5xx – not on 4xx like your 403
+    # Retry on connection issues / 429 / 5xx – not on other 4xx like your 403
     if isinstance(exc, httpx.HTTPStatusError):
-        return 500 <= exc.response.status_code < 600
+        code = exc.response.status_code
+        return code == 429 or 500 <= code < 600
     return isinstance(exc, (httpx.ConnectError, httpx.ReadTimeout))
 
+
+_backoff = wait_exponential(multiplier=0.5, min=0.5, max=4)
+
+
+def _wait(retry_state) -> float:
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+        if limiter is not None:
+            return 0.0  # limiter already holds every thread until Retry-After
+        return _retry_after_seconds(exc.response) or _backoff(retry_state)
+    return _backoff(retry_state)
+
+
+def _record_retry(retry_state) -> None:
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError):
+        reason = str(exc.response.status_code)
+    else:
+        reason = type(exc).__name__
+    path = retry_state.args[0] if retry_state.args else retry_state.kwargs.get("path", "")
+    metrics.UPSTREAM_RETRIES.labels(metrics.upstream_path(path), reason).inc()
+
+
+def _backoff_sleep(seconds: float) -> None:
+    with timing.span("bdl_wait"):
+        time.sleep(seconds)
+
+
 @retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=0.5, min=0.5, max=4),
+    wait=_wait,
     retry=retry_if_exception(_should_retry),
+    before_sleep=_record_retry,
+    sleep=_backoff_sleep,
     reraise=True,
 )
 def get(path: str, params: dict | None = None) -> dict:
-    url = f"{BALLDONTLIE_BASE.rstrip('/')}/{path.lstrip('/')}"
-    with httpx.Client(timeout=10.0) as client:
-        r = client.get(url, headers=_headers(), params=params or {})
-        r.raise_for_status()
-        return r.json()
+    if limiter is not None:
+        with timing.span("bdl_wait"):
+            limiter.acquire()
+    counter = _call_counter.get()
+    if counter is not None:
+        counter[0] += 1
+    label, page = metrics.upstream_path(path), metrics.page_label(params)
+    t0 = time.perf_counter()
+    status = "error"  # transport failure: no response at all
+    archived = raw_archive.lookup(path, params) if raw_archive.RAW_ARCHIVE else None
+    try:
+        r = get_client().get(
+            f"/{path.lstrip('/')}", params=params or {}, headers=raw_archive.conditional_headers(archived)
+        )
+        status = str(r.status_code)
+    finally:
+        elapsed = time.perf_counter() - t0
+        timing.add("bdl", elapsed)
+        metrics.UPSTREAM_SECONDS.labels(label, page).observe(elapsed)
+        metrics.UPSTREAM_REQUESTS.labels(label, page, status).inc()
+    if r.status_code == 429 and limiter is not None:
+        retry_after = _retry_after_seconds(r)
+        limiter.pause(retry_after if retry_after is not None else 60.0 / max(1, BDL_REQUESTS_PER_MINUTE))
+    if r.status_code == 304 and archived is not None:
+        # unchanged upstream: serve the archived body
+        raw_archive.touch(archived)
+        return raw_archive.load(archived)
+    r.raise_for_status()
+    payload = r.json()
+    if raw_archive.RAW_ARCHIVE:
+        raw_archive.store(path, params, r.content, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    return payload
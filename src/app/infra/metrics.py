@@ -0,0 +1,127 @@
+# src/app/infra/metrics.py
+"""
+Prometheus metrics, served at /metrics.
+
+Under gunicorn each worker is its own process. When PROMETHEUS_MULTIPROC_DIR
+is set (entrypoint.sh sets it), every process writes its samples to mmapped
+files in that directory, and /metrics sums them across all processes, the
+split-mode writer included. Without it (tests, a single dev server) samples
+live in the default in-process registry.
+"""
+from __future__ import annotations
+import os
+import re
+import time
+from functools import wraps
+from typing import Callable, TypeVar
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from . import timing
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Page labels past this are folded into "<N>+" to bound label cardinality
+MAX_PAGE_LABEL = 10
+
+_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to build a response, by route template",
+    ["route", "method", "status"],
+)
+UPSTREAM_REQUESTS = Counter(
+    "bdl_requests", "BallDontLie requests (each retry counts)", ["path", "page", "status"],
+)
+UPSTREAM_SECONDS = Histogram(
+    "bdl_request_duration_seconds", "BallDontLie request latency", ["path", "page"],
+)
+UPSTREAM_RETRIES = Counter(
+    "bdl_retries", "BallDontLie requests retried, by cause", ["path", "reason"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "duckdb_query_duration_seconds", "Time spent in each repo function", ["function"],
+    buckets=_QUERY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups", "Cache lookups by cache and result (hit/miss)", ["cache", "result"],
+)
+ROWS_UPSERTED = Counter(
+    "rows_upserted", "Rows written by upserts", ["table"],
+)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+F = TypeVar("F", bound=Callable)
+
+
+def upstream_path(path: str) -> str:
+    """'/games/123' -> '/games/<id>', so ids don't become label values."""
+    return _ID_SEGMENT.sub("/<id>", "/" + path.lstrip("/"))
+
+
+def page_label(params: dict | None) -> str:
+    params = params or {}
+    if "cursor" in params:
+        return "cursor"
+    page = int(params.get("page", 1))
+    return str(page) if page <= MAX_PAGE_LABEL else f"{MAX_PAGE_LABEL}+"
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def timed(fn: F) -> F:
+    """
+    Record a repo function's wall time under duckdb_query_duration_seconds
+    and as the request's `db` timing span.
+    """
+    child = DB_QUERY_SECONDS.labels(f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}")
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - t0
+            child.observe(elapsed)
+            timing.add("db", elapsed)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def instrument(scaffold) -> None:
+    """Time every request handled by a Flask app or blueprint."""
+
+    @scaffold.before_request
+    def _start_timer():
+        g.metrics_t0 = time.perf_counter()
+
+    @scaffold.after_request
+    def _observe(response):
+        t0 = g.pop("metrics_t0", None)
+        if t0 is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_SECONDS.labels(route, request.method, str(response.status_code)).observe(
+                time.perf_counter() - t0
+            )
+        return response
+
+
+def render() -> tuple[bytes, str]:
+    """Current samples in the Prometheus text format, summed over workers if multiprocess."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,229 @@
+# src/app/infra/migrations.py
+"""
+One-time, ordered schema migrations.
+
+Each migration runs once per database file, inside its own transaction (or
+several, split at COMMIT_POINT), and is recorded in `schema_migrations`. To change the schema, append a new entry
+to MIGRATIONS; never edit one that has shipped.
+"""
+from __future__ import annotations
+import logging
+import duckdb
+
+log = logging.getLogger(__name__)
+
+DDL_SCHEMA_MIGRATIONS = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT,
+    applied_at TIMESTAMP
+);
+"""
+
+# Marks the end of one transaction within a migration: statements before it are
+# committed before the rest run. Only safe where the earlier part is idempotent.
+COMMIT_POINT = "-- commit"
+
+# 1: everything that used to be created ad hoc at startup. Written to be
+# idempotent, because databases from before migrations already have some of it.
+# DuckDB can't add columns to a table with an index, hence the drop/recreate;
+# the drops must commit before the ALTERs run, or DuckDB aborts the process on
+# a file-backed database.
+_BASELINE = (
+    "DROP INDEX IF EXISTS idx_games_date;",
+    "DROP INDEX IF EXISTS idx_player_stats_team_game;",
+    "DROP INDEX IF EXISTS idx_player_stats_date;",
+    COMMIT_POINT,
+    """
+    CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY,         -- balldontlie g["id"]
+        date DATE,                      -- balldontlie g["date"]
+        season INTEGER,
+        period INTEGER,
+        status TEXT,
+        postseason BOOLEAN,
+        home_team_id INTEGER,
+        home_team_name TEXT,
+        home_team_score INTEGER,
+        visitor_team_id INTEGER,
+        visitor_team_name TEXT,
+        visitor_team_score INTEGER,
+        fetched_at TIMESTAMP            -- when we last pulled this row upstream
+    );
+    """,
+    "ALTER TABLE games ADD COLUMN IF NOT EXISTS fetched_at TIMESTAMP;",
+    "CREATE INDEX IF NOT EXISTS idx_games_date ON games(date);",
+    """
+    CREATE TABLE IF NOT EXISTS teams (
+        id INTEGER PRIMARY KEY,
+        abbreviation TEXT,
+        city TEXT,
+        name TEXT,
+        full_name TEXT,
+        conference TEXT,
+        division TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS player_stats (
+        player_id INTEGER,
+        game_id INTEGER,
+        team_id INTEGER,
+        player_name TEXT,
+        game_date DATE,                 -- denormalised from the game so ranges need no join
+        min TEXT,
+        pts INTEGER,
+        reb INTEGER,
+        ast INTEGER,
+        stl INTEGER,
+        blk INTEGER,
+        tov INTEGER,
+        pf INTEGER,
+        fgm INTEGER,
+        fga INTEGER,
+        fg3m INTEGER,
+        fg3a INTEGER,
+        ftm INTEGER,
+        fta INTEGER,
+        fetched_at TIMESTAMP,
+        PRIMARY KEY (player_id, game_id)
+    );
+    """,
+    "ALTER TABLE player_stats ADD COLUMN IF NOT EXISTS player_name TEXT;",
+    "ALTER TABLE player_stats ADD COLUMN IF NOT EXISTS game_date DATE;",
+    "ALTER TABLE player_stats ADD COLUMN IF NOT EXISTS fg3a INTEGER;",
+    "ALTER TABLE player_stats ADD COLUMN IF NOT EXISTS fetched_at TIMESTAMP;",
+    "CREATE INDEX IF NOT EXISTS idx_player_stats_team_game ON player_stats(team_id, game_id);",
+    "CREATE INDEX IF NOT EXISTS idx_player_stats_date ON player_stats(game_date);",
+    """
+    CREATE TABLE IF NOT EXISTS coverage (
+        team_id INTEGER,                -- scope: team id, 0 = whole date, -1 = box scores
+        date DATE,
+        hydrated_at TIMESTAMP,
+        game_count INTEGER,             -- games seen for this scope; 0 = known-empty date
+        PRIMARY KEY (team_id, date)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS game_misses (
+        game_id INTEGER PRIMARY KEY,    -- ids upstream did not return
+        checked_at TIMESTAMP
+    );
+    """,
+    # Rollups of Final games, maintained by games_repo.upsert_games
+    """
+    CREATE TABLE IF NOT EXISTS team_day (
+        team_id INTEGER,
+        date DATE,
+        postseason BOOLEAN,
+        season INTEGER,
+        games INTEGER,                  -- almost always 1: a team plays once a day
+        wins INTEGER,
+        pts INTEGER,
+        opp_pts INTEGER,
+        home_games INTEGER,
+        home_wins INTEGER,
+        home_pts INTEGER,
+        away_games INTEGER,
+        away_wins INTEGER,
+        away_pts INTEGER,
+        PRIMARY KEY (team_id, date, postseason)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_team_day_date ON team_day(date);",
+    """
+    CREATE TABLE IF NOT EXISTS team_season (
+        team_id INTEGER,
+        season INTEGER,
+        postseason BOOLEAN,
+        games INTEGER,
+        wins INTEGER,
+        pts INTEGER,
+        opp_pts INTEGER,
+        home_games INTEGER,
+        home_wins INTEGER,
+        away_games INTEGER,
+        away_wins INTEGER,
+        PRIMARY KEY (team_id, season, postseason)
+    );
+    """,
+)
+
+# 2: one row per team per game, kept in sync by games_repo.upsert_games
+_TEAM_GAMES = (
+    """
+    CREATE TABLE team_games (
+        team_id INTEGER,
+        game_id INTEGER,
+        date DATE,
+        season INTEGER,
+        postseason BOOLEAN,
+        is_home BOOLEAN,
+        opponent_id INTEGER,
+        status TEXT,
+        pts INTEGER,
+        opp_pts INTEGER,
+        won BOOLEAN,                    -- NULL until the game is Final with both scores
+        PRIMARY KEY (team_id, game_id)
+    );
+    """,
+    """
+    INSERT INTO team_games
+    SELECT * FROM (
+        SELECT home_team_id, id, date, season, coalesce(postseason, FALSE), TRUE, visitor_team_id,
+               status, home_team_score, visitor_team_score,
+               CASE WHEN lower(coalesce(status, '')) LIKE 'final%'
+                    THEN home_team_score > visitor_team_score END
+        FROM games
+        UNION ALL
+        SELECT visitor_team_id, id, date, season, coalesce(postseason, FALSE), FALSE, home_team_id,
+               status, visitor_team_score, home_team_score,
+               CASE WHEN lower(coalesce(status, '')) LIKE 'final%'
+                    THEN visitor_team_score > home_team_score END
+        FROM games
+    )
+    ORDER BY 1, 3;
+    """,
+    "CREATE INDEX idx_team_games_team_date ON team_games(team_id, date);",
+    "CREATE INDEX idx_team_games_game ON team_games(game_id);",
+)
+
+# 3: upsert_teams used to create this at every load; the primary key already
+# enforces it, and a leftover index would block later ALTERs on teams
+_DROP_UX_TEAMS_ID = (
+    "DROP INDEX IF EXISTS ux_teams_id;",
+)
+
+MIGRATIONS: list[tuple[int, str, tuple[str, ...]]] = [
+    (1, "baseline", _BASELINE),
+    (2, "team_games", _TEAM_GAMES),
+    (3, "drop_ux_teams_id", _DROP_UX_TEAMS_ID),
+]
+
+
+def migrate(conn: duckdb.DuckDBPyConnection) -> list[int]:
+    """Apply every migration this database hasn't seen yet; returns their versions."""
+    conn.execute(DDL_SCHEMA_MIGRATIONS)
+    done = {v for (v,) in conn.execute("SELECT version FROM schema_migrations").fetchall()}
+    applied = []
+    for version, name, statements in MIGRATIONS:
+        if version in done:
+            continue
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            for sql in statements:
+                if sql == COMMIT_POINT:
+                    conn.execute("COMMIT")
+                    conn.execute("BEGIN TRANSACTION")
+                else:
+                    conn.execute(sql)
+            conn.execute(
+                "INSERT INTO schema_migrations VALUES (?, ?, current_timestamp)", [version, name]
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        log.info("applied schema migration %d (%s)", version, name)
+        applied.append(version)
+    return applied
@@ -0,0 +1,97 @@
+# src/app/infra/profiler.py
+"""
+Opt-in sampling profiler for slow requests (PROFILE_SLOW_MS > 0).
+
+While it is on, one background thread samples the stack of every thread that
+is serving a request, every PROFILE_INTERVAL_MS. When a request finishes
+slower than PROFILE_SLOW_MS, its samples are written to PROFILE_DIR in folded
+format: one `root;caller;callee count` line per distinct stack. flamegraph.pl,
+speedscope and inferno read that format directly. Faster requests are
+discarded. With the profiler off, begin()/end() return at once.
+"""
+from __future__ import annotations
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))  # 0 disables profiling
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/profiles")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def fold(frame) -> str:
+    """A frame's stack, outermost call first, joined with ';'."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class Sampler:
+    """Samples the stacks of registered threads from one daemon thread."""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._stacks: dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def watch(self, thread_id: int) -> None:
+        with self._lock:
+            self._stacks[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, thread_id: int) -> Counter:
+        with self._lock:
+            return self._stacks.pop(thread_id, Counter())
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval_s)
+            with self._lock:
+                if not self._stacks:
+                    continue
+                frames = sys._current_frames()
+                for tid, stacks in self._stacks.items():
+                    frame = frames.get(tid)
+                    if frame is not None:
+                        stacks[fold(frame)] += 1
+
+
+_sampler = Sampler(PROFILE_INTERVAL_MS / 1000)
+
+
+def begin() -> None:
+    """Start sampling the calling thread (no-op unless profiling is on)."""
+    if PROFILE_SLOW_MS > 0:
+        _sampler.watch(threading.get_ident())
+
+
+def end(duration_ms: float, label: str) -> str | None:
+    """
+    Stop sampling the calling thread. If the request took at least
+    PROFILE_SLOW_MS, write its folded stacks and return the file path.
+    """
+    if PROFILE_SLOW_MS <= 0:
+        return None
+    stacks = _sampler.unwatch(threading.get_ident())
+    if duration_ms < PROFILE_SLOW_MS or not stacks:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")
+    path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{os.getpid()}-{slug}-{int(duration_ms)}ms.folded")
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    return path
@@ -0,0 +1,52 @@
+# src/app/infra/rate_limit.py
+from __future__ import annotations
+import time
+from threading import Lock
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Refills at `per_minute / 60` tokens per second up
+    to `burst` tokens. `pause()` drains the bucket and blocks every caller until
+    the given deadline (used when upstream answers 429 with Retry-After).
+    """
+
+    def __init__(self, per_minute: int, burst: int | None = None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst else max(1, per_minute // 10))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def remaining(self) -> float:
+        """Tokens available right now (0 while paused)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return 0.0
+            return self._tokens
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, now + max(0.0, seconds))
@@ -0,0 +1,173 @@
+# src/app/infra/raw_archive.py
+"""
+On-disk archive of raw BallDontLie responses.
+
+Every successful upstream GET is kept as the exact response bytes,
+gzip-compressed and stored under the SHA-256 of those bytes, so identical
+bodies are stored once:
+
+    <RAW_ARCHIVE_DIR>/blobs/ab/ab12....json.gz
+    <RAW_ARCHIVE_DIR>/index/cd/cd34....json   <- one per request key
+
+The request key is the SHA-256 of the path plus normalized params (sorted
+keys, sorted multi-values), so the same request always maps to one index
+entry, holding its latest response and that response's validators
+(ETag / Last-Modified) for conditional revalidation. The archive lives next
+to the database but outside it, so it survives `make nuke` and schema
+changes; `cli replay` rebuilds DuckDB from it offline.
+
+A refetch that gets a new body repoints its index entry, leaving the old blob
+unreferenced; `cli archive-prune` deletes those.
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from typing import Iterator
+
+RAW_ARCHIVE = os.getenv("RAW_ARCHIVE", "true").lower() == "true"
+RAW_ARCHIVE_DIR = os.getenv("RAW_ARCHIVE_DIR", os.path.join(os.getenv("DB_DIR", "/app/data"), "raw"))
+# Unreferenced blobs younger than this are kept: store() writes the blob
+# before the index entry that points at it
+PRUNE_GRACE_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class Entry:
+    path: str
+    params: dict[str, list[str]]
+    blob: str                    # sha256 of the raw body
+    fetched_at: str              # ISO-8601 UTC, when the body was last confirmed upstream
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+def normalize_params(params: dict | None) -> dict[str, list[str]]:
+    """Every value as a sorted list of strings, keys sorted, None dropped."""
+    out: dict[str, list[str]] = {}
+    for k in sorted(params or {}):
+        v = params[k]
+        if v is None:
+            continue
+        values = v if isinstance(v, (list, tuple, set)) else [v]
+        out[k] = sorted(str(x) for x in values)
+    return out
+
+
+def request_key(path: str, params: dict | None) -> str:
+    canonical = json.dumps(["/" + path.lstrip("/"), normalize_params(params)], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(RAW_ARCHIVE_DIR, "blobs", digest[:2], f"{digest}.json.gz")
+
+
+def _index_path(key: str) -> str:
+    return os.path.join(RAW_ARCHIVE_DIR, "index", key[:2], f"{key}.json")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def lookup(path: str, params: dict | None) -> Entry | None:
+    try:
+        with open(_index_path(request_key(path, params))) as f:
+            entry = Entry(**json.load(f))
+    except FileNotFoundError:
+        return None
+    # a blob pruned mid-store just means fetching the body again
+    return entry if os.path.exists(_blob_path(entry.blob)) else None
+
+
+def store(
+    path: str,
+    params: dict | None,
+    body: bytes,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> Entry:
+    """Archive a response body (skipped if this exact body is already stored) and index it."""
+    digest = hashlib.sha256(body).hexdigest()
+    blob = _blob_path(digest)
+    try:
+        os.utime(blob)  # already stored: mark it recently used, so prune() leaves it alone
+    except FileNotFoundError:
+        _write_atomic(blob, gzip.compress(body, compresslevel=6))
+    return touch(Entry("/" + path.lstrip("/"), normalize_params(params), digest, "", etag, last_modified))
+
+
+def touch(entry: Entry) -> Entry:
+    """Record that `entry` was just (re)confirmed upstream, e.g. by a 304."""
+    fresh = replace(entry, fetched_at=datetime.now(timezone.utc).isoformat())
+    _write_atomic(_index_path(request_key(fresh.path, fresh.params)), json.dumps(asdict(fresh)).encode())
+    return fresh
+
+
+def conditional_headers(entry: Entry | None) -> dict[str, str]:
+    if entry is None:
+        return {}
+    headers = {}
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def load(entry: Entry) -> dict:
+    with gzip.open(_blob_path(entry.blob), "rb") as f:
+        return json.loads(f.read())
+
+
+def entries() -> Iterator[Entry]:
+    """Every indexed request whose body is on disk, in no particular order."""
+    root = os.path.join(RAW_ARCHIVE_DIR, "index")
+    if not os.path.isdir(root):
+        return
+    for shard in sorted(os.listdir(root)):
+        for name in sorted(os.listdir(os.path.join(root, shard))):
+            if name.endswith(".json"):
+                with open(os.path.join(root, shard, name)) as f:
+                    entry = Entry(**json.load(f))
+                if os.path.exists(_blob_path(entry.blob)):
+                    yield entry
+
+
+def prune(grace_seconds: float = PRUNE_GRACE_SECONDS) -> dict:
+    """Delete blobs no index entry points at. Returns counts and bytes freed."""
+    referenced = {e.blob for e in entries()}
+    root = os.path.join(RAW_ARCHIVE_DIR, "blobs")
+    cutoff = time.time() - grace_seconds
+    kept = removed = freed = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            if name.removesuffix(".json.gz") in referenced:
+                kept += 1
+                continue
+            try:
+                st = os.stat(path)
+                if st.st_mtime > cutoff:
+                    kept += 1
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += st.st_size
+    return {"blobs_kept": kept, "blobs_removed": removed, "bytes_freed": freed}
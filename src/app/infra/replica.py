@@ -0,0 +1,114 @@
+# src/app/infra/replica.py
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable
+import httpx
+from . import db, timing
+from .singleflight import SingleFlight
+
+# Where read-only workers send cache misses (DB_MODE=reader)
+WRITER_URL = os.getenv("WRITER_URL", "http://127.0.0.1:8001")
+WRITER_TIMEOUT = float(os.getenv("WRITER_TIMEOUT", "120"))
+# How often the writer publishes snapshots of background writes
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "5"))
+# Minimum gap between snapshots; forwarded hydrations inside it share one copy
+SNAPSHOT_MIN_INTERVAL = float(os.getenv("SNAPSHOT_MIN_INTERVAL", "0.5"))
+
+log = logging.getLogger(__name__)
+
+_OPS: dict[str, Callable[..., Any]] = {}
+_client: httpx.Client | None = None
+_lock = threading.Lock()
+# Set when a reader is waiting on unpublished writes
+_snapshot_wanted = threading.Event()
+# Readers that miss on the same thing at once share one run on the writer
+_flights = SingleFlight()
+
+
+def writer_op(name: str):
+    """
+    Mark a hydration function as writer-side. In rw/writer mode it runs
+    in-process. In a read-only worker the call (JSON-serialisable positional
+    args only) is forwarded to the writer, and we wait for the snapshot that
+    contains its writes before returning the writer's result.
+    """
+    def deco(fn):
+        _OPS[name] = fn
+
+        @wraps(fn)
+        def wrapper(*args):
+            with timing.span("hydrate"):
+                if not db.READ_ONLY:
+                    return fn(*args)
+                return forward(name, list(args))
+        return wrapper
+    return deco
+
+
+def run_op(name: str, args: list) -> Any:
+    """Writer side of a forwarded call; identical concurrent calls run once."""
+    if name not in _OPS:
+        raise KeyError(f"unknown writer op: {name}")
+    return _flights.do((name, json.dumps(args)), lambda: _OPS[name](*args))
+
+
+def _writer_client() -> httpx.Client:
+    global _client
+    with _lock:
+        if _client is None:
+            _client = httpx.Client(base_url=WRITER_URL, timeout=WRITER_TIMEOUT)
+        return _client
+
+
+def forward(name: str, args: list) -> Any:
+    r = _writer_client().post("/internal/hydrate", json={"op": name, "args": args})
+    r.raise_for_status()
+    body = r.json()
+    db.wait_for_snapshot(int(body["version"]))
+    return body["result"]
+
+
+def request_snapshot() -> int:
+    """
+    Writer: ask the publisher for a snapshot soon, and return the version that
+    will contain everything committed so far (what a reader should wait for).
+    """
+    version = db.pending_snapshot_version()
+    _snapshot_wanted.set()
+    return version
+
+
+def start_snapshot_publisher(
+    interval: float,
+    min_interval: float = SNAPSHOT_MIN_INTERVAL,
+    stop: threading.Event | None = None,
+) -> threading.Thread:
+    """
+    Writer: publish a snapshot when a forwarded call asks for one, or every
+    `interval` seconds for other writes (backfills, scheduled refreshes), and
+    never more than once per `min_interval`. Requests arriving in between are
+    coalesced, so a burst of reader misses costs one copy of the database.
+    """
+    stop = stop or threading.Event()
+
+    def loop():
+        last = time.monotonic()
+        while True:
+            _snapshot_wanted.wait(interval)
+            if stop.wait(max(0.0, last + min_interval - time.monotonic())):
+                return
+            _snapshot_wanted.clear()
+            try:
+                db.publish_snapshot_if_dirty()
+            except Exception:
+                log.exception("snapshot publish failed")
+            last = time.monotonic()
+
+    t = threading.Thread(target=loop, name="snapshot-publisher", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,117 @@
+# src/app/infra/response_cache.py
+from __future__ import annotations
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Hashable, Iterable
+from .metrics import cache_lookup
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str          # strong validator: hash of the exact body bytes
+    expires: float
+    tags: frozenset
+    generation: int
+
+
+class ResponseCache:
+    """
+    Bounded, thread-safe cache of serialized responses.
+    - LRU eviction past `maxsize`, and entries expire after `ttl` seconds.
+    - Entries carry tags (e.g. ("date", "2025-04-01"), ("game", 123)) so a
+      write can drop exactly the responses it affects.
+    - `generation` lets a caller invalidate everything at once (e.g. when a
+      read-only worker switches to a newer DuckDB snapshot).
+    - A `name` reports hits and misses as cache_lookups{cache=name}.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = RESPONSE_CACHE_SIZE,
+        ttl: float = RESPONSE_CACHE_TTL,
+        name: str | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._by_tag: dict[Hashable, set[Hashable]] = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable, generation: int = 0) -> CachedResponse | None:
+        entry = self._get(key, generation)
+        if self.name:
+            cache_lookup(self.name, entry is not None)
+        return entry
+
+    def _get(self, key: Hashable, generation: int) -> CachedResponse | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.monotonic() or entry.generation != generation:
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def put(
+        self,
+        key: Hashable,
+        body: bytes,
+        tags: Iterable[Hashable] = (),
+        generation: int = 0,
+        ttl: float | None = None,
+    ) -> CachedResponse:
+        """Store a body; `ttl` can only shorten the cache-wide TTL."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        entry = CachedResponse(
+            body=body,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            expires=time.monotonic() + ttl,
+            tags=frozenset(tags),
+            generation=generation,
+        )
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = entry
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._drop(next(iter(self._data)))
+        return entry
+
+    def invalidate(self, tags: Iterable[Hashable]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._by_tag.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _drop(self, key: Hashable) -> None:
+        # caller holds the lock
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
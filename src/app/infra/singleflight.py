@@ -0,0 +1,54 @@
+# src/app/infra/singleflight.py
+from __future__ import annotations
+from threading import Event, Lock
+from typing import Callable, Hashable, TypeVar
+from . import timing
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+    The first caller (leader) runs `fn`; callers arriving while it is in flight
+    wait and receive the same result (or exception). Nothing is cached once the
+    call finishes.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            with timing.span("flight_wait"):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -0,0 +1,129 @@
+# src/app/infra/timing.py
+"""
+Request-scoped timing spans.
+
+Hot paths wrap their work in `span(name)` (or report a measured duration
+with `add(name, seconds)`). While a request is in flight the time is summed
+per name and then:
+- sent as a `Server-Timing` header (spans finished before the headers go out),
+- logged as one structured `request` event when the response closes
+  (streamed bodies included).
+
+Spans are inclusive and may overlap. `hydrate` contains the `bdl` and `db`
+time spent inside it, and concurrent page fetches add up past wall time.
+`total` is the wall time of the request.
+"""
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Iterator
+import structlog
+from flask import request
+from . import profiler
+
+log = structlog.get_logger("app.request")
+
+
+class Timings:
+    """Per-request accumulator; shared by worker threads spawned under copy_context()."""
+
+    __slots__ = ("start", "spans", "_lock")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: dict[str, list] = {}   # name -> [seconds, count]
+        self._lock = Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            acc = self.spans.setdefault(name, [0.0, 0])
+            acc[0] += seconds
+            acc[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def header(self) -> str:
+        with self._lock:
+            parts = [
+                f'{name};dur={secs * 1000:.1f};desc="{count}x"'
+                for name, (secs, count) in self.spans.items()
+            ]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                name: {"ms": round(secs * 1000, 1), "count": count}
+                for name, (secs, count) in self.spans.items()
+            }
+
+
+_current: ContextVar[Timings | None] = ContextVar("request_timings", default=None)
+
+
+def add(name: str, seconds: float) -> None:
+    t = _current.get()
+    if t is not None:
+        t.add(name, seconds)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    t = _current.get()
+    if t is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        t.add(name, time.perf_counter() - t0)
+
+
+def configure_logging() -> None:
+    """One JSON object per line on stdout (what the log shipper expects)."""
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.JSONRenderer(),
+        ],
+        logger_factory=structlog.PrintLoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+
+
+def instrument(scaffold) -> None:
+    """Time every request handled by a Flask app or blueprint."""
+
+    @scaffold.before_request
+    def _begin():
+        _current.set(Timings())
+        profiler.begin()
+
+    @scaffold.after_request
+    def _finish(response):
+        t = _current.get()
+        if t is None:
+            return response
+        response.headers["Server-Timing"] = t.header()
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        method, path, status = request.method, request.full_path.rstrip("?"), response.status_code
+
+        def _log():
+            total = t.elapsed()
+            profile = profiler.end(total * 1000, f"{method} {route}")
+            _current.set(None)
+            log.info(
+                "request",
+                method=method, route=route, path=path, status=status,
+                duration_ms=round(total * 1000, 1), spans=t.as_dict(),
+                **({"profile": profile} if profile else {}),
+            )
+
+        response.call_on_close(_log)
+        return response
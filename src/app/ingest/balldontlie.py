@@ -1,30 +1,85 @@
 from __future__ import annotations
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from datetime import date, timedelta
+import httpx
 from ..infra.http_client import get
 
+PER_PAGE = 100
+# Upper bound on concurrent page requests per paginated fetch
+PAGE_WORKERS = int(os.getenv("BDL_PAGE_WORKERS", "4"))
+
+
+def _data(payload) -> list[dict]:
+    return payload.get("data", []) if isinstance(payload, dict) else []
+
+
+def _meta(payload) -> dict:
+    return (payload.get("meta") or {}) if isinstance(payload, dict) else {}
+
+
+def fetch_all_pages(path: str, params: dict) -> list[dict]:
+    """
+    Fetch every page of a paginated BDL endpoint, merged in page order.
+    Page 1 is fetched first; if it reports meta.total_pages the rest are pulled
+    concurrently (at most PAGE_WORKERS at a time). Cursor-paginated responses
+    (meta.next_cursor) can only be followed one after another.
+    """
+    base = {**params, "per_page": PER_PAGE}
+    first = get(path, params={**base, "page": 1})
+    out = list(_data(first))
+    meta = _meta(first)
+
+    total_pages = int(meta.get("total_pages", 1) or 1)
+    if total_pages > 1:
+        pages = range(2, total_pages + 1)
+        # each page runs in a copy of the caller's context (call counters etc.)
+        contexts = [copy_context() for _ in pages]
+        with ThreadPoolExecutor(max_workers=min(PAGE_WORKERS, len(pages))) as pool:
+            # map() yields in submission order, so pages stay in sequence
+            for payload in pool.map(
+                lambda p, ctx: ctx.run(get, path, params={**base, "page": p}), pages, contexts
+            ):
+                out.extend(_data(payload))
+        return out
+
+    cursor = meta.get("next_cursor")
+    while cursor:
+        payload = get(path, params={**base, "cursor": cursor})
+        out.extend(_data(payload))
+        cursor = _meta(payload).get("next_cursor")
+    return out
+
+
+def fetch_games_for_range(start_date: str, end_date: str, team_ids: list[int] | None = None) -> list[dict]:
+    """
+    Fetch all games between [start_date, end_date] inclusive, optionally limited
+    to several teams at once (repeated team_ids[]), in one paginated call.
+    """
+    params: dict = {"start_date": start_date, "end_date": end_date}
+    if team_ids:
+        params["team_ids[]"] = list(team_ids)
+    return fetch_all_pages("/games", params)
+
+
+def fetch_games_for_dates(dates: list[str], team_ids: list[int] | None = None) -> list[dict]:
+    """
+    Fetch all games on several (not necessarily contiguous) dates in one
+    paginated call, via repeated dates[] (optionally team_ids[]).
+    """
+    params: dict = {"dates[]": list(dates)}
+    if team_ids:
+        params["team_ids[]"] = list(team_ids)
+    return fetch_all_pages("/games", params)
+
+
 def fetch_games_for_team_range(team_id: int, start_date: str, end_date: str) -> list[dict]:
     """
     Fetch all games for a team between [start_date, end_date] inclusive,
     using BDL's range params (single paginated call).
     """
-    params = {
-        "team_ids[]": team_id,
-        "start_date": start_date,
-        "end_date": end_date,
-        "per_page": 100,
-        "page": 1,
-    }
-    out: list[dict] = []
-    while True:
-        payload = get("/games", params=params)
-        data = payload.get("data", []) if isinstance(payload, dict) else []
-        out.extend(data)
-        meta = payload.get("meta", {}) if isinstance(payload, dict) else {}
-        total_pages = int(meta.get("total_pages", 1) or 1)
-        if params["page"] >= total_pages:
-            break
-        params["page"] += 1
-    return out
+    return fetch_games_for_range(start_date, end_date, [team_id])
 
 
 def fetch_all_teams() -> list[dict]:
@@ -36,17 +91,7 @@ def fetch_all_teams() -> list[dict]:
 
 def fetch_games_for_team_on_date(team_id: int, yyyy_mm_dd: str) -> list[dict]:
     # Use BDL's date filter (no TZ work), plus team filter
-    params = {"dates[]": yyyy_mm_dd, "team_ids[]": team_id, "per_page": 100, "page": 1}
-    out = []
-    while True:
-        payload = get("/games", params=params)
-        data = payload.get("data", []) if isinstance(payload, dict) else []
-        out.extend(data)
-        meta = payload.get("meta", {}) if isinstance(payload, dict) else {}
-        if not meta or params["page"] >= meta.get("total_pages", 1):
-            break
-        params["page"] += 1
-    return out
+    return fetch_all_pages("/games", {"dates[]": yyyy_mm_dd, "team_ids[]": team_id})
 
 
 def iter_dates_inclusive(start: str, end: str):
@@ -60,20 +105,17 @@ def iter_dates_inclusive(start: str, end: str):
 
 
 def fetch_games_by_date(date_str: str) -> list[dict]:
-    data, page = [], 1
-    while True:
-        payload = get("/games", params={"dates[]": date_str, "per_page": 100, "page": page})
-        data.extend(payload.get("data", []))
-        meta = payload.get("meta", {}) or {}
-        if page >= meta.get("total_pages", 1):
-            break
-        page += 1
-    return data
+    return fetch_all_pages("/games", {"dates[]": date_str})
 
 
 def fetch_game_by_id(game_id: int) -> dict | None:
     """Return a single BDL game object or None if missing/invalid."""
-    payload = get(f"/games/{game_id}")
+    try:
+        payload = get(f"/games/{game_id}")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return None
+        raise
 
     # Some gateways/clients wrap responses under "data"
     if isinstance(payload, dict) and "data" in payload and isinstance(payload["data"], dict):
@@ -90,12 +132,9 @@ def fetch_game_by_id(game_id: int) -> dict | None:
 
 def fetch_player_stats_for_game(game_id: int) -> list[dict]:
     """/stats supports filtering with game_ids[] and paginates."""
-    data, page = [], 1
-    while True:
-        payload = get("/stats", params={"game_ids[]": game_id, "per_page": 100, "page": page})
-        data.extend(payload.get("data", []))
-        meta = payload.get("meta", {}) or {}
-        if page >= meta.get("total_pages", 1):
-            break
-        page += 1
-    return data
+    return fetch_all_pages("/stats", {"game_ids[]": game_id})
+
+
+def fetch_player_stats_for_range(start_date: str, end_date: str) -> list[dict]:
+    """Every player box-score line for games in [start_date, end_date] inclusive."""
+    return fetch_all_pages("/stats", {"start_date": start_date, "end_date": end_date})
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from flask import Blueprint, request, jsonify
+from .infra import replica
+
+# Only registered on the writer (DB_MODE=writer), which binds to loopback
+bp = Blueprint("internal", __name__, url_prefix="/internal")
+
+
+@bp.post("/hydrate")
+def hydrate():
+    """
+    POST /internal/hydrate  {"op": "<writer op>", "args": [...]}
+    Runs a hydration forwarded by a read-only worker and returns
+    {"result": ..., "version": <snapshot>}, the first snapshot that will hold
+    its writes. The snapshot publisher copies the database shortly after,
+    once for any misses that arrive together.
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        result = replica.run_op(body.get("op", ""), body.get("args") or [])
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"result": result, "version": replica.request_snapshot()}), 200
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import os
+from datetime import date, timedelta
+from ..infra.db import read, write
+from ..infra.metrics import timed
+
+# Scope id for "every game on this date" (a /games?dates[] pull)
+ALL_TEAMS = 0
+# Scope id for "every player box score on this date" (a /stats date-range pull)
+BOX_SCORES = -1
+
+# How long an unknown game id stays negatively cached
+_GAME_MISS_TTL_HOURS = int(os.getenv("GAME_MISS_TTL_HOURS", "24"))
+
+
+def _settled_cutoff() -> date:
+    """
+    Dates before this are treated as settled (scores won't change).
+    Yesterday is excluded too: late tip-offs are still live after midnight UTC.
+    """
+    return date.today() - timedelta(days=1)
+
+
+def is_settled(date_str: str) -> bool:
+    """True if games on this date can no longer change."""
+    return date.fromisoformat(date_str) < _settled_cutoff()
+
+
+def _clamp_settled(start: str, end: str) -> str | None:
+    last = min(date.fromisoformat(end), _settled_cutoff() - timedelta(days=1))
+    if last < date.fromisoformat(start):
+        return None
+    return last.isoformat()
+
+
+@timed
+def missing_spans(
+    start: str,
+    end: str,
+    team_ids: list[int] | None = None,
+    scope: int = ALL_TEAMS,
+) -> list[tuple[str, str]]:
+    """
+    Return the contiguous [lo, hi] date spans inside [start, end] that still
+    need hydrating (gaps-and-islands over the coverage table).
+    - team_ids=None: dates without a whole-date pull.
+    - team_ids=[...]: dates where any of those teams lacks coverage.
+    A whole-date pull counts as coverage for every team. `scope` picks which
+    whole-date ledger to consult (games by default, or BOX_SCORES).
+    """
+    with read() as con:
+        rows = con.execute("""
+            WITH days AS (
+                SELECT CAST(d AS DATE) AS date
+                FROM generate_series(CAST($start AS DATE), CAST($end AS DATE), INTERVAL 1 DAY) t(d)
+            ),
+            wanted AS (
+                SELECT unnest(CAST($team_ids AS INTEGER[])) AS team_id
+            ),
+            missing AS (
+                SELECT date FROM days
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM coverage c WHERE c.team_id = $all AND c.date = days.date
+                )
+                AND (
+                    $team_ids IS NULL
+                    OR EXISTS (
+                        SELECT 1 FROM wanted w
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM coverage c
+                            WHERE c.team_id = w.team_id AND c.date = days.date
+                        )
+                    )
+                )
+            ),
+            islands AS (
+                SELECT date, date - CAST(row_number() OVER (ORDER BY date) AS INTEGER) AS grp
+                FROM missing
+            )
+            SELECT min(date) AS lo, max(date) AS hi
+            FROM islands
+            GROUP BY grp
+            ORDER BY lo
+        """, {"start": start, "end": end, "team_ids": team_ids, "all": scope}).fetchall()
+        return [(lo.isoformat(), hi.isoformat()) for lo, hi in rows]
+
+
+@timed
+def mark_range_covered(
+    start: str,
+    end: str,
+    team_ids: list[int] | None = None,
+    scope: int = ALL_TEAMS,
+) -> None:
+    """
+    Record [start, end] as hydrated (settled dates only), either for the given
+    teams or, with team_ids=None, as whole-date pulls under `scope`.
+    """
+    last = _clamp_settled(start, end)
+    if last is None:
+        return
+    with write() as con:
+        con.execute("""
+            WITH days AS (
+                SELECT CAST(d AS DATE) AS date
+                FROM generate_series(CAST($start AS DATE), CAST($end AS DATE), INTERVAL 1 DAY) t(d)
+            ),
+            scopes AS (
+                SELECT unnest(coalesce(CAST($team_ids AS INTEGER[]), [$all])) AS team_id
+            )
+            INSERT OR REPLACE INTO coverage (team_id, date, hydrated_at, game_count)
+            SELECT
+                s.team_id,
+                days.date,
+                current_timestamp,
+                CASE WHEN s.team_id = $all
+                     THEN (SELECT count(*) FROM games g WHERE g.date = days.date)
+                     ELSE (SELECT count(*) FROM team_games tg
+                           WHERE tg.team_id = s.team_id AND tg.date = days.date)
+                END
+            FROM days CROSS JOIN scopes s
+        """, {"start": start, "end": last, "team_ids": team_ids, "all": scope})
+
+
+@timed
+def is_date_covered(date_str: str) -> bool:
+    """True if every game on this date has been pulled (including zero games)."""
+    with read() as con:
+        row = con.execute(
+            "SELECT 1 FROM coverage WHERE team_id = ? AND date = ?",
+            [ALL_TEAMS, date_str],
+        ).fetchone()
+        return row is not None
+
+
+@timed
+def mark_date_covered(date_str: str, game_count: int) -> None:
+    """Record a whole-date pull and its result count (settled dates only)."""
+    if _clamp_settled(date_str, date_str) is None:
+        return
+    with write() as con:
+        con.execute("""
+            INSERT OR REPLACE INTO coverage (team_id, date, hydrated_at, game_count)
+            VALUES (?, ?, current_timestamp, ?)
+        """, [ALL_TEAMS, date_str, game_count])
+
+
+@timed
+def is_game_known_missing(game_id: int) -> bool:
+    """True if upstream recently had no such game id."""
+    with read() as con:
+        row = con.execute("""
+            SELECT 1 FROM game_misses
+            WHERE game_id = ?
+              AND checked_at > current_timestamp - to_hours(CAST(? AS INTEGER))
+        """, [game_id, _GAME_MISS_TTL_HOURS]).fetchone()
+        return row is not None
+
+
+@timed
+def mark_game_missing(game_id: int) -> None:
+    with write() as con:
+        con.execute(
+            "INSERT OR REPLACE INTO game_misses (game_id, checked_at) VALUES (?, current_timestamp)",
+            [game_id],
+        )
@@ -1,99 +1,477 @@
-from ..infra.db import get_con
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import pandas as pd
+from ..infra.db import read, write, registered, stream
+from ..infra.metrics import timed, ROWS_UPSERTED
+from . import rollups_repo
 
-def _init_schema():
-    con = get_con()
+GAME_COLUMNS = (
+    "id", "date", "season", "period", "status", "postseason",
+    "home_team_id", "home_team_name", "home_team_score",
+    "visitor_team_id", "visitor_team_name", "visitor_team_score",
+)
+
+# Below this many rows a plain executemany beats building a DataFrame
+# (see benchmarks/bench_upsert.py: the crossover is ~3 rows)
+BULK_MIN_ROWS = 3
+
+
+def _game_row(g: dict) -> tuple:
+    return (
+        int(g["id"]),
+        g.get("date"),
+        g.get("season"),
+        g.get("period"),
+        g.get("status"),
+        g.get("postseason", False),
+        g["home_team"]["id"],
+        g["home_team"]["full_name"],
+        g.get("home_team_score"),
+        g["visitor_team"]["id"],
+        g["visitor_team"]["full_name"],
+        g.get("visitor_team_score"),
+    )
+
+
+def games_frame(games: list[dict], fetched_at: list[str | None] | None = None) -> pd.DataFrame:
+    """
+    Flatten BDL game payloads into a typed columnar batch (one row per id;
+    the last payload wins if a game shows up twice across pages).
+    `fetched_at` optionally gives each payload's pull time (ISO-8601).
+    """
+    stamps = fetched_at or [None] * len(games)
+    rows = {int(g["id"]): (*_game_row(g), ts) for g, ts in zip(games, stamps)}
+    cols = list(zip(*rows.values())) if rows else [()] * (len(GAME_COLUMNS) + 1)
+    data = dict(zip((*GAME_COLUMNS, "fetched_at"), cols))
+    return pd.DataFrame({
+        "id": pd.array(data["id"], dtype="Int32"),
+        "date": pd.array(data["date"], dtype="string"),
+        "season": pd.array(data["season"], dtype="Int32"),
+        "period": pd.array(data["period"], dtype="Int32"),
+        "status": pd.array(data["status"], dtype="string"),
+        "postseason": pd.array(data["postseason"], dtype="boolean"),
+        "home_team_id": pd.array(data["home_team_id"], dtype="Int32"),
+        "home_team_name": pd.array(data["home_team_name"], dtype="string"),
+        "home_team_score": pd.array(data["home_team_score"], dtype="Int32"),
+        "visitor_team_id": pd.array(data["visitor_team_id"], dtype="Int32"),
+        "visitor_team_name": pd.array(data["visitor_team_name"], dtype="string"),
+        "visitor_team_score": pd.array(data["visitor_team_score"], dtype="Int32"),
+        "fetched_at": pd.array(data["fetched_at"], dtype="string"),
+    })
+
+
+def _upsert_games_executemany(games: list[dict], fetched_at: list[str | None] | None = None) -> None:
+    stamps = fetched_at or [None] * len(games)
+    with write() as con:
+        con.executemany("""
+            INSERT OR REPLACE INTO games (
+                id, date, season, period, status, postseason,
+                home_team_id, home_team_name, home_team_score,
+                visitor_team_id, visitor_team_name, visitor_team_score, fetched_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, coalesce(CAST(? AS TIMESTAMPTZ), current_timestamp))
+        """, [(*_game_row(g), ts) for g, ts in zip(games, stamps)])
+
+
+def _upsert_games_bulk(games: list[dict], fetched_at: list[str | None] | None = None) -> None:
+    """Register the batch with DuckDB and apply it as one set-based statement."""
+    with write() as con, registered(con, games_frame(games, fetched_at), "games_batch") as view:
+        con.execute(f"""
+            INSERT OR REPLACE INTO games (
+                id, date, season, period, status, postseason,
+                home_team_id, home_team_name, home_team_score,
+                visitor_team_id, visitor_team_name, visitor_team_score, fetched_at
+            )
+            SELECT
+                id, CAST(date AS DATE), season, period, status, coalesce(postseason, FALSE),
+                home_team_id, home_team_name, home_team_score,
+                visitor_team_id, visitor_team_name, visitor_team_score,
+                coalesce(CAST(fetched_at AS TIMESTAMPTZ), current_timestamp)
+            FROM {view}
+        """)
+
+
+# Called as fn(game_ids, dates) after every upsert (e.g. to drop cached responses)
+_upsert_listeners: list[Callable[[list[int], set[str]], None]] = []
+
+
+def on_upsert(fn: Callable[[list[int], set[str]], None]):
+    _upsert_listeners.append(fn)
+    return fn
+
+
+def _sync_team_games(con, ids: list[int]) -> None:
+    """Rewrite the two team_games rows of each game (a game's teams can change)."""
+    params = {"ids": ids}
+    con.execute("DELETE FROM team_games WHERE list_contains(CAST($ids AS INTEGER[]), game_id)", params)
     con.execute("""
-    CREATE TABLE IF NOT EXISTS games (
-        id INTEGER PRIMARY KEY,     -- balldontlie g["id"]
-        date DATE,                  -- balldontlie g["date"]
-        season INTEGER,
-        period INTEGER,
-        status TEXT,
-        postseason BOOLEAN,
-        home_team_id INTEGER,
-        home_team_name TEXT,
-        home_team_score INTEGER,
-        visitor_team_id INTEGER,
-        visitor_team_name TEXT,
-        visitor_team_score INTEGER
-    );
-    """)
-    con.execute("CREATE INDEX IF NOT EXISTS idx_games_date ON games(date);")
-
-
-
-def upsert_games(games: list[dict]):
-    con = get_con()
-    con.executemany("""
-        INSERT OR REPLACE INTO games (
-            id, date, season, period, status, postseason,
-            home_team_id, home_team_name, home_team_score,
-            visitor_team_id, visitor_team_name, visitor_team_score
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, [
-        (
-            int(g["id"]),
-            g.get("date"),
-            g.get("season"),
-            g.get("period"),
-            g.get("status"),
-            g.get("postseason", False),
-            g["home_team"]["id"],
-            g["home_team"]["full_name"],
-            g.get("home_team_score"),
-            g["visitor_team"]["id"],
-            g["visitor_team"]["full_name"],
-            g.get("visitor_team_score"),
-        )
-        for g in games
-    ])
+        INSERT INTO team_games
+        SELECT home_team_id, id, date, season, coalesce(postseason, FALSE), TRUE, visitor_team_id,
+               status, home_team_score, visitor_team_score,
+               CASE WHEN lower(coalesce(status, '')) LIKE 'final%'
+                    THEN home_team_score > visitor_team_score END
+        FROM games WHERE list_contains(CAST($ids AS INTEGER[]), id)
+        UNION ALL
+        SELECT visitor_team_id, id, date, season, coalesce(postseason, FALSE), FALSE, home_team_id,
+               status, visitor_team_score, home_team_score,
+               CASE WHEN lower(coalesce(status, '')) LIKE 'final%'
+                    THEN visitor_team_score > home_team_score END
+        FROM games WHERE list_contains(CAST($ids AS INTEGER[]), id)
+    """, params)
+
+
+@timed
+def cluster_team_games() -> None:
+    """
+    Rewrite team_games in (team_id, date) order. DuckDB prunes row groups by
+    their min/max, so a clustered table turns a team's date range into a scan
+    of a few row groups; run after large backfills.
+    """
+    with write() as con:
+        con.execute("CREATE TEMP TABLE team_games_sorted AS SELECT * FROM team_games ORDER BY team_id, date")
+        try:
+            con.execute("DELETE FROM team_games")
+            con.execute("INSERT INTO team_games SELECT * FROM team_games_sorted")
+        finally:
+            con.execute("DROP TABLE team_games_sorted")
+
+
+@timed
+def upsert_games(games: list[dict], fetched_at: list[str | None] | None = None):
+    """
+    Insert or replace BDL games; batches go through the set-based bulk path.
+    team_games and the team_day / team_season rollups are refreshed in the
+    same transaction for just the games, teams and dates touched (old and
+    new, if a game moved). `fetched_at` (one per game) records when each was
+    pulled upstream, e.g. when replaying archived responses; default is now.
+    """
+    if not games:
+        return
+    ids = [int(g["id"]) for g in games]
+    dates = {str(g["date"])[:10] for g in games if g.get("date")}
+    teams = {g[side]["id"] for g in games for side in ("home_team", "visitor_team")}
+
+    with write() as con:
+        for d, home, visitor in con.execute("""
+            SELECT date, home_team_id, visitor_team_id FROM games
+            WHERE list_contains(CAST($ids AS INTEGER[]), id)
+        """, {"ids": ids}).fetchall():
+            dates.add(d.isoformat())
+            teams.update((home, visitor))
+
+        if len(games) < BULK_MIN_ROWS:
+            _upsert_games_executemany(games, fetched_at)
+        else:
+            _upsert_games_bulk(games, fetched_at)
+        _sync_team_games(con, ids)
+        rollups_repo.refresh(con, sorted(dates), sorted(teams))
+    ROWS_UPSERTED.labels("games").inc(len(games))
+    ROWS_UPSERTED.labels("team_games").inc(2 * len(games))
+    for fn in _upsert_listeners:
+        fn(ids, dates)
+
+
+_STALE_SQL = """
+    SELECT id, home_team_id, visitor_team_id
+    FROM games
+    WHERE {where}
+      AND lower(coalesce(status, '')) NOT LIKE 'final%'
+      AND (
+        fetched_at IS NULL
+        OR fetched_at < current_timestamp - to_seconds(CASE
+            WHEN coalesce(period, 0) > 0 THEN CAST($live_ttl AS BIGINT)
+            ELSE CAST($scheduled_ttl AS BIGINT)
+        END)
+      )
+    ORDER BY id
+"""
 
 
+@timed
+def get_stale_games_by_date(date_str: str, live_ttl: int, scheduled_ttl: int) -> list[dict]:
+    """
+    Non-final games on a date whose row is older than its TTL: `live_ttl`
+    seconds once the game has a period, `scheduled_ttl` before tip-off.
+    Final games are never stale.
+    """
+    with read() as con:
+        cur = con.execute(_STALE_SQL.format(where="date = CAST($key AS DATE)"), {
+            "key": date_str, "live_ttl": live_ttl, "scheduled_ttl": scheduled_ttl,
+        })
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+@timed
+def is_game_stale(game_id: int, live_ttl: int, scheduled_ttl: int) -> bool:
+    with read() as con:
+        row = con.execute(_STALE_SQL.format(where="id = $key"), {
+            "key": game_id, "live_ttl": live_ttl, "scheduled_ttl": scheduled_ttl,
+        }).fetchone()
+        return row is not None
+
+
+@timed
+def get_unfinished_games(since: str) -> list[dict]:
+    """Games on or after `since` that aren't Final yet (live or scheduled)."""
+    with read() as con:
+        cur = con.execute("""
+            SELECT id AS game_id, date, period, status, home_team_id, visitor_team_id
+            FROM games
+            WHERE date >= CAST(? AS DATE)
+              AND lower(coalesce(status, '')) NOT LIKE 'final%'
+            ORDER BY date, id
+        """, [since])
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+@timed
 def get_games_by_date(date_str: str) -> list[dict]:
-    con = get_con()
-    cur = con.execute("""
-        SELECT
-            id AS game_id,
-            date,
-            season,
-            period,
-            status,
-            postseason,
-            home_team_id,
-            home_team_name,
-            home_team_score,
-            visitor_team_id,
-            visitor_team_name,
-            visitor_team_score
-        FROM games
-        WHERE date = ?
-        ORDER BY id ASC
-    """, [date_str])
-    rows = [dict(zip([c[0] for c in cur.description], r)) for r in cur.fetchall()]
-    return rows
+    with read() as con:
+        cur = con.execute("""
+            SELECT
+                id AS game_id,
+                date,
+                season,
+                period,
+                status,
+                postseason,
+                home_team_id,
+                home_team_name,
+                home_team_score,
+                visitor_team_id,
+                visitor_team_name,
+                visitor_team_score
+            FROM games
+            WHERE date = ?
+            ORDER BY id ASC
+        """, [date_str])
+        rows = [dict(zip([c[0] for c in cur.description], r)) for r in cur.fetchall()]
+        return rows
 
 
+@timed
 def get_game(game_id: int) -> dict | None:
-    con = get_con()
-    cur = con.execute("""
+    with read() as con:
+        cur = con.execute("""
+            SELECT
+                id AS game_id,
+                date,
+                season,
+                period,
+                status,
+                postseason,
+                home_team_id,
+                home_team_name,
+                home_team_score,
+                visitor_team_id,
+                visitor_team_name,
+                visitor_team_score
+            FROM games
+            WHERE id = ?
+        """, [game_id])
+        row = cur.fetchone()
+        if not row:
+            return None
+        return dict(zip([c[0] for c in cur.description], row))
+
+
+def _teams_range_query(start: str, end: str, team_ids: list[int] | None) -> tuple[str, dict]:
+    """
+    Counts and win % come from the team_day rollup (one row per team per day).
+    A team plays at most once a day, so each rollup row's points are that
+    game's score and the medians over it are exact; only a team with two games
+    on one day (bad upstream data) falls back to the raw games.
+    """
+    params = {"start": start, "end": end, "team_ids": team_ids}
+    sql = """
+        WITH days AS (
+            SELECT * FROM team_day
+            WHERE date BETWEEN CAST($start AS DATE) AND CAST($end AS DATE)
+              AND ($team_ids IS NULL OR list_contains(CAST($team_ids AS INTEGER[]), team_id))
+        ),
+        agg AS (
+            SELECT
+                team_id,
+                bool_or(games > 1)                               AS multi,
+                median(pts)                                      AS median_score,
+                sum(wins) / sum(games)                           AS win_pct,
+                CAST(sum(games) AS BIGINT)                       AS games_played,
+                median(home_pts)                                 AS home_median_score,
+                sum(home_wins) / nullif(sum(home_games), 0)      AS home_win_pct,
+                CAST(sum(home_games) AS BIGINT)                  AS home_games,
+                median(away_pts)                                 AS away_median_score,
+                sum(away_wins) / nullif(sum(away_games), 0)      AS away_win_pct,
+                CAST(sum(away_games) AS BIGINT)                  AS away_games
+            FROM days
+            GROUP BY team_id
+        ),
+        raw AS (
+            SELECT
+                team_id,
+                median(pts)                            AS median_score,
+                median(pts) FILTER (WHERE is_home)     AS home_median_score,
+                median(pts) FILTER (WHERE NOT is_home) AS away_median_score
+            FROM team_games
+            WHERE team_id IN (SELECT team_id FROM agg WHERE multi)
+              AND date BETWEEN CAST($start AS DATE) AND CAST($end AS DATE)
+              AND won IS NOT NULL
+            GROUP BY team_id
+        ),
+        wanted AS (
+            SELECT unnest(coalesce(CAST($team_ids AS INTEGER[]), (SELECT list(team_id) FROM agg))) AS team_id
+        )
         SELECT
-            id AS game_id,
-            date,
-            season,
-            period,
-            status,
-            postseason,
-            home_team_id,
-            home_team_name,
-            home_team_score,
-            visitor_team_id,
-            visitor_team_name,
-            visitor_team_score
-        FROM games
-        WHERE id = ?
-    """, [game_id])
-    row = cur.fetchone()
-    if not row:
-        return None
-    return dict(zip([c[0] for c in cur.description], row))
+            w.team_id,
+            CASE WHEN a.multi THEN r.median_score ELSE a.median_score END           AS median_score,
+            a.win_pct,
+            coalesce(a.games_played, 0)                                             AS games_played,
+            CASE WHEN a.multi THEN r.home_median_score ELSE a.home_median_score END AS home_median_score,
+            a.home_win_pct,
+            coalesce(a.home_games, 0)                                               AS home_games,
+            CASE WHEN a.multi THEN r.away_median_score ELSE a.away_median_score END AS away_median_score,
+            a.away_win_pct,
+            coalesce(a.away_games, 0)                                               AS away_games
+        FROM wanted w
+        LEFT JOIN agg a USING (team_id)
+        LEFT JOIN raw r USING (team_id)
+        ORDER BY w.team_id
+    """
+    return sql, params
+
+
+@timed
+def get_teams_range_stats(start: str, end: str, team_ids: list[int] | None = None) -> list[dict]:
+    """
+    Aggregate Final games over [start, end] for many teams in one query:
+    overall and home/away median score, win % and game counts per team.
+    - team_ids=[...]: one row per requested team (zero-game teams included).
+    - team_ids=None: one row per team that played in the range.
+    Rows are ordered by team_id.
+    """
+    sql, params = _teams_range_query(start, end, team_ids)
+    with read() as con:
+        cur = con.execute(sql, params)
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+def _batch_reader(cur, batch_rows: int):
+    """
+    Arrow RecordBatchReader over an executed query. to_arrow_reader replaces
+    the deprecated fetch_record_batch (duckdb >= 1.4); older pins only have the latter.
+    """
+    to_reader = getattr(cur, "to_arrow_reader", None)
+    return to_reader(batch_rows) if to_reader is not None else cur.fetch_record_batch(batch_rows)
+
+
+@contextmanager
+def teams_range_stats_reader(start: str, end: str, team_ids: list[int] | None, batch_rows: int):
+    """The get_teams_range_stats report (plus team_name) as Arrow record batches."""
+    sql, params = _teams_range_query(start, end, team_ids)
+    with stream() as con:
+        yield _batch_reader(con.execute(f"""
+            SELECT coalesce(t.full_name, t.name, CAST(s.team_id AS TEXT)) AS team_name, s.*
+            FROM ({sql}) s
+            LEFT JOIN teams t ON t.id = s.team_id
+            ORDER BY s.team_id
+        """, params), batch_rows)
+
+
+_GAMES_RANGE_SQL = """
+    SELECT
+        id AS game_id, date, season, period, status, postseason,
+        home_team_id, home_team_name, home_team_score,
+        visitor_team_id, visitor_team_name, visitor_team_score{extra}
+    FROM games
+    WHERE date BETWEEN CAST($start AS DATE) AND CAST($end AS DATE)
+      AND ($team_ids IS NULL OR id IN (
+          SELECT game_id FROM team_games
+          WHERE list_contains(CAST($team_ids AS INTEGER[]), team_id)
+            AND date BETWEEN CAST($start AS DATE) AND CAST($end AS DATE)
+      ))
+    ORDER BY date, id
+"""
+
+
+@contextmanager
+def games_range_reader(start: str, end: str, team_ids: list[int] | None, batch_rows: int):
+    """Every cached game in [start, end] (optionally for some teams) as Arrow record batches."""
+    with stream() as con:
+        yield _batch_reader(con.execute(
+            _GAMES_RANGE_SQL.format(extra=", fetched_at"),
+            {"start": start, "end": end, "team_ids": team_ids},
+        ), batch_rows)
+
+
+def iter_games_range(start: str, end: str, team_ids: list[int] | None, batch_rows: int) -> Iterator[list[dict]]:
+    """
+    Cached games in [start, end] (optionally for some teams), shaped like
+    get_games_by_date, yielded `batch_rows` at a time from an open cursor.
+    """
+    with stream() as con:
+        cur = con.execute(
+            _GAMES_RANGE_SQL.format(extra=""),
+            {"start": start, "end": end, "team_ids": team_ids},
+        )
+        cols = [c[0] for c in cur.description]
+        while True:
+            rows = cur.fetchmany(batch_rows)
+            if not rows:
+                return
+            yield [dict(zip(cols, r)) for r in rows]
+
+
+@timed
+def get_team_form(start: str, as_of: str, n: int, team_ids: list[int] | None = None) -> list[dict]:
+    """
+    Form of each team over its Final games in [start, as_of], in one windowed
+    query: record, scoring and margin over the last `n` games, the current
+    win/loss streak, and season-to-date averages. Rows are ordered by team_id.
+    """
+    with read() as con:
+        cur = con.execute("""
+            WITH sides AS (
+                SELECT game_id, date, team_id, pts, opp_pts, won
+                FROM team_games
+                WHERE ($team_ids IS NULL OR list_contains(CAST($team_ids AS INTEGER[]), team_id))
+                  AND date BETWEEN CAST($start AS DATE) AND CAST($as_of AS DATE)
+                  AND won IS NOT NULL
+            ),
+            ranked AS (
+                SELECT
+                    *,
+                    row_number() OVER latest AS rn,
+                    first_value(won) OVER latest AS last_won
+                FROM sides
+                WINDOW latest AS (PARTITION BY team_id ORDER BY date DESC, game_id DESC)
+            ),
+            runs AS (
+                -- breaks = 0 while results still match the most recent game: the streak
+                SELECT
+                    *,
+                    sum(CASE WHEN won = last_won THEN 0 ELSE 1 END)
+                        OVER (PARTITION BY team_id ORDER BY rn ROWS UNBOUNDED PRECEDING) AS breaks
+                FROM ranked
+            )
+            SELECT
+                team_id,
+                max(date)                                               AS last_game_date,
+                count(*)                                                AS games_played,
+                count(*) FILTER (WHERE rn <= $n)                        AS last_n_games,
+                count(*) FILTER (WHERE rn <= $n AND won)                AS last_n_wins,
+                count(*) FILTER (WHERE rn <= $n AND NOT won)            AS last_n_losses,
+                round(avg(pts) FILTER (WHERE rn <= $n), 1)              AS last_n_pts,
+                round(avg(opp_pts) FILTER (WHERE rn <= $n), 1)          AS last_n_opp_pts,
+                round(avg(pts - opp_pts) FILTER (WHERE rn <= $n), 1)    AS last_n_margin,
+                CASE WHEN any_value(last_won) THEN 'W' ELSE 'L' END
+                    || count(*) FILTER (WHERE breaks = 0)               AS streak,
+                round(avg(pts), 1)                                      AS season_pts,
+                round(avg(opp_pts), 1)                                  AS season_opp_pts
+            FROM runs
+            GROUP BY team_id
+            ORDER BY team_id
+        """, {"start": start, "as_of": as_of, "n": n, "team_ids": team_ids})
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
@@ -0,0 +1,169 @@
+from __future__ import annotations
+import os
+import pandas as pd
+from ..infra.db import read, write, registered
+from ..infra.metrics import timed, ROWS_UPSERTED
+
+STAT_COLUMNS = (
+    "player_id", "game_id", "team_id", "player_name", "game_date", "min",
+    "pts", "reb", "ast", "stl", "blk", "tov", "pf",
+    "fgm", "fga", "fg3m", "fg3a", "ftm", "fta",
+)
+_COUNTING = STAT_COLUMNS[6:]
+
+# Box scores are ~25 rows per game, so a season is ~30k rows; write them in
+# chunks so one big load doesn't hold the writer lock for the whole batch
+STATS_BATCH_ROWS = int(os.getenv("PLAYER_STATS_BATCH_ROWS", "10000"))
+
+
+def _stat_row(s: dict) -> tuple:
+    player = s.get("player") or {}
+    game = s.get("game") or {}
+    team = s.get("team") or {}
+    name = " ".join(p for p in (player.get("first_name"), player.get("last_name")) if p)
+    return (
+        int(player["id"]),
+        int(game["id"]),
+        team.get("id") or player.get("team_id"),
+        name or None,
+        (game.get("date") or "")[:10] or None,
+        s.get("min"),
+        s.get("pts"),
+        s.get("reb"),
+        s.get("ast"),
+        s.get("stl"),
+        s.get("blk"),
+        s.get("turnover"),
+        s.get("pf"),
+        s.get("fgm"),
+        s.get("fga"),
+        s.get("fg3m"),
+        s.get("fg3a"),
+        s.get("ftm"),
+        s.get("fta"),
+    )
+
+
+def player_stats_frame(stats: list[dict], fetched_at: list[str | None] | None = None) -> pd.DataFrame:
+    """
+    Flatten BDL /stats payloads into a typed columnar batch, one row per
+    (player_id, game_id); the last payload wins on duplicates.
+    `fetched_at` optionally gives each payload's pull time (ISO-8601).
+    """
+    rows = {}
+    for s, ts in zip(stats, fetched_at or [None] * len(stats)):
+        row = _stat_row(s)
+        rows[(row[0], row[1])] = (*row, ts)
+    cols = list(zip(*rows.values())) if rows else [()] * (len(STAT_COLUMNS) + 1)
+    data = dict(zip((*STAT_COLUMNS, "fetched_at"), cols))
+    return pd.DataFrame({
+        "player_id": pd.array(data["player_id"], dtype="Int32"),
+        "game_id": pd.array(data["game_id"], dtype="Int32"),
+        "team_id": pd.array(data["team_id"], dtype="Int32"),
+        "player_name": pd.array(data["player_name"], dtype="string"),
+        "game_date": pd.array(data["game_date"], dtype="string"),
+        "min": pd.array(data["min"], dtype="string"),
+        **{col: pd.array(data[col], dtype="Int32") for col in _COUNTING},
+        "fetched_at": pd.array(data["fetched_at"], dtype="string"),
+    })
+
+
+@timed
+def upsert_player_stats(stats: list[dict], fetched_at: list[str | None] | None = None) -> int:
+    """
+    Insert or replace box-score lines in set-based chunks; returns rows written.
+    `fetched_at` (one per line) records when each was pulled; default is now.
+    """
+    if not stats:
+        return 0
+    frame = player_stats_frame(stats, fetched_at)
+    cols = ", ".join(STAT_COLUMNS)
+    select = ", ".join("CAST(game_date AS DATE)" if c == "game_date" else c for c in STAT_COLUMNS)
+    for lo in range(0, len(frame), STATS_BATCH_ROWS):
+        chunk = frame.iloc[lo:lo + STATS_BATCH_ROWS]
+        with write() as con, registered(con, chunk, "player_stats_batch") as view:
+            con.execute(f"""
+                INSERT OR REPLACE INTO player_stats ({cols}, fetched_at)
+                SELECT {select}, coalesce(CAST(fetched_at AS TIMESTAMPTZ), current_timestamp) FROM {view}
+            """)
+    ROWS_UPSERTED.labels("player_stats").inc(len(frame))
+    return len(frame)
+
+
+@timed
+def get_game_player_stats(game_id: int) -> list[dict]:
+    with read() as con:
+        cur = con.execute(f"""
+            SELECT {", ".join(STAT_COLUMNS)}
+            FROM player_stats
+            WHERE game_id = ?
+            ORDER BY team_id, pts DESC NULLS LAST, player_id
+        """, [game_id])
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+@timed
+def is_box_score_final(game_id: int) -> bool:
+    """
+    True once we hold lines for this game that were pulled after it went
+    Final (lines pulled mid-game are superseded by the final box score).
+    """
+    with read() as con:
+        row = con.execute("""
+            SELECT 1
+            FROM games g
+            JOIN player_stats p ON p.game_id = g.id
+            WHERE g.id = ?
+              AND lower(coalesce(g.status, '')) LIKE 'final%'
+              AND p.fetched_at >= coalesce(g.fetched_at, p.fetched_at)
+            LIMIT 1
+        """, [game_id]).fetchone()
+        return row is not None
+
+
+@timed
+def get_players_range_stats(start: str, end: str, team_ids: list[int] | None = None) -> list[dict]:
+    """
+    Per-player totals, per-game averages and shooting percentages over
+    [start, end], computed in one GROUP BY. Only games a player actually
+    played in (minutes > 0) count towards games_played and the averages.
+    """
+    with read() as con:
+        cur = con.execute("""
+            WITH lines AS (
+                SELECT
+                    *,
+                    coalesce(TRY_CAST(split_part(min, ':', 1) AS DOUBLE), 0)
+                      + coalesce(TRY_CAST(split_part(min, ':', 2) AS DOUBLE), 0) / 60 AS minutes
+                FROM player_stats
+                WHERE game_date BETWEEN CAST($start AS DATE) AND CAST($end AS DATE)
+                  AND ($team_ids IS NULL OR list_contains(CAST($team_ids AS INTEGER[]), team_id))
+            ),
+            played AS (
+                SELECT * FROM lines WHERE minutes > 0
+            )
+            SELECT
+                player_id,
+                arg_max(player_name, game_date) AS player_name,
+                arg_max(team_id, game_date) AS team_id,
+                count(*) AS games_played,
+                round(sum(minutes), 1) AS minutes,
+                sum(pts) AS pts, sum(reb) AS reb, sum(ast) AS ast,
+                sum(stl) AS stl, sum(blk) AS blk, sum(tov) AS tov,
+                round(avg(minutes), 1) AS min_per_game,
+                round(avg(pts), 1) AS pts_per_game,
+                round(avg(reb), 1) AS reb_per_game,
+                round(avg(ast), 1) AS ast_per_game,
+                round(avg(stl), 1) AS stl_per_game,
+                round(avg(blk), 1) AS blk_per_game,
+                round(avg(tov), 1) AS tov_per_game,
+                round(sum(fgm) / nullif(sum(fga), 0), 3) AS fg_pct,
+                round(sum(fg3m) / nullif(sum(fg3a), 0), 3) AS fg3_pct,
+                round(sum(ftm) / nullif(sum(fta), 0), 3) AS ft_pct
+            FROM played
+            GROUP BY player_id
+            ORDER BY pts DESC, player_id
+        """, {"start": start, "end": end, "team_ids": team_ids})
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+import duckdb
+from ..infra.db import read, write
+from ..infra.metrics import timed
+
+# (team, day) cells being refreshed: the cross product of the given teams and dates
+_CELLS = """
+    list_contains(CAST($dates AS DATE[]), date)
+    AND list_contains(CAST($team_ids AS INTEGER[]), team_id)
+"""
+
+
+def _season_keys(con: duckdb.DuckDBPyConnection, params: dict) -> set[tuple]:
+    return set(con.execute(
+        f"SELECT DISTINCT team_id, season, postseason FROM team_day WHERE {_CELLS}", params
+    ).fetchall())
+
+
+@timed
+def refresh(con: duckdb.DuckDBPyConnection, dates: list[str], team_ids: list[int] | None = None) -> None:
+    """
+    Recompute team_day for the affected teams on the affected dates, then
+    team_season for just the (team, season) pairs those days belonged to
+    before or after. Runs on the caller's write handle, inside the upsert's
+    transaction. team_ids=None refreshes every team on those dates.
+    """
+    if not dates:
+        return
+    if team_ids is None:
+        team_ids = [t for (t,) in con.execute("""
+            SELECT team_id FROM team_games WHERE list_contains(CAST($dates AS DATE[]), date)
+            UNION SELECT team_id FROM team_day WHERE list_contains(CAST($dates AS DATE[]), date)
+        """, {"dates": dates}).fetchall()]
+    params = {"dates": dates, "team_ids": team_ids}
+    keys = _season_keys(con, params)
+    con.execute(f"DELETE FROM team_day WHERE {_CELLS}", params)
+    con.execute(f"""
+        INSERT INTO team_day
+        SELECT
+            team_id, date, postseason, any_value(season),
+            count(*),
+            count(*) FILTER (WHERE won),
+            sum(pts), sum(opp_pts),
+            count(*) FILTER (WHERE is_home),
+            count(*) FILTER (WHERE is_home AND won),
+            sum(pts) FILTER (WHERE is_home),
+            count(*) FILTER (WHERE NOT is_home),
+            count(*) FILTER (WHERE NOT is_home AND won),
+            sum(pts) FILTER (WHERE NOT is_home)
+        FROM team_games
+        WHERE {_CELLS} AND won IS NOT NULL
+        GROUP BY team_id, date, postseason
+    """, params)
+    keys |= _season_keys(con, params)
+    if not keys:
+        return
+
+    k_teams, k_seasons, k_post = (list(col) for col in zip(*keys))
+    params = {"team_ids": k_teams, "seasons": k_seasons, "post": k_post}
+    wanted = """
+        SELECT unnest(CAST($team_ids AS INTEGER[])) AS team_id,
+               unnest(CAST($seasons AS INTEGER[])) AS season,
+               unnest(CAST($post AS BOOLEAN[])) AS postseason
+    """
+    con.execute(f"""
+        DELETE FROM team_season s
+        USING ({wanted}) k
+        WHERE s.team_id = k.team_id AND s.season = k.season AND s.postseason = k.postseason
+    """, params)
+    con.execute(f"""
+        INSERT INTO team_season
+        SELECT
+            d.team_id, d.season, d.postseason,
+            sum(games), sum(wins), sum(pts), sum(opp_pts),
+            sum(home_games), sum(home_wins), sum(away_games), sum(away_wins)
+        FROM team_day d
+        JOIN ({wanted}) k USING (team_id, season, postseason)
+        GROUP BY d.team_id, d.season, d.postseason
+    """, params)
+
+
+@timed
+def rebuild() -> None:
+    """Recompute both rollups from scratch (first start on an existing database)."""
+    with write() as con:
+        dates = [d.isoformat() for (d,) in con.execute(
+            "SELECT DISTINCT date FROM games WHERE date IS NOT NULL ORDER BY date"
+        ).fetchall()]
+        con.execute("DELETE FROM team_day")
+        con.execute("DELETE FROM team_season")
+        refresh(con, dates)
+
+
+@timed
+def ensure_built() -> None:
+    """Build the rollups once if games exist but the rollups were never populated."""
+    with read() as con:
+        empty = con.execute("""
+            SELECT NOT EXISTS (SELECT 1 FROM team_day) AND EXISTS (SELECT 1 FROM games)
+        """).fetchone()[0]
+    if empty:
+        rebuild()
+
+
+@timed
+def get_standings(season: int, postseason: bool = False) -> list[dict]:
+    """Season records straight from team_season, best win % first."""
+    with read() as con:
+        cur = con.execute("""
+            SELECT
+                s.team_id,
+                coalesce(t.full_name, t.name, CAST(s.team_id AS TEXT)) AS team_name,
+                t.conference,
+                t.division,
+                s.wins,
+                s.games - s.wins AS losses,
+                round(s.wins / nullif(s.games, 0), 3) AS win_pct,
+                round(s.pts / nullif(s.games, 0), 1) AS pts_per_game,
+                round(s.opp_pts / nullif(s.games, 0), 1) AS opp_pts_per_game,
+                s.home_wins,
+                s.home_games - s.home_wins AS home_losses,
+                s.away_wins,
+                s.away_games - s.away_wins AS away_losses
+            FROM team_season s
+            LEFT JOIN teams t ON t.id = s.team_id
+            WHERE s.season = ? AND s.postseason = ?
+            ORDER BY win_pct DESC, s.wins DESC, s.team_id
+        """, [season, postseason])
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
@@ -1,102 +1,193 @@
 from __future__ import annotations
+from threading import Event, Lock
 from typing import List
-from ..infra.db import get_con
+import pandas as pd
+from ..infra.db import read, write, registered
+from ..infra.metrics import cache_lookup, ROWS_UPSERTED
 from ..ingest.balldontlie import fetch_all_teams
+from ..infra.replica import writer_op
 
 # Simple in-process cache
 _TEAMS_CACHE: dict[int, dict] = {}
-_INDEX: dict[str, set[int]] = {}  # inverted index for quick lookup
 
+# Match tiers, best first
+EXACT, ABBREVIATION, PREFIX, SUBSTRING, FUZZY = range(5)
 
-def _index_team(t: dict):
-    tid = int(t["id"])
-    keys = set()
+# Every substring of every team key -> ids of the teams it matches best
+# (precomputed once, so resolving a query is a dict lookup)
+_MATCHES: dict[str, tuple[int, ...]] = {}
+# (key, team id) pairs for the edit-distance fallback
+_KEYS: tuple[tuple[str, int], ...] = ()
 
-    def add(x: str | None):
-        if not x:
-            return
-        s = x.strip()
-        if not s:
-            return
-        keys.add(s.lower())
+_hydrate_lock = Lock()
+_ready = Event()
 
-    add(str(tid))
-    add(t.get("abbreviation"))
-    add(t.get("name"))       # nickname (e.g., "Celtics")
-    add(t.get("city"))       # city (e.g., "Boston")
-    add(t.get("full_name"))  # "Boston Celtics"
 
-    for k in keys:
-        _INDEX.setdefault(k, set()).add(tid)
+def _norm(x: str | None) -> str:
+    return " ".join((x or "").lower().split())
 
 
-def hydrate_teams_if_needed() -> None:
+def _build_index(teams: list[dict]) -> tuple[dict[str, tuple[int, ...]], tuple[tuple[str, int], ...]]:
     """
-    Ensure teams table is populated and in-process cache is warm.
-    Idempotent. Runs fast.
+    Rank every substring of every team key:
+    full name / nickname / city = EXACT, abbreviation = ABBREVIATION, then
+    PREFIX (of a key or one of its words) and SUBSTRING. Each string keeps only
+    the teams at its best tier.
     """
-    if _TEAMS_CACHE:  # already cached
-        return
+    best: dict[str, dict[int, int]] = {}
+
+    def rank(text: str, tid: int, tier: int):
+        cur = best.setdefault(text, {})
+        if tier < cur.get(tid, FUZZY):
+            cur[tid] = tier
 
-    con = get_con()
-    # If table has rows, read them into cache. Else fetch from API and persist.
-    df = con.execute("SELECT * FROM teams").df()
-    rows = df.to_dict(orient="records") if not df.empty else []
-
-    if not rows:
-        api = fetch_all_teams()
-        if api:
-            # upsert to DB
-            con.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_teams_id ON teams(id);")
-            con.executemany("""
-                INSERT INTO teams (id, abbreviation, city, conference, division, full_name, name)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT (id) DO UPDATE SET
-                  abbreviation=excluded.abbreviation,
-                  city=excluded.city,
-                  conference=excluded.conference,
-                  division=excluded.division,
-                  full_name=excluded.full_name,
-                  name=excluded.name;
-            """, [
-                (int(t["id"]), t.get("abbreviation"), t.get("city"), t.get("conference"),
-                 t.get("division"), t.get("full_name"), t.get("name")) for t in api
-            ])
-            rows = api
-
-    # Build in-memory cache + index
-    for t in rows:
+    keys: set[tuple[str, int]] = set()
+    for t in teams:
         tid = int(t["id"])
-        _TEAMS_CACHE[tid] = t
-        _index_team(t)
+        abbr = _norm(t.get("abbreviation"))
+        named = [k for k in (_norm(t.get(c)) for c in ("full_name", "name", "city")) if k]
+        for key in named:
+            rank(key, tid, EXACT)
+        if abbr:
+            rank(abbr, tid, ABBREVIATION)
+        for key in named + ([abbr] if abbr else []):
+            keys.add((key, tid))
+            for word_start in [0] + [i + 1 for i, ch in enumerate(key) if ch == " "]:
+                for end in range(word_start + 1, len(key) + 1):
+                    rank(key[word_start:end], tid, PREFIX)
+            for i in range(len(key)):
+                for end in range(i + 1, len(key) + 1):
+                    rank(key[i:end], tid, SUBSTRING)
+
+    matches = {}
+    for text, ranked in best.items():
+        top = min(ranked.values())
+        matches[text] = tuple(sorted(tid for tid, tier in ranked.items() if tier == top))
+    return matches, tuple(sorted(keys))
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up (returning limit + 1) once it exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+def _fuzzy(q: str) -> list[int]:
+    """Teams whose key (or a word of it) is closest to `q`, within a small edit budget."""
+    limit = 1 if len(q) <= 4 else 2
+    hits: dict[int, int] = {}
+    for key, tid in _KEYS:
+        for candidate in {key, *key.split()}:
+            d = _edit_distance(q, candidate, limit)
+            if d <= limit and d < hits.get(tid, limit + 1):
+                hits[tid] = d
+    if not hits:
+        return []
+    top = min(hits.values())
+    return sorted(tid for tid, d in hits.items() if d == top)
+
+
+def upsert_teams(api: list[dict]) -> None:
+    """Insert or update BDL team objects."""
+    batch = pd.DataFrame({
+        "id": pd.array([int(t["id"]) for t in api], dtype="Int32"),
+        **{
+            col: pd.array([t.get(col) for t in api], dtype="string")
+            for col in ("abbreviation", "city", "conference", "division", "full_name", "name")
+        },
+    })
+    # upsert to DB
+    with write() as con, registered(con, batch, "teams_batch") as view:
+        con.execute(f"""
+            INSERT INTO teams (id, abbreviation, city, conference, division, full_name, name)
+            SELECT id, abbreviation, city, conference, division, full_name, name FROM {view}
+            ON CONFLICT (id) DO UPDATE SET
+              abbreviation=excluded.abbreviation,
+              city=excluded.city,
+              conference=excluded.conference,
+              division=excluded.division,
+              full_name=excluded.full_name,
+              name=excluded.name;
+        """)
+    ROWS_UPSERTED.labels("teams").inc(len(api))
+
+
+@writer_op("load_teams")
+def _load_teams_from_api() -> list[dict]:
+    """Fetch teams upstream and persist them (runs on the writer)."""
+    api = fetch_all_teams()
+    if not api:
+        return []
+    upsert_teams(api)
+    return api
 
 
-def resolve_team_ids(q: str | None) -> List[int]:
+def hydrate_teams_if_needed() -> None:
     """
-    Accepts id, abbreviation, name, full_name, city (partials OK).
-    Returns a list of matching IDs (usually 1).
+    Ensure teams table is populated and in-process cache is warm.
+    Idempotent and thread-safe: on a cold start one thread loads the teams and
+    builds the index while the others wait for it.
     """
-    hydrate_teams_if_needed()
-    if not q:
-        return []
+    global _MATCHES, _KEYS
+    if _ready.is_set():
+        cache_lookup("teams", True)
+        return
+    with _hydrate_lock:
+        if _ready.is_set():
+            cache_lookup("teams", True)
+            return
+        cache_lookup("teams", False)
+
+        # If table has rows, read them. Else fetch from API and persist.
+        with read() as con:
+            df = con.execute("SELECT * FROM teams").df()
+        rows = df.to_dict(orient="records") if not df.empty else []
+        if not rows:
+            rows = _load_teams_from_api()
+        if not rows:
+            return
+
+        # Publish the index before the cache, and mark ready last
+        _MATCHES, _KEYS = _build_index(rows)
+        _TEAMS_CACHE.update({int(t["id"]): t for t in rows})
+        _ready.set()
+
 
-    ql = q.strip().lower()
+def _resolve_one(q: str) -> list[int]:
     # direct ID?
     try:
         tid = int(q)
         return [tid] if tid in _TEAMS_CACHE else []
     except ValueError:
         pass
+    hit = _MATCHES.get(_norm(q))
+    if hit:
+        return list(hit)
+    return _fuzzy(_norm(q))
 
-    # exact index hit first
-    if ql in _INDEX:
-        return sorted(_INDEX[ql])
 
-    # partials across keys
+def resolve_team_ids(q: str | None) -> List[int]:
+    """
+    Accepts id, abbreviation, name, full_name, city (partials and small typos
+    OK), or several of those separated by commas ("BOS,LAL,NYK").
+    Each term resolves to the teams at its best match tier:
+    exact > abbreviation > prefix > substring > edit distance.
+    Returns the sorted union of matching IDs.
+    """
+    hydrate_teams_if_needed()
+    if not q:
+        return []
     hits: set[int] = set()
-    for key in list(_INDEX.keys()):
-        if ql in key:
-            hits.update(_INDEX[key])
-            if len(hits) >= 8:
-                break
+    for term in q.split(","):
+        if term.strip():
+            hits.update(_resolve_one(term.strip()))
     return sorted(hits)
@@ -1,38 +1,170 @@
 from __future__ import annotations
 
-from flask import Blueprint, request, jsonify, Response
+import os
+from datetime import date as date_cls
+
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
 from .services import games_service
 from .services import stats_service
+from .services import player_stats_service
+from .services import export_service
+from .services import freshness
+from .repos import games_repo
+from .repos.coverage_repo import is_settled
+from .infra import db, metrics, timing
+from .infra.response_cache import ResponseCache, CachedResponse
+from .infra.columnar import MIMETYPES
+from .exceptions import HydrationTooLargeError
 
 bp = Blueprint("api", __name__)
+timing.instrument(bp)
+metrics.instrument(bp)
+
+# Serialized JSON payloads (games, box scores, standings), tagged by date, game id and season
+games_cache = ResponseCache(name="games")
+
+# Rolling form as of a settled date only changes when a backfill or correction
+# touches its season, so it can live much longer (entries are tagged by season)
+FORM_CACHE_TTL = float(os.getenv("FORM_CACHE_TTL", "86400"))
+form_cache = ResponseCache(ttl=FORM_CACHE_TTL, name="form")
+
+# Longest span /games/range serves (a season is ~260 days)
+GAMES_RANGE_MAX_DAYS = int(os.getenv("GAMES_RANGE_MAX_DAYS", "366"))
+
+
+@games_repo.on_upsert
+def _invalidate_games_cache(game_ids: list[int], dates: set[str]) -> None:
+    seasons = [("season", s) for s in {stats_service.season_of(d) for d in dates}]
+    games_cache.invalidate([("game", i) for i in game_ids] + [("date", d) for d in dates] + seasons)
+    form_cache.invalidate(seasons)
+
+
+def _normalize_date(value: str) -> str:
+    try:
+        return date_cls.fromisoformat(value).isoformat()
+    except ValueError:
+        return value
+
+
+def _date_range(start: str | None, end: str | None) -> tuple[str, str]:
+    """Validated, normalized (start, end); ValueError carries the client-facing message."""
+    if not start or not end:
+        raise ValueError("start_date and end_date are required")
+    try:
+        d0, d1 = date_cls.fromisoformat(start), date_cls.fromisoformat(end)
+    except ValueError:
+        raise ValueError("start_date and end_date must be YYYY-MM-DD") from None
+    if d0 > d1:
+        raise ValueError("start_date must not be after end_date")
+    return d0.isoformat(), d1.isoformat()
+
+
+def _ttl(rows: list[dict]) -> float | None:
+    """Cache live/scheduled payloads only as long as their freshest game allows."""
+    ttls = [t for t in (freshness.ttl_for(r) for r in rows) if t is not None]
+    return min(ttls) if ttls else None
+
+
+def _json(payload) -> bytes:
+    with timing.span("serialize"):
+        return jsonify(payload).get_data()
+
+
+def _conditional(entry: CachedResponse) -> Response:
+    """JSON response with a strong ETag; answers If-None-Match with 304."""
+    resp = Response(entry.body, mimetype="application/json")
+    resp.set_etag(entry.etag)
+    return resp.make_conditional(request)
 
 @bp.get("/health")
 def health():
     return jsonify({"status": "ok"}), 200
 
 
+@bp.get("/metrics")
+def prometheus_metrics():
+    """GET /metrics – Prometheus text format, summed over every worker process."""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
 @bp.get("/games")
 def games_for_date():
     """
     GET /games?date=YYYY-MM-DD[&refresh=true|false]
-    - refresh=true  (default): hydrate from BDL, upsert, then return from DuckDB
+    - default: serve from DuckDB, hydrating missing dates and refetching only
+      games that are stale under the freshness policy
+    - refresh=true:  force a refetch of the whole date from BDL
     - refresh=false: return from local cache only
     """
     date = request.args.get("date")
     if not date:
         return jsonify({"error": "date is required (YYYY-MM-DD)"}), 400
 
-    refresh = request.args.get("refresh", "true").lower() != "false"
+    refresh = request.args.get("refresh", "").lower()
+    date = _normalize_date(date)
     try:
-        rows = (
-            games_service.list_games(date)
-            if refresh else games_service.list_games_cached(date)
-        )
-        return jsonify(rows), 200
+        key, generation = ("games", date, refresh == "false"), db.data_generation()
+        entry = None if refresh == "true" else games_cache.get(key, generation)
+        if entry is None:
+            if refresh == "false":
+                rows = games_service.list_games_cached(date)
+            elif refresh == "true":
+                rows = games_service.list_games(date, force=True)
+            else:
+                rows = games_service.list_games(date)
+            tags = [("date", date)] + [("game", r.get("game_id", r.get("id"))) for r in rows]
+            entry = games_cache.put(key, _json(rows), tags, generation, _ttl(rows))
+        return _conditional(entry)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@bp.get("/games/range")
+def games_range():
+    """
+    GET /games/range?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD[&team=<query>][&format=json|ndjson]
+    Hydrates missing dates, then streams games straight from a DuckDB cursor:
+    a JSON array written incrementally (default) or one JSON object per line.
+    """
+    try:
+        start, end = _date_range(request.args.get("start_date"), request.args.get("end_date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if (date_cls.fromisoformat(end) - date_cls.fromisoformat(start)).days + 1 > GAMES_RANGE_MAX_DAYS:
+        return jsonify({"error": f"range is limited to {GAMES_RANGE_MAX_DAYS} days"}), 400
+    fmt = request.args.get("format", "json").lower()
+    if fmt not in ("json", "ndjson"):
+        return jsonify({"error": "format must be json or ndjson"}), 400
+
+    try:
+        team_ids = games_service.hydrate_range(start, end, request.args.get("team"))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    batches = games_service.iter_games(start, end, team_ids)
+    dumps = current_app.json.dumps
+
+    def ndjson():
+        for batch in batches:
+            with timing.span("serialize"):
+                chunk = "".join(dumps(r) + "\n" for r in batch)
+            yield chunk
+
+    def array():
+        yield "["
+        sep = ""
+        for batch in batches:
+            with timing.span("serialize"):
+                chunk = sep + ",".join(dumps(r) for r in batch)
+            yield chunk
+            sep = ","
+        yield "]"
+
+    if fmt == "ndjson":
+        return Response(stream_with_context(ndjson()), mimetype="application/x-ndjson")
+    return Response(stream_with_context(array()), mimetype="application/json")
+
+
 @bp.get("/games/<int:game_id>")
 def get_game(game_id: int):
     """
@@ -40,14 +172,95 @@ def get_game(game_id: int):
     Returns a single game's details (no player stats).
     """
     try:
-        game = games_service.get_game_details(game_id)
-        if not game:
-            return jsonify({"error": f"game {game_id} not found"}), 404
-        return jsonify(game), 200
+        key, generation = ("game", game_id), db.data_generation()
+        entry = games_cache.get(key, generation)
+        if entry is None:
+            game = games_service.get_game_details(game_id)
+            if not game:
+                return jsonify({"error": f"game {game_id} not found"}), 404
+            entry = games_cache.put(key, _json(game), [("game", game_id)], generation, _ttl([game]))
+        return _conditional(entry)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.get("/games/<int:game_id>/stats")
+def get_game_stats(game_id: int):
+    """
+    GET /games/<game_id>/stats
+    Returns every player's box-score line for a game.
+    """
+    try:
+        key, generation = ("game_stats", game_id), db.data_generation()
+        entry = games_cache.get(key, generation)
+        if entry is None:
+            found = player_stats_service.get_game_stats(game_id)
+            if found is None:
+                return jsonify({"error": f"game {game_id} not found"}), 404
+            game, lines = found
+            entry = games_cache.put(key, _json(lines), [("game", game_id)], generation, _ttl([game]))
+        return _conditional(entry)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 
+@bp.get("/standings")
+def standings():
+    """
+    GET /standings?season=YYYY[&postseason=true]
+    Season records per team, best win % first.
+    """
+    season = request.args.get("season", type=int)
+    if season is None:
+        return jsonify({"error": "season is required (e.g. 2024 for 2024-25)"}), 400
+    postseason = request.args.get("postseason", "false").lower() == "true"
+    try:
+        key, generation = ("standings", season, postseason), db.data_generation()
+        entry = games_cache.get(key, generation)
+        if entry is None:
+            rows = stats_service.standings(season, postseason)
+            entry = games_cache.put(key, _json(rows), [("season", season)], generation)
+        return _conditional(entry)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.get("/stats/form")
+def team_form():
+    """
+    GET /stats/form?team=<query|all>[&as_of=YYYY-MM-DD][&n=10]
+    Last-n record, scoring averages and current streak per team as of a date
+    (default today). Settled dates are cached for FORM_CACHE_TTL, until a
+    game in their season is upserted.
+    """
+    as_of = _normalize_date(request.args.get("as_of") or date_cls.today().isoformat())
+    try:
+        date_cls.fromisoformat(as_of)
+    except ValueError:
+        return jsonify({"error": "as_of must be YYYY-MM-DD"}), 400
+    n = request.args.get("n", stats_service.FORM_GAMES, type=int)
+    if n < 1:
+        return jsonify({"error": "n must be a positive integer"}), 400
+    team = request.args.get("team", stats_service.ALL_TEAMS_QUERY)
+    try:
+        settled = is_settled(as_of)
+        key, generation = ("form", team.strip().lower(), as_of, n), db.data_generation()
+        entry = form_cache.get(key, generation)
+        if entry is None:
+            rows = stats_service.team_form(team, as_of, n)
+            ttl = None if settled else games_cache.ttl
+            tags = [("season", stats_service.season_of(as_of))]
+            entry = form_cache.put(key, _json(rows), tags, generation, ttl)
+        resp = _conditional(entry)
+        if settled:
+            # not immutable: a backfill can still change it, so clients revalidate by ETag
+            resp.cache_control.public = True
+            resp.cache_control.max_age = int(FORM_CACHE_TTL)
+        return resp
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @bp.get("/stats/teams.csv")
 def teams_csv():
     """
@@ -61,9 +274,17 @@ def teams_csv():
     if not start or not end:
         return jsonify({"error": "start_date and end_date are required"}), 400
 
+    # The first chunk arrives once the range is hydrated and aggregated, so
+    # upstream failures still get a proper status and Server-Timing covers them
+    chunks = stats_service.iter_team_stats_csv(start, end, team, split)
+    try:
+        header = next(chunks)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
     def generate():
-        for chunk in stats_service.iter_team_stats_csv(start, end, team, split):
-            yield chunk
+        yield header
+        yield from chunks
 
     filename = f"teams_{start}_to_{end}.csv"
     return Response(
@@ -72,3 +293,84 @@ def teams_csv():
         headers={"Content-Disposition": f'attachment; filename=\"{filename}\"'},
     )
 
+
+@bp.get("/stats/players.csv")
+def players_csv():
+    """
+    GET /stats/players.csv?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD[&team=<query>]
+    """
+    start = request.args.get("start_date")
+    end = request.args.get("end_date")
+    team = request.args.get("team")
+
+    if not start or not end:
+        return jsonify({"error": "start_date and end_date are required"}), 400
+
+    # Box scores are loaded before the first chunk, as for teams.csv
+    chunks = player_stats_service.iter_player_stats_csv(start, end, team)
+    try:
+        header = next(chunks)
+    except HydrationTooLargeError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    def generate():
+        yield header
+        yield from chunks
+
+    filename = f"players_{start}_to_{end}.csv"
+    return Response(
+        generate(),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename=\"{filename}\"'},
+    )
+
+
+def _columnar(chunks, fmt: str, filename: str) -> Response:
+    # Pull the first chunk here, as for the CSV reports: hydration and the
+    # query run before it, so their failures still get a proper status
+    try:
+        first = next(chunks, b"")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    def generate():
+        yield first
+        yield from chunks
+
+    return Response(
+        generate(),
+        mimetype=MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename=\"{filename}.{fmt}\"'},
+    )
+
+
+@bp.get("/stats/teams.<any(parquet, arrow):fmt>")
+def teams_columnar(fmt: str):
+    """
+    GET /stats/teams.parquet|arrow?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD&team=<query>
+    Same report as teams.csv (home/away columns always included).
+    """
+    try:
+        start, end = _date_range(request.args.get("start_date"), request.args.get("end_date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    chunks = export_service.iter_team_stats_export(start, end, request.args.get("team"), fmt)
+    return _columnar(chunks, fmt, f"teams_{start}_to_{end}")
+
+
+@bp.get("/export/games.<any(parquet, arrow):fmt>")
+def games_columnar(fmt: str):
+    """
+    GET /export/games.parquet|arrow?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD[&team=<query>]
+    Cached games only; nothing is fetched upstream.
+    """
+    try:
+        start, end = _date_range(request.args.get("start_date"), request.args.get("end_date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    chunks = export_service.iter_games_export(start, end, request.args.get("team"), fmt)
+    return _columnar(chunks, fmt, f"games_{start}_to_{end}")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from datetime import date, timedelta
+
+from ..ingest.balldontlie import fetch_games_for_range
+from ..infra.http_client import count_calls
+from ..repos.games_repo import upsert_games, cluster_team_games
+from ..repos.coverage_repo import missing_spans, mark_range_covered
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PARTITION_DAYS = 7
+DEFAULT_WORKERS = 4
+
+
+def season_range(season: int) -> tuple[str, str]:
+    """BDL seasons are named by their starting year: 2024 -> Oct 2024 .. Jun 2025."""
+    return f"{season}-10-01", f"{season + 1}-06-30"
+
+
+def partitions(start: str, end: str, days: int = DEFAULT_PARTITION_DAYS) -> list[tuple[str, str]]:
+    """
+    Split the still-missing parts of [start, end] into date partitions of at
+    most `days` days. Dates already in the coverage ledger are skipped, which is
+    what lets an interrupted backfill resume where it stopped.
+    """
+    out: list[tuple[str, str]] = []
+    step = timedelta(days=days)
+    for lo, hi in missing_spans(start, end):
+        d0, d1 = date.fromisoformat(lo), date.fromisoformat(hi)
+        while d0 <= d1:
+            p_end = min(d0 + step - timedelta(days=1), d1)
+            out.append((d0.isoformat(), p_end.isoformat()))
+            d0 = p_end + timedelta(days=1)
+    return out
+
+
+def _fetch_partition(lo: str, hi: str) -> tuple[list[dict], int, float]:
+    t0 = time.perf_counter()
+    with count_calls() as calls:
+        games = fetch_games_for_range(lo, hi)
+    return games, calls[0], time.perf_counter() - t0
+
+
+def backfill(
+    start: str,
+    end: str,
+    partition_days: int = DEFAULT_PARTITION_DAYS,
+    workers: int = DEFAULT_WORKERS,
+) -> list[dict]:
+    """
+    Hydrate every game in [start, end] into DuckDB.
+    - Partitions are fetched upstream in parallel (`workers` at a time).
+    - Writes stay on the calling thread, one partition at a time, and each
+      partition is checkpointed in the coverage ledger as soon as it lands.
+    - A failed partition doesn't stop the others; the first error is re-raised
+      once every successful partition is stored, so a rerun only redoes failures.
+    - team_games is re-clustered by (team_id, date) at the end.
+    Returns one report dict per partition: rows, upstream_calls, seconds, rows_per_sec.
+    """
+    parts = partitions(start, end, partition_days)
+    log.info("backfill %s..%s: %d partitions to hydrate", start, end, len(parts))
+    if not parts:
+        return []
+
+    report: list[dict] = []
+    errors: list[Exception] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(parts)))) as pool:
+        futures = {
+            pool.submit(copy_context().run, _fetch_partition, lo, hi): (lo, hi)
+            for lo, hi in parts
+        }
+        for fut in as_completed(futures):
+            lo, hi = futures[fut]
+            try:
+                games, calls, fetch_s = fut.result()
+            except Exception as e:
+                log.warning("backfill partition %s..%s failed: %s", lo, hi, e)
+                errors.append(e)
+                continue
+            t0 = time.perf_counter()
+            if games:
+                upsert_games(games)
+            mark_range_covered(lo, hi)
+            seconds = fetch_s + (time.perf_counter() - t0)
+            entry = {
+                "start": lo,
+                "end": hi,
+                "rows": len(games),
+                "upstream_calls": calls,
+                "seconds": round(seconds, 3),
+                "rows_per_sec": round(len(games) / seconds, 1) if seconds > 0 else None,
+            }
+            log.info("backfill partition %s..%s: %d rows, %d upstream calls, %.1f rows/s",
+                     lo, hi, entry["rows"], calls, entry["rows_per_sec"] or 0.0)
+            report.append(entry)
+
+    if report:
+        cluster_team_games()
+    if errors:
+        raise errors[0]
+    report.sort(key=lambda e: e["start"])
+    return report
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from ..infra.columnar import EXPORT_BATCH_ROWS, encode
+from ..repos.games_repo import games_range_reader, teams_range_stats_reader
+from ..repos.teams_repo import resolve_team_ids, hydrate_teams_if_needed
+from . import hydration
+from .stats_service import ALL_TEAMS_QUERY
+
+
+def _team_scope(team_query: str | None) -> list[int] | None:
+    """None for `team=all`, otherwise the matching team ids (possibly [])."""
+    hydrate_teams_if_needed()
+    if (team_query or "").strip().lower() == ALL_TEAMS_QUERY:
+        return None
+    return resolve_team_ids(team_query)
+
+
+def iter_games_export(start: str, end: str, team_query: str | None, fmt: str) -> Iterator[bytes]:
+    """
+    Stream cached games in [start, end] as Parquet or Arrow IPC, straight from
+    DuckDB record batches. Nothing is fetched upstream: load long ranges with
+    the backfill command first. Without `team`, every game is exported.
+    """
+    team_ids = _team_scope(team_query) if team_query else None
+    with games_range_reader(start, end, team_ids, EXPORT_BATCH_ROWS) as reader:
+        yield from encode(reader, fmt)
+
+
+def iter_team_stats_export(start: str, end: str, team_query: str | None, fmt: str) -> Iterator[bytes]:
+    """
+    The /stats/teams.csv report (always with the home/away columns) as
+    Parquet or Arrow IPC. The range is hydrated exactly as for the CSV.
+    """
+    team_ids = _team_scope(team_query)
+    if team_ids != []:
+        hydration.hydrate_range(start, end, team_ids)
+    with teams_range_stats_reader(start, end, team_ids, EXPORT_BATCH_ROWS) as reader:
+        yield from encode(reader, fmt)
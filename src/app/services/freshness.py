@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import os
+
+# How long a cached non-final game row is trusted before we refetch it
+LIVE_TTL_SECONDS = int(os.getenv("FRESH_LIVE_SECONDS", "15"))
+SCHEDULED_TTL_SECONDS = int(os.getenv("FRESH_SCHEDULED_SECONDS", "300"))
+
+FINAL, LIVE, SCHEDULED = "final", "live", "scheduled"
+
+
+def game_state(row: dict) -> str:
+    """
+    Classify a game row by BDL's `status` / `period`:
+    - "Final" (any case)          -> final (immutable)
+    - period > 0, not final       -> live ("1st Qtr", "Halftime", ...)
+    - otherwise                   -> scheduled (tip-off time or date string)
+    Mirrors the SQL in games_repo._STALE_SQL.
+    """
+    status = (row.get("status") or "").strip().lower()
+    if status.startswith("final"):
+        return FINAL
+    if (row.get("period") or 0) > 0:
+        return LIVE
+    return SCHEDULED
+
+
+def ttl_for(row: dict) -> int | None:
+    """Seconds a row stays fresh; None for final games (never refetched)."""
+    state = game_state(row)
+    if state == FINAL:
+        return None
+    return LIVE_TTL_SECONDS if state == LIVE else SCHEDULED_TTL_SECONDS
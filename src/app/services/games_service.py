@@ -1,47 +1,182 @@
 from __future__ import annotations
 
+import os
+from typing import Iterator
+
 from ..ingest.balldontlie import (
     fetch_games_by_date,
     fetch_game_by_id,
+    fetch_games_for_range,
 )
 from ..repos.games_repo import (
     upsert_games,
     get_games_by_date,
     get_game,
+    get_stale_games_by_date,
+    is_game_stale,
+    iter_games_range,
+)
+from ..repos.coverage_repo import (
+    is_date_covered,
+    mark_date_covered,
+    is_game_known_missing,
+    mark_game_missing,
 )
+from ..infra.singleflight import SingleFlight
+from ..infra.background import BackgroundRefresher
+from ..infra.metrics import cache_lookup
+from ..infra.replica import writer_op
+from ..repos.teams_repo import resolve_team_ids
+from . import freshness
+from . import hydration
+from .stats_service import ALL_TEAMS_QUERY
+
+# Concurrent misses on the same upstream request share one fetch + upsert
+_flights = SingleFlight()
+
+# Stale rows are refreshed here, off the request path (shared with the scheduler)
+background = BackgroundRefresher()
+
+# Rows fetched from the DuckDB cursor per batch when streaming a range
+RANGE_BATCH_ROWS = int(os.getenv("GAMES_RANGE_BATCH_ROWS", "1000"))
+
+
+@writer_op("hydrate_date")
+def _hydrate_date(date_str: str) -> int:
+    """Fetch a whole date upstream, store it, and record coverage. Returns row count."""
+    api_rows = fetch_games_by_date(date_str)
+    if not api_rows:
+        mark_date_covered(date_str, 0)
+        return 0
+
+    upsert_games(api_rows)
+    mark_date_covered(date_str, len(api_rows))
+    return len(api_rows)
+
 
+@writer_op("hydrate_game")
+def _hydrate_game(game_id: int) -> bool:
+    """Fetch one game upstream and store it. Returns False if upstream has no such game."""
+    api_g = fetch_game_by_id(game_id)
+    if not api_g:
+        mark_game_missing(game_id)
+        return False
+
+    upsert_games([api_g])
+    return True
+
+
+@writer_op("refresh_games")
+def _refresh_games(date_str: str, team_ids: list[int]) -> int:
+    """Refetch just the games these teams play on a date (the stale subset)."""
+    api_rows = fetch_games_for_range(date_str, date_str, team_ids)
+    upsert_games(api_rows)
+    return len(api_rows)
+
+
+def _stale_games(date_str: str) -> list[dict]:
+    return get_stale_games_by_date(
+        date_str, freshness.LIVE_TTL_SECONDS, freshness.SCHEDULED_TTL_SECONDS
+    )
 
-def list_games(date_str: str) -> list[dict]:
+
+def revalidate_date(date_str: str, stale: list[dict] | None = None) -> bool:
+    """
+    Refetch games on a date in the background: just the `stale` ones
+    (filtered to their teams), or the whole date when None.
+    """
+    if stale is None:
+        key = ("/games", "dates[]", date_str)
+        return background.submit(key, lambda: _flights.do(key, lambda: _hydrate_date(date_str)))
+    team_ids = sorted({g["home_team_id"] for g in stale} | {g["visitor_team_id"] for g in stale})
+    key = ("/games", "dates[]", date_str, "team_ids[]", tuple(team_ids))
+    return background.submit(key, lambda: _flights.do(key, lambda: _refresh_games(date_str, team_ids)))
+
+
+def revalidate_game(game_id: int) -> bool:
+    """Refetch one game in the background."""
+    key = ("/games", game_id)
+    return background.submit(key, lambda: _flights.do(key, lambda: _hydrate_game(game_id)))
+
+
+def list_games(date_str: str, force: bool = False) -> list[dict]:
     """
     Return games for a date.
-    - Check local cache; if empty, hydrate from API, store, and re-read.
+    - Cached rows are always served straight away (stale-while-revalidate):
+      Final games never go stale; live/scheduled ones past their TTL are
+      refetched in the background, only the stale subset and filtered to the
+      teams involved, so the next read sees them fresh.
+    - If nothing is cached, consult the coverage ledger so known-empty dates
+      (off-days, All-Star break, off-season) never go upstream.
+    - Otherwise hydrate from API (once, however many threads missed together),
+      store, record coverage, and re-read.
+    - force=True refetches the whole date regardless.
     """
+    if force:
+        _flights.do(("/games", "dates[]", date_str), lambda: _hydrate_date(date_str))
+        return get_games_by_date(date_str)
+
     rows = get_games_by_date(date_str)
     if rows:
+        cache_lookup("games_db", True)
+        stale = _stale_games(date_str)
+        if stale:
+            revalidate_date(date_str, stale)
         return rows
-
-    api_rows = fetch_games_by_date(date_str)
-    if not api_rows:
+    covered = is_date_covered(date_str)
+    cache_lookup("games_db", covered)
+    if covered:
         return []
 
-    upsert_games(api_rows)
+    if not _flights.do(("/games", "dates[]", date_str), lambda: _hydrate_date(date_str)):
+        return []
     return get_games_by_date(date_str)
 
 
 def get_game_details(game_id: int) -> dict | None:
-    """Return a single game from cache, hydrating from API if necessary."""
+    """
+    Return a single game from cache, hydrating from API only if it's missing.
+    A cached row past its freshness TTL is served as-is and refetched in the
+    background (Final games are never refetched).
+    """
     g = get_game(game_id)
     if g:
+        cache_lookup("games_db", True)
+        if is_game_stale(game_id, freshness.LIVE_TTL_SECONDS, freshness.SCHEDULED_TTL_SECONDS):
+            revalidate_game(game_id)
         return g
-
-    api_g = fetch_game_by_id(game_id)
-    if not api_g:
+    if is_game_known_missing(game_id):
+        cache_lookup("games_db", True)
         return None
+    cache_lookup("games_db", False)
 
-    upsert_games([api_g])
+    if not _flights.do(("/games", game_id), lambda: _hydrate_game(game_id)):
+        return None
     return get_game(game_id)
 
 
 def list_games_cached(date_str: str) -> list[dict]:
     """Return games from local cache only (no API calls)."""
     return get_games_by_date(date_str)
+
+
+def hydrate_range(start: str, end: str, team_query: str | None = None) -> list[int] | None:
+    """
+    Make sure every game in [start, end] is cached (for the matching teams, or
+    all teams without a query / with `team=all`). Returns the team ids to
+    filter on: None for all teams, [] if the query matched nothing.
+    """
+    team_ids = None
+    if team_query and team_query.strip().lower() != ALL_TEAMS_QUERY:
+        team_ids = resolve_team_ids(team_query)
+        if not team_ids:
+            return []
+    hydration.hydrate_range(start, end, team_ids)
+    return team_ids
+
+
+def iter_games(start: str, end: str, team_ids: list[int] | None) -> Iterator[list[dict]]:
+    """Cached games in [start, end], RANGE_BATCH_ROWS at a time (see hydrate_range)."""
+    if team_ids == []:
+        return iter(())
+    return iter_games_range(start, end, team_ids, RANGE_BATCH_ROWS)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+from datetime import date
+
+from ..repos.games_repo import upsert_games, get_games_by_date
+from ..repos.coverage_repo import is_settled, missing_spans, mark_range_covered
+from ..ingest.balldontlie import fetch_games_for_range, fetch_games_for_dates, iter_dates_inclusive
+from ..infra.singleflight import SingleFlight
+from ..infra.replica import writer_op
+
+# Concurrent requests for the same span share one upstream pull
+_flights = SingleFlight()
+
+# Gaps shorter than this many days are pulled by date (repeated dates[]) rather
+# than one range call each, so scattered gaps cost one call per batch
+SHORT_GAP_DAYS = 3
+DATES_PER_CALL = int(os.getenv("BDL_DATES_PER_CALL", "25"))
+
+
+@writer_op("hydrate_span")
+def _hydrate_span(lo: str, hi: str, team_ids: list[int] | None) -> None:
+    games = fetch_games_for_range(lo, hi, team_ids)
+    if games:
+        upsert_games(games)
+    mark_range_covered(lo, hi, team_ids)
+
+
+@writer_op("hydrate_dates")
+def _hydrate_dates(dates: list[str], team_ids: list[int] | None) -> None:
+    games = fetch_games_for_dates(dates, team_ids)
+    if games:
+        upsert_games(games)
+    for d in dates:
+        mark_range_covered(d, d, team_ids)
+
+
+def hydrate_range(start: str, end: str, team_ids: list[int] | None) -> None:
+    """
+    Pull only the parts of [start, end] not already cached, for all requested
+    teams at once (team_ids=None pulls every game in the range).
+    Long gaps are pulled by range; short ones are collected and pulled by date,
+    DATES_PER_CALL dates per call.
+    Nothing after today is pulled. Yesterday and today are never marked covered,
+    so they are only pulled while they have no games stored; after that the
+    refresh scheduler keeps them current.
+    """
+    end = min(end, date.today().isoformat())
+    if start > end:
+        return
+    scope = tuple(team_ids) if team_ids is not None else None
+    short: list[str] = []
+    for lo, hi in missing_spans(start, end, team_ids):
+        days = list(iter_dates_inclusive(lo, hi))
+        settled = [d for d in days if is_settled(d)]
+        recent = [d for d in days if not is_settled(d) and not get_games_by_date(d)]
+        if settled and (date.fromisoformat(settled[-1]) - date.fromisoformat(settled[0])).days >= SHORT_GAP_DAYS:
+            lo, hi = settled[0], settled[-1]
+            _flights.do(
+                ("/games", scope, lo, hi),
+                lambda lo=lo, hi=hi: _hydrate_span(lo, hi, team_ids),
+            )
+        else:
+            short.extend(settled)
+        short.extend(recent)
+    for i in range(0, len(short), DATES_PER_CALL):
+        batch = short[i:i + DATES_PER_CALL]
+        _flights.do(
+            ("/games", scope, "dates[]", tuple(batch)),
+            lambda batch=batch: _hydrate_dates(batch, team_ids),
+        )
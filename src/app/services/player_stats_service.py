@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import csv
+import os
+from datetime import date
+from io import StringIO
+from typing import Iterator
+
+from ..ingest.balldontlie import fetch_player_stats_for_game, fetch_player_stats_for_range
+from ..repos.player_stats_repo import (
+    upsert_player_stats,
+    get_game_player_stats,
+    get_players_range_stats,
+    is_box_score_final,
+)
+from ..repos.coverage_repo import BOX_SCORES, missing_spans, mark_range_covered
+from ..exceptions import HydrationTooLargeError
+from ..repos.teams_repo import resolve_team_ids, hydrate_teams_if_needed
+from ..infra.singleflight import SingleFlight
+from ..infra.replica import writer_op
+from ..infra import timing
+from . import freshness
+from . import games_service
+
+# Concurrent requests for the same box scores share one upstream pull
+_flights = SingleFlight()
+
+# Most missing days of box scores players.csv loads inline (~1 /stats page per
+# game, so a season is minutes of upstream calls); larger gaps go through the CLI
+PLAYERS_CSV_MAX_DAYS = int(os.getenv("PLAYERS_CSV_MAX_DAYS", "14"))
+
+CSV_COLUMNS = [
+    "player_name", "player_id", "team_id", "games_played", "minutes",
+    "pts", "reb", "ast", "stl", "blk", "tov",
+    "min_per_game", "pts_per_game", "reb_per_game", "ast_per_game",
+    "stl_per_game", "blk_per_game", "tov_per_game",
+    "fg_pct", "fg3_pct", "ft_pct",
+]
+
+
+@writer_op("hydrate_box_scores")
+def _hydrate_box_span(lo: str, hi: str) -> int:
+    rows = upsert_player_stats(fetch_player_stats_for_range(lo, hi))
+    mark_range_covered(lo, hi, scope=BOX_SCORES)
+    return rows
+
+
+@writer_op("hydrate_game_stats")
+def _hydrate_game_stats(game_id: int) -> int:
+    return upsert_player_stats(fetch_player_stats_for_game(game_id))
+
+
+def load_box_scores(start: str, end: str) -> int:
+    """
+    Bulk-load every box score in [start, end] into player_stats, skipping
+    dates already in the coverage ledger. Returns the number of rows written.
+    """
+    total = 0
+    for lo, hi in missing_spans(start, end, scope=BOX_SCORES):
+        total += _flights.do(
+            ("/stats", lo, hi),
+            lambda lo=lo, hi=hi: _hydrate_box_span(lo, hi),
+        )
+    return total
+
+
+def get_game_stats(game_id: int) -> tuple[dict, list[dict]] | None:
+    """
+    (game, player lines) for one game, or None if the game doesn't exist.
+    A Final game's box score is pulled once; games in progress are refetched
+    on each call (the route caches them for the live TTL).
+    """
+    game = games_service.get_game_details(game_id)
+    if not game:
+        return None
+    if freshness.game_state(game) != freshness.SCHEDULED and not is_box_score_final(game_id):
+        _flights.do(("/stats", game_id), lambda: _hydrate_game_stats(game_id))
+    return game, get_game_player_stats(game_id)
+
+
+def _missing_box_score_days(start: str, end: str) -> int:
+    return sum(
+        (date.fromisoformat(hi) - date.fromisoformat(lo)).days + 1
+        for lo, hi in missing_spans(start, end, scope=BOX_SCORES)
+    )
+
+
+def iter_player_stats_csv(start: str, end: str, team_query: str | None = None) -> Iterator[str]:
+    """
+    Stream a CSV of per-player totals, averages and shooting percentages over
+    [start, end], optionally limited to the teams matching `team_query`.
+    Missing box scores (up to today) are loaded and aggregated before the
+    header is yielded. More than PLAYERS_CSV_MAX_DAYS missing days raises
+    HydrationTooLargeError instead; those are loaded with `cli box-scores`.
+    """
+    team_ids = None
+    if team_query:
+        hydrate_teams_if_needed()
+        team_ids = resolve_team_ids(team_query)
+
+    rows = []
+    if team_ids != []:
+        hydrate_end = min(end, date.today().isoformat())
+        if start <= hydrate_end:
+            missing = _missing_box_score_days(start, hydrate_end)
+            if missing > PLAYERS_CSV_MAX_DAYS:
+                raise HydrationTooLargeError(
+                    f"{missing} days of box scores in {start}..{hydrate_end} are not loaded yet "
+                    f"(at most {PLAYERS_CSV_MAX_DAYS} are loaded per request); load them with "
+                    f"`python -m src.app.cli box-scores --start {start} --end {hydrate_end}` first"
+                )
+            load_box_scores(start, hydrate_end)
+        rows = get_players_range_stats(start, end, team_ids)
+
+    sio = StringIO()
+    csv.writer(sio).writerow(CSV_COLUMNS)
+    yield sio.getvalue()
+
+    for stats in rows:
+        with timing.span("serialize"):
+            sio = StringIO()
+            csv.writer(sio).writerow([stats[c] for c in CSV_COLUMNS])
+        yield sio.getvalue()
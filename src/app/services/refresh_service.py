@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+from ..repos.games_repo import get_games_by_date, get_unfinished_games
+from . import freshness
+from . import games_service
+
+# Proactive refreshes, so user requests rarely find a stale row:
+# today's and yesterday's dates every REFRESH_RECENT_SECONDS, games in
+# progress every REFRESH_LIVE_SECONDS. Intervals are stretched or shrunk by up
+# to ±REFRESH_JITTER so workers and restarts don't tick in lockstep. The work
+# itself runs on games_service.background (REFRESH_MAX_CONCURRENCY at a time).
+REFRESH_SCHEDULER = os.getenv("REFRESH_SCHEDULER", "true").lower() == "true"
+REFRESH_RECENT_SECONDS = float(os.getenv("REFRESH_RECENT_SECONDS", "300"))
+REFRESH_LIVE_SECONDS = float(os.getenv("REFRESH_LIVE_SECONDS", str(freshness.LIVE_TTL_SECONDS)))
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))
+
+log = logging.getLogger(__name__)
+
+
+def refresh_recent_dates(today: date | None = None) -> int:
+    """
+    Queue a whole-date refetch of yesterday and today, skipping a date whose
+    games are all Final already. Returns how many were queued.
+    """
+    today = today or date.today()
+    queued = 0
+    for d in (today - timedelta(days=1), today):
+        rows = get_games_by_date(d.isoformat())
+        if rows and all(freshness.game_state(r) == freshness.FINAL for r in rows):
+            continue
+        queued += games_service.revalidate_date(d.isoformat())
+    return queued
+
+
+def refresh_live_games(today: date | None = None) -> int:
+    """Queue a refetch of every game in progress (grouped by date). Returns dates queued."""
+    today = today or date.today()
+    by_date: dict[str, list[dict]] = {}
+    # late tip-offs are still live after midnight, so look back a couple of days
+    for g in get_unfinished_games((today - timedelta(days=2)).isoformat()):
+        if freshness.game_state(g) == freshness.LIVE:
+            by_date.setdefault(g["date"].isoformat(), []).append(g)
+    return sum(games_service.revalidate_date(d, live) for d, live in by_date.items())
+
+
+class Scheduler:
+    """
+    Runs each (name, interval, fn) job on its own jittered cadence from one
+    daemon thread. Jobs should only queue work, so one slow job can't delay
+    the others; a job that raises is logged and retried at its next tick.
+    """
+
+    def __init__(self, jobs: list[tuple[str, float, Callable[[], object]]], jitter: float = REFRESH_JITTER):
+        self.jobs = jobs
+        self.jitter = jitter
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _delay(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        now = time.monotonic()
+        # first ticks are spread over the jitter window rather than all at t=0
+        due = {name: now + interval * random.uniform(0, self.jitter) for name, interval, _ in self.jobs}
+        while True:
+            name, interval, fn = min(self.jobs, key=lambda job: due[job[0]])
+            if self._stop.wait(max(0.0, due[name] - time.monotonic())):
+                return
+            try:
+                fn()
+            except Exception:
+                log.exception("scheduled refresh %s failed", name)
+            due[name] = time.monotonic() + self._delay(interval)
+
+
+def start_scheduler() -> Scheduler:
+    scheduler = Scheduler([
+        ("recent_dates", REFRESH_RECENT_SECONDS, refresh_recent_dates),
+        ("live_games", REFRESH_LIVE_SECONDS, refresh_live_games),
+    ])
+    scheduler.start()
+    return scheduler
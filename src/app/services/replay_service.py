@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from datetime import date, datetime, timedelta
+
+from ..infra import raw_archive
+from ..repos.coverage_repo import BOX_SCORES, mark_range_covered
+from ..repos.games_repo import cluster_team_games, upsert_games
+from ..repos.player_stats_repo import upsert_player_stats
+from ..repos.teams_repo import upsert_teams
+
+log = logging.getLogger(__name__)
+
+# Params that only pick a page; the rest identify the query a page belongs to
+_PAGING = ("page", "per_page", "cursor")
+
+
+def _payload_data(payload) -> list[dict]:
+    data = payload.get("data", payload) if isinstance(payload, dict) else payload
+    if isinstance(data, dict):
+        return [data]
+    return data or []
+
+
+def _settled_at_fetch(entry: raw_archive.Entry) -> date:
+    """Last date that was already settled when `entry` was fetched (see coverage_repo)."""
+    return datetime.fromisoformat(entry.fetched_at).date() - timedelta(days=2)
+
+
+def _complete_queries(pages: dict[tuple, list[tuple[raw_archive.Entry, int]]]):
+    """
+    Yield (path, params, oldest entry) for every numbered-page query whose
+    pages 1..total_pages are all archived. Cursor-paginated queries can't be
+    checked for gaps, so they never count as coverage.
+    """
+    for (path, _), group in pages.items():
+        if any("cursor" in e.params for e, _ in group):
+            continue
+        seen = {int(e.params.get("page", ["1"])[0]) for e, _ in group}
+        total = max(total_pages for _, total_pages in group)
+        if not set(range(1, total + 1)) <= seen:
+            continue
+        oldest = min((e for e, _ in group), key=lambda e: e.fetched_at)
+        params = {k: v for k, v in oldest.params.items() if k not in _PAGING}
+        yield path, params, oldest
+
+
+def _mark_coverage(path: str, params: dict[str, list[str]], entry: raw_archive.Entry) -> int:
+    """Re-record the coverage a complete query implies; returns ledger calls made."""
+    last = _settled_at_fetch(entry)
+    team_ids = [int(t) for t in params.get("team_ids[]", [])] or None
+    marked = 0
+    if path == "/games" and "dates[]" in params:
+        for d in params["dates[]"]:
+            if date.fromisoformat(d) <= last:
+                mark_range_covered(d, d, team_ids)
+                marked += 1
+    elif path in ("/games", "/stats") and "start_date" in params and "end_date" in params:
+        if path == "/stats" and len(params) != 2:
+            return 0  # only an unfiltered range pull covers every box score
+        start, end = params["start_date"][0], params["end_date"][0]
+        end = min(date.fromisoformat(end), last).isoformat()
+        if end >= start:
+            if path == "/stats":
+                mark_range_covered(start, end, scope=BOX_SCORES)
+            else:
+                mark_range_covered(start, end, team_ids)
+            marked += 1
+    return marked
+
+
+def replay() -> dict:
+    """
+    Rebuild teams, games, player stats and the coverage ledger from the raw
+    archive alone (no network). Responses are applied oldest first so the
+    latest copy of a row wins, and each row keeps its response's fetch time
+    (so box scores pulled mid-game still count as partial). Coverage is only
+    re-recorded for queries whose every page is archived, and only for dates
+    that were settled when fetched.
+    """
+    t0 = time.perf_counter()
+    archived = sorted(raw_archive.entries(), key=lambda e: e.fetched_at)
+
+    teams: dict[int, dict] = {}
+    games: dict[int, tuple[dict, str]] = {}
+    stats: list[dict] = []
+    stats_fetched: list[str] = []
+    pages: dict[tuple, list[tuple[raw_archive.Entry, int]]] = {}  # query -> (page, its total_pages)
+    for entry in archived:
+        payload = raw_archive.load(entry)
+        rows = _payload_data(payload)
+        if entry.path == "/teams":
+            teams.update({int(t["id"]): t for t in rows})
+        elif entry.path == "/games" or entry.path.startswith("/games/"):
+            games.update({
+                int(g["id"]): (g, entry.fetched_at) for g in rows if "home_team" in g and "visitor_team" in g
+            })
+        elif entry.path == "/stats":
+            stats.extend(rows)
+            stats_fetched.extend([entry.fetched_at] * len(rows))
+        else:
+            continue
+        query = {k: v for k, v in entry.params.items() if k not in _PAGING}
+        meta = (payload.get("meta") or {}) if isinstance(payload, dict) else {}
+        pages.setdefault((entry.path, json.dumps(query, sort_keys=True)), []).append(
+            (entry, int(meta.get("total_pages", 1) or 1))
+        )
+    loaded = time.perf_counter() - t0
+
+    if teams:
+        upsert_teams(list(teams.values()))
+    if games:
+        rows, fetched = zip(*games.values())
+        upsert_games(list(rows), list(fetched))
+        cluster_team_games()
+    stat_rows = upsert_player_stats(stats, stats_fetched)
+    coverage = sum(_mark_coverage(path, params, e) for path, params, e in _complete_queries(pages))
+
+    summary = {
+        "responses": len(archived),
+        "teams": len(teams),
+        "games": len(games),
+        "player_stats": stat_rows,
+        "coverage_marks": coverage,
+        "load_seconds": round(loaded, 3),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+    log.info("replay: %s", summary)
+    return summary
@@ -2,58 +2,84 @@ from __future__ import annotations
 
 import csv
 from io import StringIO
-from statistics import median
 from typing import Iterator
 
 from ..repos.teams_repo import resolve_team_ids, hydrate_teams_if_needed, _TEAMS_CACHE
-from ..ingest.balldontlie import fetch_games_for_team_range
+from ..repos.games_repo import get_teams_range_stats, get_team_form
+from ..repos.rollups_repo import get_standings
+from ..infra import timing
+from . import hydration
+from .backfill_service import season_range
 
+# Default window for /stats/form
+FORM_GAMES = 10
 
-def _aggregate_team(team_id: int, start: str, end: str, split: bool) -> dict:
-    games = fetch_games_for_team_range(team_id, start, end)
+# `team=all` asks for a league-wide report
+ALL_TEAMS_QUERY = "all"
 
-    scores, wins = [], []
-    h_scores, h_wins, a_scores, a_wins = [], [], [], []
-
-    for g in games:
-        is_home = g["home_team"]["id"] == team_id
-        my = g["home_team_score"] if is_home else g["visitor_team_score"]
-        opp = g["visitor_team_score"] if is_home else g["home_team_score"]
-        won = 1 if my > opp else 0
+def standings(season: int, postseason: bool = False) -> list[dict]:
+    """Win/loss records for a season, read from the team_season rollup."""
+    hydrate_teams_if_needed()
+    hydration.hydrate_range(*season_range(season), None)
+    return get_standings(season, postseason)
 
-        scores.append(my)
-        wins.append(won)
 
-        if split:
-            if is_home:
-                h_scores.append(my); h_wins.append(won)
-            else:
-                a_scores.append(my); a_wins.append(won)
+def season_of(date_str: str) -> int:
+    """BDL season (start year) a date falls in; seasons roll over on Oct 1."""
+    year, month = int(date_str[:4]), int(date_str[5:7])
+    return year if month >= 10 else year - 1
 
-    def _med(xs): return float(median(xs)) if xs else None
-    def _avg(xs): return float(sum(xs)) / len(xs) if xs else None
 
+def team_form(team_query: str | None, as_of: str, n: int = FORM_GAMES) -> list[dict]:
+    """
+    Last-`n` record, scoring, margin and current streak per team as of a date,
+    within that date's season. `team=all` (or no team) covers every team.
+    Missing parts of the season up to `as_of` are hydrated first.
+    """
+    hydrate_teams_if_needed()
+    all_teams = (team_query or ALL_TEAMS_QUERY).strip().lower() == ALL_TEAMS_QUERY
+    team_ids = None if all_teams else resolve_team_ids(team_query)
+    if team_ids == []:
+        return []
+
+    start = season_range(season_of(as_of))[0]
+    hydration.hydrate_range(start, as_of, team_ids)
+    rows = get_team_form(start, as_of, n, team_ids)
+    for r in rows:
+        t = _TEAMS_CACHE.get(r["team_id"], {})
+        r["team_name"] = t.get("full_name") or t.get("name") or str(r["team_id"])
+        r["as_of"] = as_of
+    return rows
+
+
+def _select(agg: dict, split: bool) -> dict:
     out = {
-        "median_score": _med(scores),
-        "win_pct": _avg(wins),
-        "games_played": len(scores),
+        "median_score": agg["median_score"],
+        "win_pct": agg["win_pct"],
+        "games_played": agg["games_played"],
     }
     if split:
         out.update({
-            "home_median_score": _med(h_scores),
-            "home_win_pct": _avg(h_wins),
-            "home_games": len(h_scores),
-            "away_median_score": _med(a_scores),
-            "away_win_pct": _avg(a_wins),
-            "away_games": len(a_scores),
+            "home_median_score": agg["home_median_score"],
+            "home_win_pct": agg["home_win_pct"],
+            "home_games": agg["home_games"],
+            "away_median_score": agg["away_median_score"],
+            "away_win_pct": agg["away_win_pct"],
+            "away_games": agg["away_games"],
         })
     return out
 
 
 def iter_team_stats_csv(start: str, end: str, team_query: str | None, split: bool) -> Iterator[str]:
-    """Stream a CSV of aggregate stats for matching teams."""
+    """
+    Stream a CSV of aggregate stats for matching teams.
+    However many teams match (or `team=all`), the range is hydrated once and
+    aggregated in a single GROUP BY before the header is yielded; rows are
+    still written one at a time.
+    """
     hydrate_teams_if_needed()
-    team_ids = resolve_team_ids(team_query)
+    all_teams = (team_query or "").strip().lower() == ALL_TEAMS_QUERY
+    team_ids = None if all_teams else resolve_team_ids(team_query)
 
     header = ["team_name", "team_id", "median_score", "win_pct", "games_played"]
     if split:
@@ -62,16 +88,22 @@ def iter_team_stats_csv(start: str, end: str, team_query: str | None, split: boo
             "away_median_score", "away_win_pct", "away_games",
         ]
 
+    rows = []
+    if all_teams or team_ids:
+        hydration.hydrate_range(start, end, team_ids)
+        rows = get_teams_range_stats(start, end, team_ids)
+
     # Always emit header first
     sio = StringIO()
     csv.writer(sio).writerow(header)
     yield sio.getvalue()
 
-    for tid in team_ids:
+    for stats in rows:
+        tid = stats["team_id"]
         t = _TEAMS_CACHE.get(tid, {})
         team_name = t.get("full_name") or t.get("name") or str(tid)
 
-        agg = _aggregate_team(tid, start, end, split)
+        agg = _select(stats, split)
         row = [team_name, tid, agg["median_score"], agg["win_pct"], agg["games_played"]]
         if split:
             row += [
@@ -79,6 +111,7 @@ def iter_team_stats_csv(start: str, end: str, team_query: str | None, split: boo
                 agg["away_median_score"], agg["away_win_pct"], agg["away_games"],
             ]
 
-        sio = StringIO()
-        csv.writer(sio).writerow(row)
+        with timing.span("serialize"):
+            sio = StringIO()
+            csv.writer(sio).writerow(row)
         yield sio.getvalue()
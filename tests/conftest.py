@@ -1,6 +1,7 @@
 # tests/conftest.py
 from __future__ import annotations
 import os
+import duckdb
 import pytest
 from flask import Flask
 
@@ -10,7 +11,9 @@ os.environ.setdefault("BALLDONTLIE_API_KEY", "test-key")
 # os.environ.setdefault("DUCKDB_PATH", ":memory:")
 # os.environ.setdefault("APP_ENV", "test")
 
-from app.routes import bp as api_bp  # safe now
+from app.routes import bp as api_bp, games_cache, form_cache  # safe now
+import app.infra.db as db
+import app.infra.raw_archive as raw_archive
 
 @pytest.fixture(scope="session")
 def app():
@@ -21,3 +24,29 @@ def app():
 @pytest.fixture()
 def client(app):
     return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def duck(monkeypatch):
+    """Fresh in-memory DuckDB per test, so nothing touches /app/data."""
+    con = duckdb.connect(":memory:")
+    db._init_schema(con)
+    monkeypatch.setattr(db, "_con", con)
+    yield con
+    con.close()
+
+
+@pytest.fixture(autouse=True)
+def raw_archive_dir(monkeypatch, tmp_path):
+    """Archive upstream responses under the test's tmp dir."""
+    monkeypatch.setattr(raw_archive, "RAW_ARCHIVE_DIR", str(tmp_path / "raw"))
+    return tmp_path / "raw"
+
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    games_cache.clear()
+    form_cache.clear()
+    yield
+    games_cache.clear()
+    form_cache.clear()
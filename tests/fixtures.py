@@ -1 +1,24 @@
-# Place for future fixtures / helpers
\ No newline at end of file
+# tests/fixtures.py
+"""Shared test helpers."""
+from __future__ import annotations
+
+
+def bdl_game(
+    gid: int,
+    day: str = "2024-01-02",
+    home: int = 1,
+    hs: int | None = 100,
+    away: int = 2,
+    vs: int | None = 90,
+    status: str = "Final",
+    period: int = 4,
+    season: int | None = None,
+) -> dict:
+    """A game as BallDontLie returns it; the season defaults to the one `day` falls in."""
+    year, month = int(day[:4]), int(day[5:7])
+    return {
+        "id": gid, "date": day, "season": season if season is not None else (year if month >= 10 else year - 1),
+        "period": period, "status": status, "postseason": False,
+        "home_team": {"id": home, "full_name": f"Team {home}"}, "home_team_score": hs,
+        "visitor_team": {"id": away, "full_name": f"Team {away}"}, "visitor_team_score": vs,
+    }
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import pytest
+import app.services.backfill_service as bf
+from app.cli import main
+from fixtures import bdl_game
+
+
+def test_partitions_split_missing_range():
+    assert bf.partitions("2024-01-01", "2024-01-10", days=4) == [
+        ("2024-01-01", "2024-01-04"),
+        ("2024-01-05", "2024-01-08"),
+        ("2024-01-09", "2024-01-10"),
+    ]
+
+
+def test_backfill_reports_and_resumes(monkeypatch):
+    fetched = []
+
+    def fake_fetch(lo, hi, team_ids=None):
+        fetched.append((lo, hi))
+        if lo == "2024-01-09":
+            raise RuntimeError("upstream down")
+        return [bdl_game(int(lo[-2:]), lo)]
+
+    monkeypatch.setattr(bf, "fetch_games_for_range", fake_fetch)
+
+    # First run crashes on the last partition; the others are checkpointed
+    with pytest.raises(RuntimeError):
+        bf.backfill("2024-01-01", "2024-01-10", partition_days=4, workers=2)
+
+    fetched.clear()
+    monkeypatch.setattr(bf, "fetch_games_for_range", lambda lo, hi, team_ids=None: fetched.append((lo, hi)) or [])
+    report = bf.backfill("2024-01-01", "2024-01-10", partition_days=4, workers=2)
+
+    assert fetched == [("2024-01-09", "2024-01-10")]
+    assert [(e["start"], e["rows"]) for e in report] == [("2024-01-09", 0)]
+    assert set(report[0]) == {"start", "end", "rows", "upstream_calls", "seconds", "rows_per_sec"}
+
+
+def test_backfill_counts_upstream_calls(monkeypatch):
+    import httpx
+    import app.infra.http_client as hc
+
+    def handler(request: httpx.Request):
+        page = int(request.url.params["page"])
+        return httpx.Response(200, json={"data": [bdl_game(page, "2024-02-01")], "meta": {"total_pages": 3}})
+
+    # the real http_client.get does the counting; only the transport is fake
+    monkeypatch.setattr(hc, "limiter", None)
+    monkeypatch.setattr(hc, "_client", httpx.Client(base_url="https://bdl.test/v1", transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(hc, "_client_pid", hc.os.getpid())
+
+    report = bf.backfill("2024-02-01", "2024-02-01")
+    assert report[0]["upstream_calls"] == 3
+    assert report[0]["rows"] == 3
+
+
+def test_cli_backfill_requires_range(capsys):
+    assert main(["backfill"]) == 2
+    assert "--season" in capsys.readouterr().err
+
+
+def test_season_range():
+    assert bf.season_range(2024) == ("2024-10-01", "2025-06-30")
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import threading
+import time
+import app.ingest.balldontlie as bdl
+
+
+def test_fetch_all_pages_fans_out_and_keeps_order(monkeypatch):
+    seen_params = []
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fake_get(path, params=None):
+        with lock:
+            seen_params.append(dict(params))
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        # later pages answer faster, so completion order != page order
+        time.sleep(0.02 * (6 - params["page"]))
+        with lock:
+            state["active"] -= 1
+        return {"data": [{"id": params["page"]}], "meta": {"total_pages": 5}}
+
+    monkeypatch.setattr(bdl, "get", fake_get)
+    monkeypatch.setattr(bdl, "PAGE_WORKERS", 3)
+
+    out = bdl.fetch_games_by_date("2024-01-10")
+
+    assert [g["id"] for g in out] == [1, 2, 3, 4, 5]
+    assert sorted(p["page"] for p in seen_params) == [1, 2, 3, 4, 5]
+    assert all(p["dates[]"] == "2024-01-10" and p["per_page"] == 100 for p in seen_params)
+    assert 1 < state["peak"] <= 3
+
+
+def test_fetch_all_pages_follows_cursors(monkeypatch):
+    pages = {
+        None: {"data": [{"id": 1}], "meta": {"next_cursor": 10}},
+        10: {"data": [{"id": 2}], "meta": {"next_cursor": 20}},
+        20: {"data": [{"id": 3}], "meta": {}},
+    }
+    monkeypatch.setattr(bdl, "get", lambda path, params=None: pages[params.get("cursor")])
+
+    out = bdl.fetch_player_stats_for_game(42)
+    assert [r["id"] for r in out] == [1, 2, 3]
+
+
+def test_fetch_all_pages_single_page(monkeypatch):
+    calls = []
+
+    def fake_get(path, params=None):
+        calls.append(params)
+        return {"data": [{"id": 7}], "meta": {"total_pages": 1}}
+
+    monkeypatch.setattr(bdl, "get", fake_get)
+    assert bdl.fetch_games_for_team_range(1, "2024-01-01", "2024-01-31") == [{"id": 7}]
+    assert len(calls) == 1
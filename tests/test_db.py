@@ -0,0 +1,51 @@
+from __future__ import annotations
+import threading
+import pytest
+import app.infra.db as db
+from app.repos import games_repo
+from fixtures import bdl_game
+
+
+def test_each_thread_gets_its_own_cursor():
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(db.cursor())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in seen}) == 4
+    assert db.cursor() is db.cursor()
+
+
+def test_write_rolls_back_on_error(duck):
+    with pytest.raises(RuntimeError):
+        with db.write() as con:
+            con.execute("INSERT INTO teams (id, name) VALUES (1, 'A')")
+            raise RuntimeError("boom")
+    assert duck.execute("SELECT count(*) FROM teams").fetchone()[0] == 0
+
+
+def test_nested_writes_share_one_transaction(duck):
+    with db.write() as outer:
+        outer.execute("INSERT INTO teams (id, name) VALUES (1, 'A')")
+        with db.write() as inner:
+            inner.execute("INSERT INTO teams (id, name) VALUES (2, 'B')")
+    assert duck.execute("SELECT count(*) FROM teams").fetchone()[0] == 2
+
+
+def test_concurrent_reads_return_their_own_rows():
+    games_repo.upsert_games([bdl_game(i, f"2024-01-{i:02d}") for i in range(1, 9)])
+    errors = []
+
+    def reader(i: int):
+        for _ in range(50):
+            rows = games_repo.get_games_by_date(f"2024-01-{i:02d}")
+            if [r["game_id"] for r in rows] != [i]:
+                errors.append((i, rows))
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import io
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+import app.services.export_service as es
+from app.services import hydration
+from app.infra import columnar
+from app.repos.games_repo import upsert_games
+from fixtures import bdl_game
+
+
+GAMES = [
+    bdl_game(1, "2024-01-02", 1, 110, 2, 100),
+    bdl_game(2, "2024-01-04", 3, 120, 1, 100),
+    bdl_game(3, "2024-01-06", 2, 80, 3, 70),
+]
+
+
+def test_games_export_parquet_streams_in_batches(client, monkeypatch):
+    upsert_games(GAMES)
+    monkeypatch.setattr(es, "EXPORT_BATCH_ROWS", 1)
+    monkeypatch.setattr(columnar, "EXPORT_BATCH_ROWS", 1)
+
+    r = client.get("/export/games.parquet?start_date=2024-01-01&end_date=2024-01-31")
+
+    assert r.status_code == 200
+    assert r.mimetype == "application/vnd.apache.parquet"
+    pf = pq.ParquetFile(io.BytesIO(r.get_data()))
+    assert pf.metadata.num_row_groups == 3
+    assert pf.read().column("game_id").to_pylist() == [1, 2, 3]
+
+
+def test_games_export_arrow_filters_by_team(client, monkeypatch):
+    upsert_games(GAMES)
+    monkeypatch.setattr(es, "hydrate_teams_if_needed", lambda: None)
+    monkeypatch.setattr(es, "resolve_team_ids", lambda q: [1])
+
+    r = client.get("/export/games.arrow?start_date=2024-01-01&end_date=2024-01-31&team=t1")
+
+    table = ipc.open_stream(r.get_data()).read_all()
+    assert table.column("game_id").to_pylist() == [1, 2]
+
+
+def test_team_stats_export_matches_report(client, monkeypatch):
+    upsert_games(GAMES)
+    monkeypatch.setattr(es, "hydrate_teams_if_needed", lambda: None)
+    monkeypatch.setattr(hydration, "hydrate_range", lambda start, end, team_ids: None)
+
+    r = client.get("/stats/teams.arrow?start_date=2024-01-01&end_date=2024-01-31&team=all")
+
+    rows = ipc.open_stream(r.get_data()).read_all().to_pylist()
+    assert [(x["team_id"], x["games_played"]) for x in rows] == [(1, 2), (2, 2), (3, 2)]
+    assert rows[0]["team_name"] == "1"
+    assert rows[0]["home_win_pct"] == 1.0
+
+
+def test_team_stats_export_reports_upstream_failure(client, monkeypatch):
+    def boom(start, end, team_ids):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(es, "hydrate_teams_if_needed", lambda: None)
+    monkeypatch.setattr(hydration, "hydrate_range", boom)
+
+    r = client.get("/stats/teams.parquet?start_date=2024-01-01&end_date=2024-01-31&team=all")
+
+    assert r.status_code == 500
+    assert r.get_json() == {"error": "upstream down"}
+
+
+def test_exports_reject_bad_dates(client):
+    assert client.get("/export/games.arrow?start_date=2024-13-01&end_date=2024-01-31").status_code == 400
+    r = client.get("/stats/teams.parquet?start_date=2024-02-01&end_date=2024-01-01&team=all")
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "start_date must not be after end_date"}
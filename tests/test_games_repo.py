@@ -0,0 +1,48 @@
+from __future__ import annotations
+from app.repos import games_repo
+from fixtures import bdl_game
+
+
+def test_bulk_upsert_matches_executemany(duck):
+    games = [bdl_game(i, "2024-01-01") for i in range(1, 50)]
+    games.append(bdl_game(7, "2024-01-01", hs=None, vs=None, status="Scheduled"))  # duplicate id, last wins
+
+    games_repo._upsert_games_bulk(games)
+    bulk = duck.execute("SELECT * EXCLUDE (fetched_at) FROM games ORDER BY id").fetchall()
+
+    duck.execute("DELETE FROM games")
+    games_repo._upsert_games_executemany([g for g in games if g["id"] != 7] + [games[-1]])
+    rowwise = duck.execute("SELECT * EXCLUDE (fetched_at) FROM games ORDER BY id").fetchall()
+
+    assert len(bulk) == 49
+    assert bulk == rowwise
+    assert games_repo.get_game(7)["status"] == "Scheduled"
+    assert games_repo.get_game(7)["home_team_score"] is None
+
+
+def test_bulk_upsert_replaces_existing_rows(duck):
+    games_repo.upsert_games([bdl_game(i, "2024-01-02") for i in range(1, 10)])
+    games_repo.upsert_games([bdl_game(i, "2024-01-02", hs=120) for i in range(1, 10)])
+    assert duck.execute("SELECT count(*), min(home_team_score) FROM games").fetchone() == (9, 120)
+
+
+def test_team_games_follow_upserts(duck):
+    games_repo.upsert_games([bdl_game(1, "2024-01-02")])
+    # rescheduled against a different opponent
+    moved = {**bdl_game(1, "2024-01-03", hs=90, vs=95), "visitor_team": {"id": 4, "full_name": "D"}}
+
+    games_repo.upsert_games([moved])
+
+    assert duck.execute(
+        "SELECT team_id, CAST(date AS TEXT), opponent_id, won FROM team_games ORDER BY team_id"
+    ).fetchall() == [(1, "2024-01-03", 4, False), (4, "2024-01-03", 1, True)]
+
+
+def test_cluster_team_games_keeps_rows(duck):
+    games_repo.upsert_games([bdl_game(2, "2024-01-05"), bdl_game(1, "2024-01-02")])
+
+    games_repo.cluster_team_games()
+
+    assert duck.execute("SELECT team_id, game_id FROM team_games").fetchall() == [
+        (1, 1), (1, 2), (2, 1), (2, 2),
+    ]
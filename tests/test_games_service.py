@@ -1,5 +1,7 @@
 from __future__ import annotations
+import threading
 import app.services.games_service as gs
+from fixtures import bdl_game
 
 
 def test_list_games_hydrates_then_reads(monkeypatch):
@@ -71,3 +73,115 @@ def test_list_games_cached(monkeypatch):
     monkeypatch.setattr(gs, "get_games_by_date", fake_get_games_by_date)
     out = gs.list_games_cached("2025-04-01")
     assert out == [{"id": 42, "date": "2025-04-01"}]
+
+
+def test_list_games_known_empty_date_skips_upstream(monkeypatch):
+    calls = {"fetch": 0}
+
+    def fake_fetch_games_by_date(date_str: str):
+        calls["fetch"] += 1
+        return []
+
+    monkeypatch.setattr(gs, "fetch_games_by_date", fake_fetch_games_by_date)
+
+    # Off-day in a settled past season: first call goes upstream, second hits the ledger
+    assert gs.list_games("2024-02-16") == []
+    assert gs.list_games("2024-02-16") == []
+    assert calls["fetch"] == 1
+
+
+def test_get_game_details_negative_cache(monkeypatch):
+    calls = {"fetch": 0}
+
+    def fake_fetch_game_by_id(game_id: int):
+        calls["fetch"] += 1
+        return None
+
+    monkeypatch.setattr(gs, "fetch_game_by_id", fake_fetch_game_by_id)
+
+    assert gs.get_game_details(31337) is None
+    assert gs.get_game_details(31337) is None
+    assert calls["fetch"] == 1
+
+
+def test_list_games_refetches_only_stale_games(duck, monkeypatch):
+    # Arrange: one Final and one live game cached, both fetched long ago
+    from app.repos.games_repo import upsert_games
+    upsert_games([bdl_game(1, "2025-04-01"), bdl_game(2, "2025-04-01", 3, away=4, status="3rd Qtr", period=3)])
+    duck.execute("UPDATE games SET fetched_at = current_timestamp - INTERVAL 1 HOUR")
+
+    calls = {"range": [], "date": 0}
+
+    def fake_fetch_games_for_range(start, end, team_ids=None):
+        calls["range"].append((start, end, list(team_ids)))
+        return [bdl_game(2, "2025-04-01", 3, away=4, status="4th Qtr", period=4)]
+
+    def fake_fetch_games_by_date(date_str):
+        calls["date"] += 1
+        return []
+
+    monkeypatch.setattr(gs, "fetch_games_for_range", fake_fetch_games_for_range)
+    monkeypatch.setattr(gs, "fetch_games_by_date", fake_fetch_games_by_date)
+
+    # Act: the stale rows come back at once; the refresh runs in the background
+    out = gs.list_games("2025-04-01")
+    assert gs.background.wait_idle()
+    again = gs.list_games("2025-04-01")
+    gs.background.wait_idle()
+
+    # Assert: only the live game's teams went upstream, and only once
+    assert calls["range"] == [("2025-04-01", "2025-04-01", [3, 4])]
+    assert calls["date"] == 0
+    assert {g["game_id"]: g["status"] for g in out} == {1: "Final", 2: "3rd Qtr"}
+    assert {g["game_id"]: g["status"] for g in again} == {1: "Final", 2: "4th Qtr"}
+
+
+def test_list_games_force_refetches_whole_date(duck, monkeypatch):
+    from app.repos.games_repo import upsert_games
+    upsert_games([bdl_game(1, "2025-04-01")])
+    calls = {"date": 0}
+
+    def fake_fetch_games_by_date(date_str):
+        calls["date"] += 1
+        return [bdl_game(1, "2025-04-01", status="Final/OT", period=5)]
+
+    monkeypatch.setattr(gs, "fetch_games_by_date", fake_fetch_games_by_date)
+
+    out = gs.list_games("2025-04-01", force=True)
+
+    assert calls["date"] == 1
+    assert out[0]["status"] == "Final/OT"
+
+
+def test_get_game_details_final_never_refetched(duck, monkeypatch):
+    from app.repos.games_repo import upsert_games
+    upsert_games([bdl_game(1, "2025-04-01")])
+    duck.execute("UPDATE games SET fetched_at = current_timestamp - INTERVAL 30 DAY")
+
+    def fake_fetch_game_by_id(game_id):
+        assert False, "final games are immutable"
+
+    monkeypatch.setattr(gs, "fetch_game_by_id", fake_fetch_game_by_id)
+
+    assert gs.get_game_details(1)["status"] == "Final"
+
+
+def test_get_game_details_serves_stale_row_then_refreshes(duck, monkeypatch):
+    from app.repos.games_repo import upsert_games
+    upsert_games([bdl_game(1, "2025-04-01", status="2nd Qtr", period=2)])
+    duck.execute("UPDATE games SET fetched_at = current_timestamp - INTERVAL 1 HOUR")
+    release = threading.Event()
+
+    def slow_fetch(game_id):
+        release.wait(5)
+        return bdl_game(game_id, "2025-04-01", status="3rd Qtr", period=3)
+
+    monkeypatch.setattr(gs, "fetch_game_by_id", slow_fetch)
+
+    # served without waiting for upstream, and concurrent stale reads queue one refresh
+    assert gs.get_game_details(1)["status"] == "2nd Qtr"
+    assert gs.get_game_details(1)["status"] == "2nd Qtr"
+    assert gs.background.pending() == 1
+    release.set()
+    assert gs.background.wait_idle()
+    assert gs.get_game_details(1)["status"] == "3rd Qtr"
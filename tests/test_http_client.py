@@ -0,0 +1,98 @@
+from __future__ import annotations
+import threading
+import httpx
+import pytest
+import app.infra.http_client as hc
+from app.exceptions import ConfigError
+
+
+def _mock_client(handler) -> httpx.Client:
+    return httpx.Client(base_url="https://bdl.test/v1", transport=httpx.MockTransport(handler))
+
+
+def test_get_reuses_shared_client(monkeypatch):
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append(str(request.url))
+        return httpx.Response(200, json={"data": []})
+
+    monkeypatch.setattr(hc, "_client", _mock_client(handler))
+    monkeypatch.setattr(hc, "_client_pid", hc.os.getpid())
+
+    hc.get("/games", params={"page": 1})
+    hc.get("games", params={"page": 2})
+    assert seen == ["https://bdl.test/v1/games?page=1", "https://bdl.test/v1/games?page=2"]
+
+
+def test_get_client_is_process_wide(monkeypatch):
+    monkeypatch.setattr(hc, "_client", None)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(hc.get_client())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in got}) == 1
+    hc.close_client()
+    assert hc._client is None
+
+
+def test_get_client_rebuilds_after_fork(monkeypatch):
+    monkeypatch.setattr(hc, "_client", None)
+    parent = hc.get_client()
+    monkeypatch.setattr(hc, "_client_pid", -1)  # pretend we're in a forked child
+    child = hc.get_client()
+    assert child is not parent
+    hc.close_client()
+    parent.close()
+
+
+def test_get_client_requires_api_key(monkeypatch):
+    monkeypatch.setattr(hc, "_client", None)
+    monkeypatch.delenv("BALLDONTLIE_API_KEY")
+    with pytest.raises(ConfigError):
+        hc.get_client()
+    assert hc._client is None
+
+    monkeypatch.setenv("BALLDONTLIE_API_KEY", "k")
+    assert hc.get_client().headers["Authorization"] == "k"
+    hc.close_client()
+
+
+def test_get_retries_429_and_pauses_limiter(monkeypatch):
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"data": [1]}),
+    ])
+    bucket = hc.TokenBucket(per_minute=6000, burst=5)
+    monkeypatch.setattr(hc, "limiter", bucket)
+    monkeypatch.setattr(hc, "_client", _mock_client(lambda request: next(responses)))
+    monkeypatch.setattr(hc, "_client_pid", hc.os.getpid())
+
+    assert hc.get("/games") == {"data": [1]}
+    assert hc.tokens_remaining() < 5
+
+
+def test_get_does_not_retry_403(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(403)
+
+    monkeypatch.setattr(hc, "limiter", None)
+    monkeypatch.setattr(hc, "_client", _mock_client(handler))
+    monkeypatch.setattr(hc, "_client_pid", hc.os.getpid())
+
+    with pytest.raises(httpx.HTTPStatusError):
+        hc.get("/games")
+    assert len(calls) == 1
+    assert hc.tokens_remaining() is None
+
+
+def test_retry_after_parsing():
+    assert hc._retry_after_seconds(httpx.Response(429, headers={"Retry-After": "7"})) == 7.0
+    assert hc._retry_after_seconds(httpx.Response(429)) is None
+    past = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert hc._retry_after_seconds(httpx.Response(429, headers={"Retry-After": past})) == 0.0
@@ -0,0 +1,48 @@
+from __future__ import annotations
+from app.services import hydration
+from app.repos.coverage_repo import mark_date_covered, mark_range_covered
+
+
+def test_hydrate_range_fetches_only_missing_spans(monkeypatch):
+    fetched = []
+
+    def fake_fetch(start, end, team_ids=None):
+        fetched.append((start, end, team_ids))
+        return []
+
+    monkeypatch.setattr(hydration, "fetch_games_for_range", fake_fetch)
+    mark_range_covered("2024-01-05", "2024-01-10", [1])
+
+    hydration.hydrate_range("2024-01-01", "2024-01-15", [1])
+    assert fetched == [("2024-01-01", "2024-01-04", [1]), ("2024-01-11", "2024-01-15", [1])]
+
+    # Second pass: everything is covered now
+    fetched.clear()
+    hydration.hydrate_range("2024-01-01", "2024-01-15", [1])
+    assert fetched == []
+
+
+def test_whole_date_pull_counts_as_team_coverage(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(hydration, "fetch_games_for_dates", lambda d, t=None: fetched.append(list(d)) or [])
+
+    mark_date_covered("2024-01-02", 0)
+    hydration.hydrate_range("2024-01-01", "2024-01-03", [5])
+    assert fetched == [["2024-01-01", "2024-01-03"]]
+
+
+def test_short_gaps_batched_by_date_long_gaps_by_range(monkeypatch):
+    by_range, by_dates = [], []
+    monkeypatch.setattr(hydration, "fetch_games_for_range", lambda s, e, t=None: by_range.append((s, e)) or [])
+    monkeypatch.setattr(hydration, "fetch_games_for_dates", lambda d, t=None: by_dates.append(list(d)) or [])
+    monkeypatch.setattr(hydration, "DATES_PER_CALL", 2)
+
+    for d in ("2024-01-02", "2024-01-04", "2024-01-06"):
+        mark_date_covered(d, 0)
+    hydration.hydrate_range("2024-01-01", "2024-01-20", None)
+
+    assert by_range == [("2024-01-07", "2024-01-20")]
+    assert by_dates == [["2024-01-01", "2024-01-03"], ["2024-01-05"]]
+    by_range.clear(), by_dates.clear()
+    hydration.hydrate_range("2024-01-01", "2024-01-20", None)
+    assert by_range == [] and by_dates == []
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import httpx
+from prometheus_client import REGISTRY
+import app.infra.http_client as hc
+from app.infra import metrics
+from app.infra.response_cache import ResponseCache
+
+
+def _value(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_reports_route_latency(client):
+    before = _value("http_request_duration_seconds_count", route="/health", method="GET", status="200")
+
+    client.get("/health")
+    r = client.get("/metrics")
+
+    assert r.status_code == 200 and r.mimetype == "text/plain"
+    assert "http_request_duration_seconds_bucket" in r.get_data(as_text=True)
+    assert _value("http_request_duration_seconds_count", route="/health", method="GET", status="200") == before + 1
+
+
+def test_upstream_calls_labelled_by_path_page_and_status(monkeypatch):
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"data": []}),
+    ])
+    monkeypatch.setattr(hc, "limiter", hc.TokenBucket(per_minute=6000, burst=5))
+    monkeypatch.setattr(
+        hc, "_client",
+        httpx.Client(base_url="https://bdl.test/v1", transport=httpx.MockTransport(lambda r: next(responses))),
+    )
+    monkeypatch.setattr(hc, "_client_pid", hc.os.getpid())
+    labels = {"path": "/games/<id>", "page": "1"}
+    ok, limited = (_value("bdl_requests_total", **labels, status=s) for s in ("200", "429"))
+    retries = _value("bdl_retries_total", path="/games/<id>", reason="429")
+
+    hc.get("/games/42")
+
+    assert _value("bdl_requests_total", **labels, status="200") == ok + 1
+    assert _value("bdl_requests_total", **labels, status="429") == limited + 1
+    assert _value("bdl_retries_total", path="/games/<id>", reason="429") == retries + 1
+    assert metrics.page_label({"page": 37}) == "10+" and metrics.page_label({"cursor": "x"}) == "cursor"
+
+
+def test_named_response_cache_counts_hits_and_misses():
+    cache = ResponseCache(name="test")
+    cache.get("k")
+    cache.put("k", b"{}")
+    cache.get("k")
+    cache.get("k")
+
+    assert _value("cache_lookups_total", cache="test", result="miss") == 1
+    assert _value("cache_lookups_total", cache="test", result="hit") == 2
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import duckdb
+from app.infra import migrations
+
+
+def test_fresh_database_applies_every_migration_once():
+    con = duckdb.connect(":memory:")
+
+    assert migrations.migrate(con) == [v for v, _, _ in migrations.MIGRATIONS]
+    assert migrations.migrate(con) == []
+
+
+def test_upgrades_database_from_before_migrations(tmp_path):
+    # Arrange: the original startup schema, with an index and data, in a file
+    # (DuckDB only fails to alter indexed tables on disk, not in memory)
+    path = str(tmp_path / "old.duckdb")
+    con = duckdb.connect(path)
+    con.execute("""
+        CREATE TABLE games (
+            id INTEGER PRIMARY KEY, date DATE, season INTEGER, period INTEGER, status TEXT,
+            postseason BOOLEAN, home_team_id INTEGER, home_team_name TEXT, home_team_score INTEGER,
+            visitor_team_id INTEGER, visitor_team_name TEXT, visitor_team_score INTEGER
+        )
+    """)
+    con.execute("CREATE INDEX idx_games_date ON games(date)")
+    con.execute("""
+        CREATE TABLE teams (
+            id INTEGER PRIMARY KEY, abbreviation TEXT, city TEXT, name TEXT, full_name TEXT,
+            conference TEXT, division TEXT
+        )
+    """)
+    con.execute("CREATE UNIQUE INDEX ux_teams_id ON teams(id)")
+    con.execute("""
+        CREATE TABLE player_stats (
+            player_id INTEGER, game_id INTEGER, team_id INTEGER, min TEXT, pts INTEGER, reb INTEGER,
+            ast INTEGER, stl INTEGER, blk INTEGER, tov INTEGER, pf INTEGER, fgm INTEGER, fga INTEGER,
+            fg3m INTEGER, ftm INTEGER, fta INTEGER, PRIMARY KEY (player_id, game_id)
+        )
+    """)
+    con.execute("""
+        INSERT INTO games VALUES
+            (1, '2024-01-02', 2023, 4, 'Final', FALSE, 1, 'A', 110, 2, 'B', 100)
+    """)
+    con.close()
+    con = duckdb.connect(path)
+
+    # Act
+    migrations.migrate(con)
+
+    # Assert: new columns exist and team_games is backfilled from games
+    cols = {r[0] for r in con.execute("DESCRIBE games").fetchall()}
+    assert "fetched_at" in cols
+    cols = {r[0] for r in con.execute("DESCRIBE player_stats").fetchall()}
+    assert {"player_name", "game_date", "fg3a", "fetched_at"} <= cols
+    indexes = {r[0] for r in con.execute("SELECT index_name FROM duckdb_indexes()").fetchall()}
+    assert "idx_games_date" in indexes and "ux_teams_id" not in indexes
+    assert con.execute(
+        "SELECT team_id, is_home, pts, opp_pts, won FROM team_games ORDER BY team_id"
+    ).fetchall() == [(1, True, 110, 100, True), (2, False, 100, 110, False)]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+import csv
+import app.services.player_stats_service as ps
+from app.repos.coverage_repo import BOX_SCORES, mark_range_covered
+from app.repos.games_repo import upsert_games
+from app.repos.player_stats_repo import upsert_player_stats, get_game_player_stats, get_players_range_stats
+from fixtures import bdl_game
+
+
+def _line(player: int, game: int, team: int, day: str, pts: int, fgm: int, fga: int, mins: str = "30:00") -> dict:
+    return {
+        "player": {"id": player, "first_name": "P", "last_name": str(player), "team_id": team},
+        "game": {"id": game, "date": day},
+        "team": {"id": team},
+        "min": mins, "pts": pts, "reb": 5, "ast": 2, "stl": 1, "blk": 0, "turnover": 1, "pf": 2,
+        "fgm": fgm, "fga": fga, "fg3m": 1, "fg3a": 4, "ftm": 2, "fta": 2,
+    }
+
+
+def test_player_range_stats_aggregate_in_duckdb():
+    upsert_player_stats([
+        _line(7, 1, 1, "2024-01-02", 20, 8, 16),
+        _line(7, 2, 1, "2024-01-04", 30, 12, 20),
+        _line(7, 3, 1, "2024-01-06", 0, 0, 0, mins="00"),   # DNP doesn't count
+        _line(8, 1, 2, "2024-01-02", 10, 4, 10),
+    ])
+
+    out = {r["player_id"]: r for r in get_players_range_stats("2024-01-01", "2024-01-31")}
+
+    assert out[7]["games_played"] == 2
+    assert out[7]["pts"] == 50 and out[7]["pts_per_game"] == 25.0
+    assert out[7]["fg_pct"] == 0.556
+    assert out[7]["minutes"] == 60.0
+    assert [r["player_id"] for r in get_players_range_stats("2024-01-01", "2024-01-31", [2])] == [8]
+
+
+def test_load_box_scores_skips_covered_dates(monkeypatch):
+    fetched = []
+
+    def fake_fetch(start, end):
+        fetched.append((start, end))
+        return [_line(7, 1, 1, start, 20, 8, 16)]
+
+    monkeypatch.setattr(ps, "fetch_player_stats_for_range", fake_fetch)
+
+    assert ps.load_box_scores("2024-01-01", "2024-01-10") == 1
+    assert ps.load_box_scores("2024-01-01", "2024-01-10") == 0
+    assert fetched == [("2024-01-01", "2024-01-10")]
+
+
+def test_game_stats_final_box_score_pulled_once(monkeypatch):
+    upsert_games([bdl_game(1)])
+    calls = {"n": 0}
+
+    def fake_fetch(game_id):
+        calls["n"] += 1
+        return [_line(7, game_id, 1, "2024-01-02", 20, 8, 16)]
+
+    monkeypatch.setattr(ps, "fetch_player_stats_for_game", fake_fetch)
+
+    assert ps.get_game_stats(1)[1][0]["pts"] == 20
+    assert ps.get_game_stats(1)[1][0]["pts"] == 20
+    assert calls["n"] == 1
+
+
+def test_game_stats_refetched_after_game_goes_final(monkeypatch):
+    # Arrange: lines stored mid-game, then the game row turns Final
+    upsert_games([bdl_game(1, status="3rd Qtr", period=3)])
+    upsert_player_stats([_line(7, 1, 1, "2024-01-02", 12, 5, 10)])
+    upsert_games([bdl_game(1)])
+    monkeypatch.setattr(
+        ps, "fetch_player_stats_for_game",
+        lambda game_id: [_line(7, game_id, 1, "2024-01-02", 20, 8, 16)],
+    )
+
+    # Act / Assert
+    assert ps.get_game_stats(1)[1][0]["pts"] == 20
+    assert get_game_player_stats(1)[0]["pts"] == 20
+
+
+def test_players_csv_route(client, monkeypatch):
+    upsert_player_stats([_line(7, 1, 1, "2024-01-02", 20, 8, 16)])
+    mark_range_covered("2024-01-01", "2024-01-31", scope=BOX_SCORES)
+    monkeypatch.setattr(ps, "load_box_scores", lambda start, end: 0)
+
+    r = client.get("/stats/players.csv?start_date=2024-01-01&end_date=2024-01-31")
+
+    assert r.status_code == 200
+    rows = list(csv.DictReader(r.get_data(as_text=True).splitlines()))
+    assert rows[0]["player_name"] == "P 7" and rows[0]["pts_per_game"] == "20.0"
+
+
+def test_players_csv_loads_before_header_and_caps_range(client, monkeypatch):
+    loaded = []
+    monkeypatch.setattr(ps, "load_box_scores", lambda start, end: loaded.append((start, end)) or 0)
+    monkeypatch.setattr(ps, "PLAYERS_CSV_MAX_DAYS", 10)
+
+    r = client.get("/stats/players.csv?start_date=2024-01-01&end_date=2024-01-31")
+    assert r.status_code == 400 and "cli box-scores" in r.get_json()["error"]
+    assert loaded == []
+
+    def failing_load(start, end):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(ps, "load_box_scores", failing_load)
+    r = client.get("/stats/players.csv?start_date=2024-01-01&end_date=2024-01-05")
+    assert r.status_code == 500  # not a 200 with a header-only body
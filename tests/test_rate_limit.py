@@ -0,0 +1,34 @@
+from __future__ import annotations
+import threading
+import time
+from app.infra.rate_limit import TokenBucket
+
+
+def test_bucket_allows_burst_then_throttles():
+    bucket = TokenBucket(per_minute=600, burst=2)  # 10 tokens/s
+    t0 = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    # 2 from the burst, then 2 more at 10/s
+    assert time.monotonic() - t0 >= 0.15
+
+
+def test_bucket_is_shared_across_threads():
+    bucket = TokenBucket(per_minute=1200, burst=1)  # 20 tokens/s
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - t0 >= 0.18
+
+
+def test_pause_blocks_and_reports_zero_remaining():
+    bucket = TokenBucket(per_minute=6000, burst=10)
+    assert bucket.remaining() == 10
+    bucket.pause(0.1)
+    assert bucket.remaining() == 0
+    t0 = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - t0 >= 0.09
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import httpx
+import app.infra.http_client as hc
+import app.infra.raw_archive as raw_archive
+from app.repos import coverage_repo, player_stats_repo
+from app.services.replay_service import replay
+from fixtures import bdl_game
+
+
+def _page(data: list[dict], page: int, total: int) -> bytes:
+    return httpx.Response(200, json={"data": data, "meta": {"current_page": page, "total_pages": total}}).content
+
+
+def test_request_key_ignores_param_order_and_types():
+    a = raw_archive.request_key("/games", {"dates[]": ["2025-01-02", "2025-01-01"], "page": 1})
+    b = raw_archive.request_key("games", {"page": "1", "dates[]": ("2025-01-01", "2025-01-02")})
+    assert a == b
+    assert a != raw_archive.request_key("/games", {"dates[]": ["2025-01-01"], "page": 1})
+
+
+def test_identical_bodies_share_one_blob(raw_archive_dir):
+    body = b'{"data": []}'
+    first = raw_archive.store("/games", {"dates[]": "2025-01-01"}, body)
+    second = raw_archive.store("/games", {"dates[]": "2025-01-02"}, body)
+    assert first.blob == second.blob
+    assert len(list(raw_archive.entries())) == 2
+    assert sum(len(files) for _, _, files in os.walk(raw_archive_dir / "blobs")) == 1
+    assert raw_archive.load(first) == {"data": []}
+
+
+def test_prune_removes_superseded_blobs():
+    shared = raw_archive.store("/games", {"dates[]": "2025-01-01"}, b'{"data": []}')
+    raw_archive.store("/games", {"dates[]": "2025-01-02"}, b'{"data": []}')
+    live = raw_archive.store("/games/1", None, b'{"data": {"status": "1st Qtr"}}')
+    final = raw_archive.store("/games/1", None, b'{"data": {"status": "Final"}}')
+    size = os.path.getsize(raw_archive._blob_path(live.blob))
+
+    assert raw_archive.prune()["blobs_removed"] == 0  # too recent to be sure nothing is mid-store
+    assert raw_archive.prune(grace_seconds=0) == {"blobs_kept": 2, "blobs_removed": 1, "bytes_freed": size}
+    assert not os.path.exists(raw_archive._blob_path(live.blob))
+    assert raw_archive.load(final) and raw_archive.load(shared) == {"data": []}
+
+
+def test_get_archives_and_revalidates(monkeypatch):
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"data": [1]}, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(hc, "limiter", None)
+    monkeypatch.setattr(hc, "_client", httpx.Client(base_url="https://bdl.test/v1", transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(hc, "_client_pid", hc.os.getpid())
+
+    assert hc.get("/games", params={"page": 1}) == {"data": [1]}
+    assert hc.get("/games", params={"page": 1}) == {"data": [1]}  # 304 -> archived body
+    assert seen == [None, '"v1"']
+    assert raw_archive.lookup("/games", {"page": 1}).etag == '"v1"'
+
+
+def test_replay_rebuilds_offline(duck, monkeypatch):
+    def no_network():
+        raise AssertionError("replay must not call upstream")
+
+    monkeypatch.setattr(hc, "get_client", no_network)
+    range_params = {"start_date": "2024-01-01", "end_date": "2024-01-02", "per_page": 100}
+    raw_archive.store("/games", {**range_params, "page": 1}, _page([bdl_game(1, "2024-01-01")], 1, 2))
+    raw_archive.store("/games", {**range_params, "page": 2}, _page([bdl_game(2, "2024-01-02")], 2, 2))
+    # only page 1 of 2 archived: the games load but the date isn't marked covered
+    partial = {"dates[]": "2024-02-01", "per_page": 100}
+    raw_archive.store("/games", {**partial, "page": 1}, _page([bdl_game(3, "2024-02-01")], 1, 2))
+    # a later single-game refetch wins over the page copy
+    raw_archive.store("/games/1", None, httpx.Response(200, json={"data": {**bdl_game(1, "2024-01-01"), "home_team_score": 120}}).content)
+    raw_archive.store("/teams", None, httpx.Response(200, json={"data": [
+        {"id": 1, "abbreviation": "AAA", "full_name": "Team 1"},
+        {"id": 2, "abbreviation": "BBB", "full_name": "Team 2"},
+    ]}).content)
+
+    summary = replay()
+
+    assert summary["games"] == 3 and summary["teams"] == 2
+    assert duck.execute("SELECT home_team_score FROM games WHERE id = 1").fetchone() == (120,)
+    assert duck.execute("SELECT count(*) FROM team_games").fetchone() == (6,)
+    assert coverage_repo.missing_spans("2024-01-01", "2024-01-02") == []
+    assert coverage_repo.missing_spans("2024-02-01", "2024-02-01") == [("2024-02-01", "2024-02-01")]
+
+
+def test_replay_keeps_fetch_times(duck):
+    line = {"player": {"id": 5, "first_name": "A", "last_name": "B"}, "game": {"id": 1, "date": "2024-01-01"},
+            "team": {"id": 1}, "pts": 10}
+    raw_archive.store("/stats", {"game_ids[]": 1, "page": 1}, _page([line], 1, 1))  # pulled mid-game
+    raw_archive.store("/games/1", None, httpx.Response(200, json={"data": bdl_game(1, "2024-01-01")}).content)
+
+    replay()
+
+    # the box score predates the Final game row, so it is still partial
+    assert not player_stats_repo.is_box_score_final(1)
+    game_ts, stat_ts = duck.execute(
+        "SELECT g.fetched_at, p.fetched_at FROM games g JOIN player_stats p ON p.game_id = g.id"
+    ).fetchone()
+    assert stat_ts < game_ts
+
+
+def test_replay_cli_needs_no_api_key(tmp_path):
+    # Offline commands must start without upstream credentials
+    env = {k: v for k, v in os.environ.items() if k != "BALLDONTLIE_API_KEY"}
+    env["DB_DIR"] = str(tmp_path)
+    r = subprocess.run(
+        [sys.executable, "-m", "src.app.cli", "replay"],
+        cwd=Path(__file__).resolve().parents[1], env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert r.returncode == 0, r.stderr
+    assert json.loads(r.stdout)["responses"] == 0
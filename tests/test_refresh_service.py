@@ -0,0 +1,55 @@
+from __future__ import annotations
+import threading
+from datetime import date
+import app.services.games_service as gs
+import app.services.refresh_service as rs
+from app.repos.games_repo import upsert_games
+from fixtures import bdl_game
+
+TODAY = date(2025, 3, 2)
+
+
+def test_recent_dates_skip_a_fully_final_yesterday(monkeypatch):
+    upsert_games([bdl_game(1, "2025-03-01"), bdl_game(2, "2025-03-02", 3, away=4, status="7:30 pm ET", period=0)])
+    fetched = []
+    monkeypatch.setattr(gs, "fetch_games_by_date", lambda d: fetched.append(d) or [])
+
+    assert rs.refresh_recent_dates(TODAY) == 1
+    assert gs.background.wait_idle()
+    assert fetched == ["2025-03-02"]
+
+
+def test_live_games_refetched_by_team(monkeypatch):
+    upsert_games([
+        bdl_game(1, "2025-03-01"),
+        bdl_game(2, "2025-03-02", 3, away=4, status="3rd Qtr", period=3),
+        bdl_game(3, "2025-03-02", 5, away=6, status="7:30 pm ET", period=0),
+    ])
+    fetched = []
+    monkeypatch.setattr(gs, "fetch_games_for_range", lambda s, e, t=None: fetched.append((s, list(t))) or [])
+
+    assert rs.refresh_live_games(TODAY) == 1
+    assert gs.background.wait_idle()
+    assert fetched == [("2025-03-02", [3, 4])]
+
+
+def test_scheduler_keeps_running_when_a_job_fails():
+    counts = {"fast": 0, "slow": 0}
+    fast_ran = threading.Event()
+
+    def fast():
+        counts["fast"] += 1
+        if counts["fast"] >= 20:
+            fast_ran.set()
+
+    def slow():
+        counts["slow"] += 1
+        raise RuntimeError("logged, not fatal")
+
+    scheduler = rs.Scheduler([("fast", 0.005, fast), ("slow", 0.05, slow)], jitter=0.1)
+    scheduler.start()
+    try:
+        assert fast_ran.wait(5)
+    finally:
+        scheduler.stop()
+    assert 1 <= counts["slow"] < counts["fast"]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+import duckdb
+import pytest
+from flask import Flask
+import app.infra.db as db
+import app.infra.replica as replica
+import app.services.games_service as gs
+from app import internal
+from app.exceptions import ReadOnlyDatabaseError
+from app.repos import games_repo
+from fixtures import bdl_game
+
+
+@pytest.fixture()
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "_DUCK_PATH", str(tmp_path / "nba.duckdb"))
+    monkeypatch.setattr(db, "_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(db, "_CURRENT", str(tmp_path / "snapshots" / "CURRENT"))
+    monkeypatch.setattr(db, "_snapshot_version", 0)
+    monkeypatch.setattr(db, "SNAPSHOT_POLL_SECONDS", 0.0)
+    writer = duckdb.connect(str(tmp_path / "nba.duckdb"))
+    db._init_schema(writer)
+    yield writer
+    writer.close()
+
+
+def _as_writer(monkeypatch, con):
+    monkeypatch.setattr(db, "READ_ONLY", False)
+    monkeypatch.setattr(db, "_con", con)
+
+
+def _as_reader(monkeypatch, con=None):
+    monkeypatch.setattr(db, "READ_ONLY", True)
+    monkeypatch.setattr(db, "_con", con)
+
+
+def test_reader_sees_published_snapshots(monkeypatch, data_dir):
+    _as_writer(monkeypatch, data_dir)
+    games_repo.upsert_games([bdl_game(1, "2024-01-01")])
+    v1 = db.publish_snapshot()
+
+    _as_reader(monkeypatch)
+    assert [g["game_id"] for g in games_repo.get_games_by_date("2024-01-01")] == [1]
+    with pytest.raises(ReadOnlyDatabaseError):
+        games_repo.upsert_games([bdl_game(2, "2024-01-01")])
+    reader_con = db._con
+
+    _as_writer(monkeypatch, data_dir)
+    games_repo.upsert_games([bdl_game(2, "2024-01-01")])
+    v2 = db.publish_snapshot()
+    assert v2 == v1 + 1
+    assert db.publish_snapshot_if_dirty() == v2  # nothing new written
+
+    _as_reader(monkeypatch, reader_con)
+    monkeypatch.setattr(db, "_snapshot_version", v1)
+    db.wait_for_snapshot(v2)
+    assert [g["game_id"] for g in games_repo.get_games_by_date("2024-01-01")] == [1, 2]
+
+
+def test_reader_forwards_hydration_to_writer(monkeypatch):
+    forwarded = []
+    monkeypatch.setattr(db, "READ_ONLY", True)
+    monkeypatch.setattr(replica, "forward", lambda name, args: forwarded.append((name, args)) or 3)
+
+    assert gs._hydrate_date("2024-01-05") == 3
+    assert forwarded == [("hydrate_date", ["2024-01-05"])]
+
+
+def test_internal_hydrate_runs_op_and_returns_version(monkeypatch):
+    monkeypatch.setattr(gs, "fetch_games_by_date", lambda d: [bdl_game(9, d)])
+    monkeypatch.setattr(db, "pending_snapshot_version", lambda: 7)
+    monkeypatch.setattr(replica, "_snapshot_wanted", replica.threading.Event())
+    app = Flask(__name__)
+    app.register_blueprint(internal.bp)
+
+    r = app.test_client().post("/internal/hydrate", json={"op": "hydrate_date", "args": ["2024-01-06"]})
+    assert r.status_code == 200
+    assert r.get_json() == {"result": 1, "version": 7}
+    assert replica._snapshot_wanted.is_set()  # published by the background publisher, not inline
+    assert games_repo.get_game(9)["game_id"] == 9
+
+    r = app.test_client().post("/internal/hydrate", json={"op": "nope", "args": []})
+    assert r.status_code == 400
+
+
+def test_internal_hydrate_coalesces_concurrent_forwards(monkeypatch):
+    calls, release = [], replica.threading.Event()
+
+    def slow_fetch(d):
+        calls.append(d)
+        release.wait(2)
+        return [bdl_game(9, d)]
+
+    monkeypatch.setattr(gs, "fetch_games_by_date", slow_fetch)
+    monkeypatch.setattr(db, "pending_snapshot_version", lambda: 7)
+    monkeypatch.setattr(replica, "_snapshot_wanted", replica.threading.Event())
+    app = Flask(__name__)
+    app.register_blueprint(internal.bp)
+    results = []
+
+    def post():
+        r = app.test_client().post("/internal/hydrate", json={"op": "hydrate_date", "args": ["2024-01-06"]})
+        results.append(r.get_json())
+
+    threads = [replica.threading.Thread(target=post) for _ in range(4)]
+    for t in threads:
+        t.start()
+    replica.time.sleep(0.2)  # let every forward reach the writer while the first is in flight
+    release.set()
+    for t in threads:
+        t.join(2)
+
+    assert calls == ["2024-01-06"]
+    assert results == [{"result": 1, "version": 7}] * 4
+
+
+def test_pending_version_covers_unpublished_writes(monkeypatch, data_dir):
+    _as_writer(monkeypatch, data_dir)
+    v1 = db.publish_snapshot()
+    assert db.pending_snapshot_version() == v1
+    games_repo.upsert_games([bdl_game(1, "2024-01-01")])
+    assert db.pending_snapshot_version() == v1 + 1
+    assert db.publish_snapshot_if_dirty() == v1 + 1
+
+
+def test_publisher_coalesces_requests(monkeypatch):
+    published = []
+    monkeypatch.setattr(db, "publish_snapshot_if_dirty", lambda: published.append(1) or len(published))
+    monkeypatch.setattr(db, "pending_snapshot_version", lambda: 1)
+    monkeypatch.setattr(replica, "_snapshot_wanted", replica.threading.Event())
+
+    stop = replica.threading.Event()
+    thread = replica.start_snapshot_publisher(interval=60, min_interval=0.2, stop=stop)
+    for _ in range(5):
+        replica.request_snapshot()
+    replica.time.sleep(0.1)
+    assert published == []  # still inside the minimum interval
+    replica.time.sleep(0.3)
+    assert published == [1]  # five requests, one snapshot
+
+    stop.set()
+    replica.request_snapshot()
+    thread.join(1)
+    assert not thread.is_alive() and published == [1]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import time
+from app.infra.response_cache import ResponseCache
+from app.repos import games_repo
+import app.services.games_service as gs
+from fixtures import bdl_game
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResponseCache(maxsize=2, ttl=0.05)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") is not None  # touch a -> b is now LRU
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"1"
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_invalidate_by_tag_and_generation():
+    cache = ResponseCache()
+    cache.put("d1", b"x", tags=[("date", "2025-04-01"), ("game", 1)])
+    cache.put("g2", b"y", tags=[("game", 2)])
+    cache.invalidate([("game", 1)])
+    assert cache.get("d1") is None
+    assert cache.get("g2") is not None
+    assert cache.get("g2", generation=1) is None  # newer snapshot -> miss
+
+
+def test_etag_is_stable_for_identical_bodies():
+    cache = ResponseCache()
+    assert cache.put("a", b"same").etag == cache.put("b", b"same").etag
+
+
+def test_games_route_serves_304_and_invalidates_on_upsert(client, monkeypatch):
+    calls = {"list_games": 0}
+
+    def fake_list_games(date_str: str):
+        calls["list_games"] += 1
+        return [{"game_id": 10, "date": date_str, "status": f"v{calls['list_games']}"}]
+
+    monkeypatch.setattr(gs, "list_games", fake_list_games)
+
+    r1 = client.get("/games?date=2025-04-01")
+    etag = r1.headers["ETag"]
+    assert r1.status_code == 200 and etag
+
+    r2 = client.get("/games?date=2025-04-01", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert calls["list_games"] == 1
+
+    # An upsert touching that date drops the cached payload
+    games_repo.upsert_games([bdl_game(10, "2025-04-01", hs=1, vs=0)])
+    r3 = client.get("/games?date=2025-04-01", headers={"If-None-Match": etag})
+    assert r3.status_code == 200
+    assert r3.headers["ETag"] != etag
+    assert calls["list_games"] == 2
+
+
+def test_game_route_caches_hits_not_misses(client, monkeypatch):
+    calls = {"n": 0}
+
+    def fake_get_game_details(game_id: int):
+        calls["n"] += 1
+        return {"game_id": game_id} if game_id == 1 else None
+
+    monkeypatch.setattr(gs, "get_game_details", fake_get_game_details)
+
+    assert client.get("/games/1").status_code == 200
+    assert client.get("/games/1").status_code == 200
+    assert client.get("/games/2").status_code == 404
+    assert client.get("/games/2").status_code == 404
+    assert calls["n"] == 3
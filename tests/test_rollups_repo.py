@@ -0,0 +1,64 @@
+from __future__ import annotations
+from app.repos import rollups_repo
+from app.repos.games_repo import upsert_games, get_teams_range_stats
+from fixtures import bdl_game
+
+
+def _team_days(duck) -> list[tuple]:
+    return duck.execute(
+        "SELECT team_id, CAST(date AS TEXT), games, wins, pts FROM team_day ORDER BY date, team_id"
+    ).fetchall()
+
+
+def test_upsert_maintains_team_day_and_season(duck):
+    upsert_games([
+        bdl_game(1, "2024-01-02", 1, 110, 2, 100),
+        bdl_game(2, "2024-01-04", 2, 99, 1, 101),
+        bdl_game(3, "2024-01-06", 1, 0, 3, 0, status="7:30 pm ET"),  # not played yet
+    ])
+
+    assert _team_days(duck) == [
+        (1, "2024-01-02", 1, 1, 110), (2, "2024-01-02", 1, 0, 100),
+        (1, "2024-01-04", 1, 1, 101), (2, "2024-01-04", 1, 0, 99),
+    ]
+    (team1, team2) = rollups_repo.get_standings(2023)
+    assert (team1["team_id"], team1["wins"], team1["losses"], team1["away_wins"]) == (1, 2, 0, 1)
+    assert (team2["team_id"], team2["wins"], team2["losses"]) == (2, 0, 2)
+
+
+def test_rescheduled_game_moves_between_days(duck):
+    upsert_games([bdl_game(1, "2024-01-02", 1, 110, 2, 100)])
+
+    # Same id, new date and a different opponent: the old cells are cleared
+    upsert_games([bdl_game(1, "2024-01-03", 1, 90, 4, 95)])
+
+    assert _team_days(duck) == [(1, "2024-01-03", 1, 0, 90), (4, "2024-01-03", 1, 1, 95)]
+    assert {r["team_id"] for r in rollups_repo.get_standings(2023)} == {1, 4}
+
+
+def test_rebuild_matches_incremental(duck):
+    upsert_games([
+        bdl_game(1, "2024-01-02", 1, 110, 2, 100),
+        bdl_game(2, "2024-01-04", 2, 99, 1, 101),
+        bdl_game(3, "2024-01-06", 3, 88, 1, 87),
+    ])
+    incremental = _team_days(duck), rollups_repo.get_standings(2023)
+
+    rollups_repo.rebuild()
+
+    assert (_team_days(duck), rollups_repo.get_standings(2023)) == incremental
+
+
+def test_range_stats_fall_back_to_raw_median_for_doubleheaders():
+    # Two games for team 1 on one day (bad upstream data) -> exact raw median
+    upsert_games([
+        bdl_game(1, "2024-01-02", 1, 100, 2, 90),
+        bdl_game(2, "2024-01-02", 3, 80, 1, 120),
+        bdl_game(3, "2024-01-03", 1, 90, 4, 95),
+    ])
+
+    (out,) = get_teams_range_stats("2024-01-01", "2024-01-31", [1])
+
+    assert out["games_played"] == 3
+    assert out["median_score"] == 100.0
+    assert out["away_median_score"] == 120.0
@@ -1,7 +1,11 @@
 # tests/test_routes.py
-from __future__ import annotationss
+from __future__ import annotations
 
+import json
 import app.services.games_service as gs  # we'll monkeypatch attributes on this module
+from app.services import hydration
+from app.repos.games_repo import upsert_games
+from fixtures import bdl_game
 
 
 def test_health(client):
@@ -17,10 +21,11 @@ def test_games_requires_date_param(client):
 
 
 def test_games_for_date_refresh_true(client, monkeypatch):
-    called = {"list_games": 0}
+    called = {"list_games": 0, "force": None}
 
-    def fake_list_games(date_str: str):
+    def fake_list_games(date_str: str, force: bool = False):
         called["list_games"] += 1
+        called["force"] = force
         return [{"id": 123, "date": date_str, "home_team": {"id": 1}, "visitor_team": {"id": 2}}]
 
     # ensure cache-only path is not called when refresh=true
@@ -35,6 +40,7 @@ def test_games_for_date_refresh_true(client, monkeypatch):
     data = r.get_json()
     assert isinstance(data, list) and data[0]["id"] == 123
     assert called["list_games"] == 1
+    assert called["force"] is True
 
 
 def test_games_for_date_refresh_false(client, monkeypatch):
@@ -79,3 +85,31 @@ def test_get_game_not_found(client, monkeypatch):
     r = client.get("/games/424242")
     assert r.status_code == 404
     assert "not found" in r.get_json()["error"].lower()
+
+
+def test_games_range_streams_ndjson_and_json_array(client, monkeypatch):
+    upsert_games([bdl_game(1, "2024-01-02"), bdl_game(2, "2024-01-03"), bdl_game(3, "2024-02-01")])
+    hydrated = []
+    monkeypatch.setattr(hydration, "hydrate_range", lambda s, e, t: hydrated.append((s, e, t)))
+    monkeypatch.setattr(gs, "RANGE_BATCH_ROWS", 1)
+
+    r = client.get("/games/range?start_date=2024-01-01&end_date=2024-01-31&format=ndjson")
+    assert r.mimetype == "application/x-ndjson"
+    lines = r.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["game_id"] for line in lines] == [1, 2]
+
+    r = client.get("/games/range?start_date=2024-01-01&end_date=2024-02-28")
+    assert [g["game_id"] for g in r.get_json()] == [1, 2, 3]
+    assert hydrated == [("2024-01-01", "2024-01-31", None), ("2024-01-01", "2024-02-28", None)]
+
+    assert client.get("/games/range?start_date=2024-01-01").status_code == 400
+    assert client.get("/games/range?start_date=2024-01-01&end_date=2024-01-31&format=xml").status_code == 400
+
+
+def test_games_range_rejects_bad_dates(client, monkeypatch):
+    monkeypatch.setattr(hydration, "hydrate_range", lambda s, e, t: None)
+    bad = client.get("/games/range?start_date=2024-13-01&end_date=2024-12-31")
+    assert bad.status_code == 400 and "YYYY-MM-DD" in bad.get_json()["error"]
+    assert client.get("/games/range?start_date=2024-02-01&end_date=2024-01-01").status_code == 400
+    assert client.get("/games/range?start_date=2020-01-01&end_date=2024-01-01").status_code == 400
+    assert client.get("/games/range?start_date=2024-01-01&end_date=2024-01-01").status_code == 200
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import threading
+import time
+import pytest
+from app.infra.singleflight import SingleFlight
+import app.services.games_service as gs
+from fixtures import bdl_game
+
+
+def _run_concurrently(n: int, target):
+    barrier = threading.Barrier(n)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(target())
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    sf = SingleFlight()
+    calls = {"n": 0}
+
+    def slow():
+        calls["n"] += 1
+        time.sleep(0.1)
+        return "payload"
+
+    results = _run_concurrently(6, lambda: sf.do("k", slow))
+    assert results == ["payload"] * 6
+    assert calls["n"] == 1
+
+
+def test_error_is_shared_and_key_released():
+    sf = SingleFlight()
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        sf.do("k", boom)
+    # next call runs again rather than replaying the error
+    assert sf.do("k", lambda: 1) == 1
+
+
+def test_list_games_concurrent_misses_fetch_once(monkeypatch):
+    calls = {"fetch": 0}
+
+    def fake_fetch_games_by_date(date_str: str):
+        calls["fetch"] += 1
+        time.sleep(0.1)
+        return [bdl_game(5001, date_str, vs=99)]
+
+    monkeypatch.setattr(gs, "fetch_games_by_date", fake_fetch_games_by_date)
+
+    results = _run_concurrently(5, lambda: gs.list_games("2024-03-01"))
+    assert calls["fetch"] == 1
+    assert all(r and r[0]["game_id"] == 5001 for r in results)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+import csv
+from datetime import date, timedelta
+import app.services.stats_service as ss
+from app.services import hydration
+from app.repos.games_repo import upsert_games, get_teams_range_stats
+from app.repos.coverage_repo import mark_range_covered
+from fixtures import bdl_game
+
+
+GAMES = [
+    bdl_game(1, "2024-01-02", 1, 110, 2, 100),  # team 1 home win
+    bdl_game(2, "2024-01-04", 3, 120, 1, 100),  # team 1 away loss
+    bdl_game(3, "2024-01-06", 1, 90, 4, 95),    # team 1 home loss
+    bdl_game(4, "2024-01-06", 2, 80, 3, 70),    # other teams
+]
+
+
+def _stub_teams(monkeypatch):
+    monkeypatch.setattr(ss, "hydrate_teams_if_needed", lambda: None)
+    monkeypatch.setattr(ss, "_TEAMS_CACHE", {i: {"full_name": f"Team {i}"} for i in range(1, 5)})
+
+
+def test_team_range_stats_from_duckdb_with_split():
+    upsert_games(GAMES)
+
+    (out,) = get_teams_range_stats("2024-01-01", "2024-01-31", [1])
+
+    assert out["games_played"] == 3
+    assert out["median_score"] == 100.0
+    assert out["win_pct"] == 1 / 3
+    assert out["home_games"] == 2 and out["home_median_score"] == 100.0
+    assert out["home_win_pct"] == 0.5
+    assert out["away_games"] == 1 and out["away_win_pct"] == 0.0
+
+
+def test_team_range_stats_team_without_games():
+    (out,) = get_teams_range_stats("2024-02-01", "2024-02-03", [9])
+    assert ss._select(out, split=False) == {"median_score": None, "win_pct": None, "games_played": 0}
+
+
+def test_standings_never_pulls_past_today(monkeypatch):
+    today = date.today()
+    season = ss.season_of(today.isoformat())
+    by_range, by_dates = [], []
+    monkeypatch.setattr(ss, "hydrate_teams_if_needed", lambda: None)
+    monkeypatch.setattr(hydration, "fetch_games_for_range", lambda s, e, t=None: by_range.append((s, e)) or [])
+
+    def fake_dates(dates, team_ids=None):
+        by_dates.append(list(dates))
+        return [bdl_game(90 + i, d, 1, 100, 2, 90) for i, d in enumerate(dates)]
+
+    monkeypatch.setattr(hydration, "fetch_games_for_dates", fake_dates)
+    start = ss.season_range(season)[0]
+    mark_range_covered(start, (today - timedelta(days=2)).isoformat())
+
+    ss.standings(season)
+    yesterday = (today - timedelta(days=1)).isoformat()
+    assert by_range == []
+    assert by_dates == [[yesterday, today.isoformat()]]
+
+    # yesterday and today now have games: the scheduler keeps them fresh
+    by_dates.clear()
+    ss.standings(season)
+    assert by_range == [] and by_dates == []
+
+
+def test_multi_team_csv_hydrates_range_once(monkeypatch):
+    _stub_teams(monkeypatch)
+    fetched = []
+
+    def fake_fetch(start, end, team_ids=None):
+        fetched.append(team_ids)
+        return GAMES
+
+    monkeypatch.setattr(hydration, "fetch_games_for_range", fake_fetch)
+    monkeypatch.setattr(ss, "resolve_team_ids", lambda q: [1, 2, 9])
+
+    rows = list(csv.reader("".join(ss.iter_team_stats_csv("2024-01-01", "2024-01-31", "x", False)).splitlines()))
+
+    assert fetched == [[1, 2, 9]]
+    assert rows[0] == ["team_name", "team_id", "median_score", "win_pct", "games_played"]
+    assert [r[1] for r in rows[1:]] == ["1", "2", "9"]
+    assert rows[1][4] == "3" and rows[3][4] == "0"
+
+
+def test_all_teams_csv_single_range_pull(monkeypatch):
+    _stub_teams(monkeypatch)
+    fetched = []
+
+    def fake_fetch(start, end, team_ids=None):
+        fetched.append(team_ids)
+        return GAMES
+
+    monkeypatch.setattr(hydration, "fetch_games_for_range", fake_fetch)
+
+    out = list(ss.iter_team_stats_csv("2024-01-01", "2024-01-31", "all", True))
+    assert fetched == [None]
+    assert len(out) == 1 + 4  # header + teams that played
+    # Second report over the same settled range is served from the cache
+    list(ss.iter_team_stats_csv("2024-01-01", "2024-01-31", "ALL", True))
+    assert fetched == [None]
+
+
+def test_team_form_last_n_and_streak(monkeypatch):
+    _stub_teams(monkeypatch)
+    monkeypatch.setattr(ss, "resolve_team_ids", lambda q: [1])
+    monkeypatch.setattr(hydration, "hydrate_range", lambda start, end, team_ids: None)
+    upsert_games(GAMES + [
+        bdl_game(5, "2024-01-08", 1, 101, 3, 99),   # team 1 home win
+        bdl_game(6, "2024-01-10", 4, 90, 1, 100),   # team 1 away win
+        bdl_game(7, "2024-01-12", 1, 50, 2, 60),    # after as_of: ignored
+    ])
+
+    (form,) = ss.team_form("1", "2024-01-10", n=3)
+
+    # last 3: L (90-95), W (101-99), W (100-90)
+    assert form["games_played"] == 5
+    assert (form["last_n_wins"], form["last_n_losses"]) == (2, 1)
+    assert form["last_n_pts"] == 97.0
+    assert form["last_n_margin"] == round((-5 + 2 + 10) / 3, 1)
+    assert form["streak"] == "W2"
+    assert form["team_name"] == "Team 1"
+
+
+def test_team_form_route_caches_settled_dates(client, monkeypatch):
+    calls = {"n": 0}
+
+    def fake_team_form(team, as_of, n):
+        calls["n"] += 1
+        return [{"team_id": 1, "as_of": as_of, "streak": "W1"}]
+
+    monkeypatch.setattr(ss, "team_form", fake_team_form)
+
+    r1 = client.get("/stats/form?team=BOS&as_of=2024-01-10")
+    r2 = client.get("/stats/form?team=bos&as_of=2024-01-10")
+
+    assert r1.status_code == r2.status_code == 200
+    assert calls["n"] == 1
+    assert "max-age" in r1.headers["Cache-Control"]
+    assert "immutable" not in r1.headers["Cache-Control"]
+    assert client.get("/stats/form?as_of=yesterday").status_code == 400
+
+
+def test_team_form_cache_dropped_when_season_games_change(client, monkeypatch):
+    _stub_teams(monkeypatch)
+    monkeypatch.setattr(ss, "resolve_team_ids", lambda q: [1])
+    monkeypatch.setattr(hydration, "hydrate_range", lambda start, end, team_ids: None)
+    upsert_games([GAMES[0]])
+
+    (before,) = client.get("/stats/form?team=1&as_of=2024-01-10").get_json()
+    upsert_games([GAMES[1]])  # backfilled game in the same season
+    (after,) = client.get("/stats/form?team=1&as_of=2024-01-10").get_json()
+
+    assert (before["games_played"], after["games_played"]) == (1, 2)
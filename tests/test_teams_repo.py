@@ -0,0 +1,61 @@
+from __future__ import annotations
+import threading
+import pytest
+from app.repos import teams_repo
+
+TEAMS = [
+    (2, "BOS", "Boston", "Celtics", "Boston Celtics"),
+    (13, "LAC", "LA", "Clippers", "LA Clippers"),
+    (14, "LAL", "Los Angeles", "Lakers", "Los Angeles Lakers"),
+    (20, "NYK", "New York", "Knicks", "New York Knicks"),
+    (23, "PHI", "Philadelphia", "76ers", "Philadelphia 76ers"),
+]
+
+
+@pytest.fixture()
+def teams(duck, monkeypatch):
+    duck.executemany(
+        "INSERT INTO teams (id, abbreviation, city, name, full_name) VALUES (?, ?, ?, ?, ?)", TEAMS
+    )
+    monkeypatch.setattr(teams_repo, "_TEAMS_CACHE", {})
+    monkeypatch.setattr(teams_repo, "_ready", threading.Event())
+    yield
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("14", [14]),
+    ("Boston Celtics", [2]),
+    ("lal", [14]),                 # abbreviation
+    ("los angeles", [14]),         # exact city beats LA Clippers' prefix
+    ("la", [13]),                  # exact city "LA" beats the LAL/LAC prefixes
+    ("knick", [20]),               # prefix
+    ("lip", [13]),                 # substring
+    ("kincks", [20]),              # edit distance
+    ("ers", [13, 14, 23]),         # substring ties: Clippers, Lakers, 76ers
+    ("zzz", []),
+])
+def test_resolve_ranks_matches(teams, query, expected):
+    assert teams_repo.resolve_team_ids(query) == expected
+
+
+def test_resolve_comma_separated_teams(teams):
+    assert teams_repo.resolve_team_ids("BOS, lal,NYK,") == [2, 14, 20]
+
+
+def test_cold_start_builds_index_once(teams, monkeypatch):
+    calls = {"n": 0}
+    real = teams_repo._build_index
+
+    def counting_build(rows):
+        calls["n"] += 1
+        return real(rows)
+
+    monkeypatch.setattr(teams_repo, "_build_index", counting_build)
+    threads = [threading.Thread(target=teams_repo.hydrate_teams_if_needed) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls["n"] == 1
+    assert len(teams_repo._TEAMS_CACHE) == len(TEAMS)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+import app.services.stats_service as ss
+from app.services import hydration
+from app.infra import profiler, timing
+from app.repos.games_repo import upsert_games
+from fixtures import bdl_game
+
+
+def _spans(header: str) -> dict[str, str]:
+    return {part.split(";")[0].strip(): part for part in header.split(",")}
+
+
+def test_server_timing_reports_db_and_serialization(client):
+    upsert_games([bdl_game(1, "2024-01-02")])
+
+    r = client.get("/games?date=2024-01-02&refresh=false")
+
+    spans = _spans(r.headers["Server-Timing"])
+    assert {"db", "serialize", "total"} <= spans.keys()
+    assert 'desc="1x"' in spans["serialize"]
+
+
+def test_teams_csv_headers_include_hydration(client, monkeypatch):
+    monkeypatch.setattr(ss, "hydrate_teams_if_needed", lambda: None)
+    monkeypatch.setattr(hydration, "fetch_games_for_range", lambda s, e, t=None: [])
+
+    r = client.get("/stats/teams.csv?start_date=2024-01-01&end_date=2024-01-31&team=all")
+
+    assert r.status_code == 200
+    assert "hydrate" in _spans(r.headers["Server-Timing"])
+
+
+def test_spans_from_worker_threads_land_on_the_request():
+    t = timing.Timings()
+    token = timing._current.set(t)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for ctx in [copy_context() for _ in range(4)]:
+                pool.submit(ctx.run, timing.add, "bdl", 0.01)
+    finally:
+        timing._current.reset(token)
+
+    assert t.as_dict()["bdl"] == {"ms": 40.0, "count": 4}
+    timing.add("bdl", 1.0)  # outside a request: ignored
+    assert t.as_dict()["bdl"]["count"] == 4
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_profiler_writes_folded_stacks_for_slow_requests(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "PROFILE_SLOW_MS", 20)
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiler, "_sampler", profiler.Sampler(0.001))
+
+    profiler.begin()
+    _spin(0.01)
+    assert profiler.end(10, "GET /fast") is None
+
+    profiler.begin()
+    _spin(0.05)
+    path = profiler.end(50, "GET /stats/teams.csv")
+
+    assert path.startswith(str(tmp_path)) and "GET_stats_teams_csv" in path
+    lines = open(path).read().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert "_spin (test_timing.py" in stack and int(count) > 0